@@ -0,0 +1,85 @@
+"""Compare the requests/sec of the /databases endpoint with a blocking and an async adapter.
+
+Usage: python benchmark.py --requests 500 --concurrency 20
+"""
+
+from litestar import get, Litestar
+from package.database import AsyncCHAdapter, CHAdapter
+from projects.tutorial.config.settings import get_settings
+
+import asyncio
+import httpx
+import time
+import typer
+
+QUERY = """
+select name, engine
+from system.databases
+"""
+
+
+def create_blocking_app(db: CHAdapter) -> Litestar:
+    @get("/databases")
+    async def get_databases() -> list[dict[str, str]]:
+        # Blocks the event loop until the query is done
+        return db.query_records(QUERY, cache=False)
+
+    return Litestar([get_databases])
+
+
+def create_async_app(db: AsyncCHAdapter) -> Litestar:
+    @get("/databases")
+    async def get_databases() -> list[dict[str, str]]:
+        return await db.query_records(QUERY, cache=False)
+
+    return Litestar([get_databases])
+
+
+async def run_requests(app: Litestar, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://benchmark"
+    ) as client:
+
+        async def request() -> None:
+            async with semaphore:
+                response = await client.get("/databases")
+                response.raise_for_status()
+
+        # Warm up the connection pool
+        await asyncio.gather(*[request() for _ in range(concurrency)])
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*[request() for _ in range(requests)])
+
+        return requests / (time.perf_counter() - started_at)
+
+
+async def benchmark(requests: int, concurrency: int) -> None:
+    settings = get_settings()
+    blocking_db = CHAdapter(settings.destination_db, pool_size=concurrency)
+    async_db = AsyncCHAdapter(settings.destination_db, pool_size=concurrency)
+
+    try:
+        blocking = await run_requests(create_blocking_app(blocking_db), requests, concurrency)
+        async_ = await run_requests(create_async_app(async_db), requests, concurrency)
+    finally:
+        blocking_db.close()
+        await async_db.close()
+
+    print(f"{'adapter':<10} {'requests/s':>12}")
+    print(f"{'blocking':<10} {blocking:>12,.1f}")
+    print(f"{'async':<10} {async_:>12,.1f}")
+    print(f"{'speedup':<10} {async_ / blocking:>12,.2f}x")
+
+
+def main(
+    requests: int = typer.Option(500, help="Number of requests per adapter."),
+    concurrency: int = typer.Option(20, help="Number of concurrent requests."),
+) -> None:
+    asyncio.run(benchmark(requests, concurrency))
+
+
+if __name__ == "__main__":
+    typer.run(main)
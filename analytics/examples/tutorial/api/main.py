@@ -1,9 +1,12 @@
 from litestar import get, Litestar
-from package.database import CHAdapter
+from package.database import AsyncCHAdapter
+from package.database.result_cache import ResultCache
 from projects.tutorial.config.settings import get_settings
 
 settings = get_settings()
-db = CHAdapter(settings.destination_db)
+db = AsyncCHAdapter(
+    settings.destination_db, result_cache=ResultCache(ttl=60), profile="interactive"
+)
 
 
 @get("/")
@@ -18,10 +21,12 @@ async def get_databases() -> list[dict[str, str]]:
     from system.databases
     """
 
-    with db.create_client() as client:
-        df = client.query_df(query)
+    return await db.query_records(query)
 
-    return df.to_dict(orient="records")
 
+@get("/cache")
+async def get_cache_stats() -> dict[str, int]:
+    return db.result_cache.stats().model_dump()
 
-app = Litestar([index, get_databases])
+
+app = Litestar([index, get_databases, get_cache_stats], on_shutdown=[db.close])
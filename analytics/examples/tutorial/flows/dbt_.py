@@ -1,7 +1,12 @@
+from package.database import CHAdapter
 from package.dbt import Dbt
-from prefect import flow
+from package.dbt_fanout import dbt_fanout
+from package.dbt_history import DbtRunHistory
+from package.types import DbtFanoutStrategy, DbtNodeEvent, DbtNodeEventType
+from prefect import flow, get_run_logger
+from prefect.artifacts import create_table_artifact
 from projects.tutorial.config.settings import get_settings
-from typing import Optional
+from typing import Any, Optional
 
 import asyncio
 
@@ -9,8 +14,91 @@ settings = get_settings()
 
 
 @flow(name="tutorial__dbt_run_flow")
-async def dbt_run_flow(select: Optional[str] = None):
-    return await Dbt(settings.dbt.directory).run_async(select=select)
+async def dbt_run_flow(
+    select: Optional[str] = None,
+    fail_fast: bool = True,
+    full_refresh: bool = False,
+    vars: Optional[dict[str, Any]] = None,
+    target: Optional[str] = None,
+):
+    logger = get_run_logger()
+
+    def log_event(event: DbtNodeEvent) -> None:
+        if event.type == DbtNodeEventType.FINISH:
+            logger.info(
+                f"{event.unique_id}: {event.status} in {event.execution_time:.1f}s "
+                f"({event.rows_affected or 0:,} rows)"
+            )
+
+    adapter = CHAdapter(settings.destination_db)
+    dbt = Dbt(settings.dbt.directory, target=target, history=DbtRunHistory(adapter))
+
+    try:
+        summary = await dbt.run_async(
+            fail_fast=fail_fast,
+            full_refresh=full_refresh,
+            select=select,
+            vars=vars,
+            on_event=log_event,
+        )
+    finally:
+        adapter.close()
+
+    await create_table_artifact(
+        key="dbt-slowest-nodes",
+        table=[
+            {
+                "unique_id": result.unique_id,
+                "status": result.status,
+                "execution_time": round(result.execution_time, 2),
+                "rows_affected": result.rows_affected,
+            }
+            for result in summary.slowest(10)
+        ],
+        description=f"Slowest nodes of dbt invocation {summary.invocation_id}",
+    )
+
+    if not summary.success:
+        raise Exception(
+            f"dbt run failed: {', '.join(result.unique_id for result in summary.failed)}"
+        )
+
+    return summary
+
+
+@flow(name="tutorial__dbt_fanout_flow")
+async def dbt_fanout_flow(
+    select: Optional[str] = None,
+    strategy: DbtFanoutStrategy = DbtFanoutStrategy.COMPONENTS,
+    concurrency: int = 4,
+    full_refresh: bool = False,
+    deployment: Optional[str] = None,
+):
+    """Run the branches in dbt processes of the flow run, or as flow runs of a deployment of
+    dbt_run_flow (e.g. "tutorial__dbt_run_flow/tutorial__dbt_run"), which spreads them over the
+    workers of its work pool.
+    """
+    adapter = CHAdapter(settings.destination_db)
+    dbt = Dbt(settings.dbt.directory, history=DbtRunHistory(adapter))
+
+    try:
+        results = await dbt_fanout(
+            dbt,
+            select=select,
+            strategy=strategy,
+            concurrency=concurrency,
+            full_refresh=full_refresh,
+            deployment=deployment,
+        )
+    finally:
+        adapter.close()
+
+    failed = [unique_id for result in results for unique_id in result.failed_nodes]
+
+    if failed:
+        raise Exception(f"dbt run failed: {', '.join(failed)}")
+
+    return results
 
 
 if __name__ == "__tutorial__":
@@ -0,0 +1,302 @@
+from concurrent.futures import ThreadPoolExecutor
+from package.database import CHAdapter, PGAdapter
+from package.database.catalog import CatalogTable
+from package.types import (
+    BackfillCheckpoint,
+    BackfillMethod,
+    BackfillProgress,
+    BackfillRange,
+    CHTableIdentifier,
+    CopyFormat,
+    PGIdentifier,
+    PGTableIdentifier,
+)
+from pathlib import Path
+from typing import Callable, Generator, List, Optional
+
+import math
+import os
+import threading
+import time
+
+# Integer types that can be split into primary key ranges
+BACKFILL_KEY_DATA_TYPES = ["bigint", "integer", "smallint"]
+
+# Settings for parsing the CSV output of Postgres. Arrays are rendered as nested CSV by the range
+# query, because ClickHouse does not parse the array literals of Postgres.
+BACKFILL_INSERT_SETTINGS = {
+    "date_time_input_format": "best_effort",
+    "input_format_csv_arrays_as_nested_csv": 1,
+}
+
+
+def split_range(start: int, end: int, count: int) -> List[tuple[int | None, int | None]]:
+    """Split the range [start, end] into `count` half-open ranges. The first and last ranges are
+    unbounded, so rows outside of the range (e.g. inserted after planning) are included.
+    """
+    count = max(min(count, end - start + 1), 1)
+    step = math.ceil((end - start + 1) / count)
+    bounds = [start + step * index for index in range(1, count)]
+
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+class Backfill:
+    """Copy tables from Postgres to ClickHouse in parallel, checkpointed ranges."""
+
+    def __init__(
+        self,
+        source: PGAdapter,
+        destination: CHAdapter,
+        checkpoint_dir: Path | str,
+        workers: int = 4,
+        range_size: int = 1000000,
+        chunk_size: int = 1024 * 1024,
+        on_progress: Optional[Callable[[BackfillProgress], None]] = None,
+    ) -> None:
+        if workers > destination.pool_size:
+            raise Exception("'workers' must not be greater than the pool size of the destination")
+
+        self.source = source
+        self.destination = destination
+        self.checkpoint_dir = Path(checkpoint_dir)
+        self.workers = workers
+        self.range_size = range_size
+        self.chunk_size = chunk_size
+        self.on_progress = on_progress
+
+    def get_checkpoint_path(self, table_mapping: dict) -> Path:
+        source_table_identifier = PGTableIdentifier.from_string(
+            table_mapping["source_table_identifier"]
+        )
+        schema = source_table_identifier.schema_ or self.source.settings.schema_
+
+        return self.checkpoint_dir / f"{schema}.{source_table_identifier.table}.json"
+
+    def load_checkpoint(self, table_mapping: dict) -> BackfillCheckpoint | None:
+        path = self.get_checkpoint_path(table_mapping)
+
+        if not path.exists():
+            return None
+
+        return BackfillCheckpoint.model_validate_json(path.read_text())
+
+    def save_checkpoint(self, table_mapping: dict, checkpoint: BackfillCheckpoint) -> None:
+        path = self.get_checkpoint_path(table_mapping)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file first, so an interrupted write does not corrupt the checkpoint
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(checkpoint.model_dump_json(indent=2))
+        os.replace(tmp_path, path)
+
+    def get_source_table(self, table_mapping: dict) -> CatalogTable:
+        source_table_identifier = PGTableIdentifier.from_string(
+            table_mapping["source_table_identifier"]
+        )
+        schema = source_table_identifier.schema_ or self.source.settings.schema_
+        catalog = self.source.get_catalog(schema=schema)
+        source_table = catalog.get_table(source_table_identifier.table, schema=schema)
+
+        if source_table is None:
+            raise Exception(
+                f"Source table '{table_mapping['source_table_identifier']}' not found in source database"
+            )
+
+        return source_table
+
+    def get_columns(self, table_mapping: dict, source_table: CatalogTable) -> List[str]:
+        exclude = table_mapping.get("exclude", [])
+
+        return [column for column in source_table.column_names if column not in exclude]
+
+    def plan(
+        self, table_mapping: dict, method: Optional[BackfillMethod] = None
+    ) -> BackfillCheckpoint:
+        source_table = self.get_source_table(table_mapping)
+        schema = source_table.schema_
+        table = source_table.name
+        columns = self.get_columns(table_mapping, source_table)
+        array_columns = [
+            column for column in columns if source_table.get_column(column).data_type.endswith("[]")
+        ]
+        primary_key = self.source.get_primary_key(table, schema=schema)
+
+        if method is None:
+            if (
+                len(primary_key) == 1
+                and source_table.get_column(primary_key[0]).data_type in BACKFILL_KEY_DATA_TYPES
+            ):
+                method = BackfillMethod.PRIMARY_KEY
+            else:
+                method = BackfillMethod.CTID
+
+        quoted_table = PGTableIdentifier(schema_=schema, table=table).to_string()
+
+        with self.source.create_client() as (conn, cur):
+            cur.execute(
+                "select greatest(reltuples, 0), relpages from pg_class where oid = %(table)s::regclass;",
+                {"table": quoted_table},
+            )
+            estimated_rows, pages = cur.fetchone()
+            count = math.ceil(estimated_rows / self.range_size) or 1
+
+            if method == BackfillMethod.PRIMARY_KEY:
+                key = primary_key[0]
+                quoted_key = PGIdentifier.quote(key)
+                cur.execute(f"select min({quoted_key}), max({quoted_key}) from {quoted_table};")
+                start, end = cur.fetchone()
+            else:
+                key = None
+                start, end = 0, max(pages, 1)
+
+        if start is None:
+            bounds = [(None, None)]
+        else:
+            bounds = split_range(start, end, count)
+
+        return BackfillCheckpoint(
+            source_table=table_mapping["source_table_identifier"],
+            destination_table=table_mapping["destination_table_identifier"],
+            method=method,
+            key=key,
+            columns=columns,
+            array_columns=array_columns,
+            ranges=[
+                BackfillRange(index=index, start=start, end=end)
+                for index, (start, end) in enumerate(bounds)
+            ],
+        )
+
+    def run(
+        self,
+        table_mapping: dict,
+        database: Optional[str] = None,
+        method: Optional[BackfillMethod] = None,
+        resume: Optional[bool] = True,
+    ) -> BackfillProgress:
+        checkpoint = self.load_checkpoint(table_mapping) if resume else None
+
+        if checkpoint is None or (
+            checkpoint.source_table != table_mapping["source_table_identifier"]
+            or checkpoint.destination_table != table_mapping["destination_table_identifier"]
+            or (method is not None and checkpoint.method != method)
+            # The columns change if the table or the excluded columns changed since planning
+            or checkpoint.columns
+            != self.get_columns(table_mapping, self.get_source_table(table_mapping))
+        ):
+            checkpoint = self.plan(table_mapping, method=method)
+            self.save_checkpoint(table_mapping, checkpoint)
+
+        destination_table_identifier = CHTableIdentifier.from_string(checkpoint.destination_table)
+        database = destination_table_identifier.database or database
+        lock = threading.Lock()
+        started_at = time.perf_counter()
+        progress = BackfillProgress(
+            source_table=checkpoint.source_table,
+            destination_table=checkpoint.destination_table,
+            ranges=len(checkpoint.ranges),
+            ranges_done=len([range_ for range_ in checkpoint.ranges if range_.done]),
+            rows=0,
+            bytes=0,
+            elapsed=0,
+        )
+
+        def copy_range(range_: BackfillRange) -> None:
+            range_started_at = time.perf_counter()
+            range_bytes = 0
+
+            def read() -> Generator[bytes, None, None]:
+                nonlocal range_bytes
+
+                for chunk in self.source.copy_stream(
+                    self.create_range_query(checkpoint, range_),
+                    format=CopyFormat.CSV,
+                    chunk_size=self.chunk_size,
+                ):
+                    range_bytes += len(chunk)
+                    yield chunk
+
+            # A range that failed halfway is copied again in full. The destination tables are
+            # deduplicated by key, so the rows that were already inserted are replaced.
+            report = self.destination.insert_raw(
+                destination_table_identifier.table,
+                read(),
+                column_names=checkpoint.columns,
+                database=database,
+                format="CSVWithNames",
+                settings=BACKFILL_INSERT_SETTINGS,
+            )
+
+            with lock:
+                range_.done = True
+                range_.rows = report.rows
+                range_.bytes = range_bytes
+                range_.elapsed = time.perf_counter() - range_started_at
+                self.save_checkpoint(table_mapping, checkpoint)
+
+                progress.ranges_done += 1
+                progress.rows += range_.rows
+                progress.bytes += range_.bytes
+                progress.elapsed = time.perf_counter() - started_at
+
+                if self.on_progress:
+                    self.on_progress(progress.model_copy())
+
+        pending = [range_ for range_ in checkpoint.ranges if not range_.done]
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # Consume the results, so the first error is raised
+            list(executor.map(copy_range, pending))
+
+        progress.elapsed = time.perf_counter() - started_at
+
+        return progress
+
+    def create_range_query(self, checkpoint: BackfillCheckpoint, range_: BackfillRange) -> str:
+        source_table_identifier = PGTableIdentifier.from_string(checkpoint.source_table)
+        quoted_table = PGTableIdentifier(
+            schema_=source_table_identifier.schema_ or self.source.settings.schema_,
+            table=source_table_identifier.table,
+        ).to_string()
+        quoted_columns = ", ".join(
+            self.create_column_expression(column, column in checkpoint.array_columns)
+            for column in checkpoint.columns
+        )
+        conditions = []
+
+        if checkpoint.method == BackfillMethod.PRIMARY_KEY:
+            quoted_key = PGIdentifier.quote(checkpoint.key)
+
+            if range_.start is not None:
+                conditions.append(f"{quoted_key} >= {int(range_.start)}")
+
+            if range_.end is not None:
+                conditions.append(f"{quoted_key} < {int(range_.end)}")
+        else:
+            if range_.start is not None:
+                conditions.append(f"ctid >= '({int(range_.start)},0)'::tid")
+
+            if range_.end is not None:
+                conditions.append(f"ctid < '({int(range_.end)},0)'::tid")
+
+        where = f" where {' and '.join(conditions)}" if conditions else ""
+
+        return f"select {quoted_columns} from {quoted_table}{where}"
+
+    @staticmethod
+    def create_column_expression(column: str, is_array: Optional[bool] = False) -> str:
+        quoted_column = PGIdentifier.quote(column)
+
+        if not is_array:
+            return quoted_column
+
+        # Render the array as nested CSV (e.g. ["a","b"] with quotes doubled and nulls as \N), which
+        # ClickHouse parses with input_format_csv_arrays_as_nested_csv
+        return (
+            "'[' || array_to_string(array("
+            "select coalesce('\"' || replace(element::text, '\"', '\"\"') || '\"', '\\N') "
+            f"from unnest({quoted_column}) with ordinality as elements(element, position) "
+            "order by position"
+            f"), ',') || ']' as {quoted_column}"
+        )
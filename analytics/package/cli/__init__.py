@@ -1,8 +1,20 @@
-__all__ = ["app", "dbt_cli", "peerdb_cli", "prefect_cli", "project_cli"]
+__all__ = [
+    "app",
+    "backfill_cli",
+    "database_cli",
+    "dbt_cli",
+    "peerdb_cli",
+    "prefect_cli",
+    "project_cli",
+    "reconcile_cli",
+]
 
 from package.cli.root import app
 
+import package.cli.backfill_cli as backfill_cli
+import package.cli.database_cli as database_cli
 import package.cli.dbt_cli as dbt_cli
 import package.cli.peerdb_cli as peerdb_cli
 import package.cli.prefect_cli as prefect_cli
 import package.cli.project_cli as project_cli
+import package.cli.reconcile_cli as reconcile_cli
@@ -0,0 +1,75 @@
+from package.backfill import Backfill
+from package.cli.root import app
+from package.config.constants import PEERDB_DESTINATION_PEER
+from package.database import CHAdapter, PGAdapter
+from package.peerdb import PeerDB
+from package.project import Project
+from package.types import BackfillMethod, BackfillProgress
+from typing import Optional
+
+import os
+import typer
+
+backfill_app = typer.Typer(name="backfill", add_completion=False)
+app.add_typer(backfill_app)
+
+
+def print_progress(progress: BackfillProgress) -> None:
+    app.console.print(
+        f"{progress.source_table}: {progress.ranges_done}/{progress.ranges} ranges, "
+        f"{progress.rows:,} rows ({progress.rows_per_second:,.0f} rows/s, "
+        f"{progress.bytes_per_second / 1024 / 1024:,.1f} MiB/s)"
+    )
+
+
+@backfill_app.command(help="Copy mirrored tables from the source to the destination database.")
+def run(
+    project_name: str,
+    tables: Optional[list[str]] = typer.Option(
+        None, "-t", "--table", help="1 or more source table identifiers. By default, all tables."
+    ),
+    workers: int = typer.Option(4, help="Number of ranges that are copied in parallel."),
+    range_size: int = typer.Option(1000000, help="Estimated number of rows per range."),
+    method: Optional[BackfillMethod] = typer.Option(None, help="Default: primary key if possible."),
+    restart: Optional[bool] = typer.Option(
+        False, "--restart", help="Whether to ignore existing checkpoints."
+    ),
+) -> None:
+    project = Project.from_name(project_name)
+    peerdb_config = PeerDB.prepare_config(
+        project.settings.peerdb.config,
+        dbt_project_dir=project.dbt_directory,
+        generate_exclude=True,
+    )
+    database = peerdb_config["peers"][PEERDB_DESTINATION_PEER]["clickhouse_config"]["database"]
+    table_mappings = [
+        table_mapping
+        for mirror in peerdb_config["mirrors"].values()
+        for table_mapping in mirror["table_mappings"]
+        if not tables or table_mapping["source_table_identifier"] in tables
+    ]
+
+    source = PGAdapter(project.settings.source_db)
+    destination = CHAdapter(project.settings.destination_db, pool_size=workers, profile="batch")
+    backfill = Backfill(
+        source,
+        destination,
+        os.path.join(project.directory, ".backfill"),
+        workers=workers,
+        range_size=range_size,
+        on_progress=print_progress,
+    )
+
+    try:
+        for table_mapping in table_mappings:
+            progress = backfill.run(
+                table_mapping, database=database, method=method, resume=not restart
+            )
+            app.console.print(
+                f"Copied '{progress.source_table}' to '{progress.destination_table}' "
+                f"({progress.rows:,} rows in {progress.elapsed:,.1f}s)",
+                style="green",
+            )
+    finally:
+        source.close()
+        destination.close()
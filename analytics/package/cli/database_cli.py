@@ -0,0 +1,149 @@
+from enum import Enum
+from package.cli.root import app
+from package.database import CHAdapter, PGAdapter
+from package.project import Project
+from package.types import TableStats
+from rich.table import Table
+from typing import List, Optional
+
+import typer
+
+database_app = typer.Typer(name="database", add_completion=False)
+app.add_typer(database_app)
+
+
+class StatsSortKey(str, Enum):
+    compression_ratio = "compression_ratio"
+    dead_tuples = "dead_tuples"
+    rows = "rows"
+    table = "table"
+    total_bytes = "total_bytes"
+
+
+@database_app.command(
+    help="Print storage statistics of the tables in the source and destination databases."
+)
+def stats(
+    project_name: str,
+    sort_by: StatsSortKey = typer.Option(StatsSortKey.total_bytes, help="Sort key."),
+    limit: Optional[int] = typer.Option(None, help="Maximum number of tables per database."),
+    schemas: Optional[list[str]] = typer.Option(
+        None, "-s", "--schema", help="1 or more source schemas. Default: schema of the source."
+    ),
+    columns: Optional[bool] = typer.Option(
+        False, "--columns", help="Whether to print the compression of destination columns."
+    ),
+) -> None:
+    project = Project.from_name(project_name)
+    source = PGAdapter(project.settings.source_db)
+    destination = CHAdapter(project.settings.destination_db)
+
+    try:
+        source_stats = source.get_database_stats(schema=schemas or None)
+        destination_stats = destination.get_database_stats()
+    finally:
+        source.close()
+        destination.close()
+
+    app.console.print(
+        _build_stats_table(
+            f"Source: {source.settings.database}",
+            _sort_stats(source_stats, sort_by, limit=limit),
+            ["schema", "table", "rows", "total_bytes", "table_bytes", "index_bytes", "dead_tuples"],
+        )
+    )
+    app.console.print(
+        _build_stats_table(
+            f"Destination: {destination.settings.database}",
+            _sort_stats(destination_stats, sort_by, limit=limit),
+            ["table", "engine", "rows", "total_bytes", "parts", "compression_ratio"],
+        )
+    )
+
+    if columns:
+        for table_stats in _sort_stats(destination_stats, sort_by, limit=limit):
+            if not table_stats.columns:
+                continue
+
+            table = Table(title=f"Destination columns: {table_stats.table}")
+
+            for column in ["column", "type", "compressed", "uncompressed", "ratio"]:
+                table.add_column(
+                    column, justify="left" if column in ["column", "type"] else "right"
+                )
+
+            for column_stats in sorted(
+                table_stats.columns, key=lambda column: column.compressed_bytes, reverse=True
+            ):
+                table.add_row(
+                    column_stats.name,
+                    column_stats.data_type,
+                    _format_bytes(column_stats.compressed_bytes),
+                    _format_bytes(column_stats.uncompressed_bytes),
+                    _format_ratio(column_stats.compression_ratio),
+                )
+
+            app.console.print(table)
+
+
+def _sort_stats(
+    stats: List[TableStats], sort_by: StatsSortKey, limit: Optional[int] = None
+) -> List[TableStats]:
+    if sort_by == StatsSortKey.table:
+        result = sorted(
+            stats, key=lambda table_stats: (table_stats.schema_ or "", table_stats.table)
+        )
+    else:
+        # Tables without a value are listed last
+        result = sorted(
+            stats,
+            key=lambda table_stats: getattr(table_stats, sort_by.value) or 0,
+            reverse=True,
+        )
+
+    return result[:limit] if limit else result
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return ""
+
+    for unit in ["B", "KiB", "MiB", "GiB", "TiB"]:
+        if abs(value) < 1024 or unit == "TiB":
+            break
+
+        value /= 1024
+
+    return f"{value:,.0f} {unit}" if unit == "B" else f"{value:,.1f} {unit}"
+
+
+def _format_ratio(value: Optional[float]) -> str:
+    return "" if value is None else f"{value:,.2f}"
+
+
+def _build_stats_table(title: str, stats: List[TableStats], columns: List[str]) -> Table:
+    table = Table(title=title)
+
+    for column in columns:
+        table.add_column(
+            column, justify="left" if column in ["schema", "table", "engine"] else "right"
+        )
+
+    for table_stats in stats:
+        row = []
+
+        for column in columns:
+            value = getattr(table_stats, "schema_" if column == "schema" else column)
+
+            if column.endswith("_bytes"):
+                row.append(_format_bytes(value))
+            elif column.endswith("_ratio"):
+                row.append(_format_ratio(value))
+            elif isinstance(value, int):
+                row.append(f"{value:,}")
+            else:
+                row.append(value or "")
+
+        table.add_row(*row)
+
+    return table
@@ -1,12 +1,16 @@
 from package.cli.dbt_docs_cli import docs_app
+from package.cli.dbt_history_cli import history_app
 from package.cli.root import app
-from package.config.constants import CODEGEN_TO_CLICKHOUSE_DATA_TYPE
+from package.config.constants import CODEGEN_TO_CLICKHOUSE_DATA_TYPE, PEERDB_DESTINATION_PEER
 from package.dbt import Dbt
+from package.peerdb import PeerDB
 from package.project import Project
 from package.types import DbtResourceType
 from package.utils.filesystem import find_up
+from package.utils.sqlmodel_utils import create_init_file, create_model_files
 from package.utils.yaml_utils import safe_load_file
 from pathlib import Path
+from typing import Optional
 
 import dbt.version
 import json
@@ -18,6 +22,7 @@ import yaml
 
 dbt_app = typer.Typer(name="dbt", add_completion=False)
 dbt_app.add_typer(docs_app)
+dbt_app.add_typer(history_app)
 app.add_typer(dbt_app)
 
 
@@ -26,6 +31,54 @@ def version():
     app.console.print(dbt.version.__version__)
 
 
+@dbt_app.command(help="Generate SQLModel models and factories of sources with a python_class.")
+def sqlmodel(
+    project_name: str,
+    database: Optional[str] = typer.Option(
+        None, help="Database of the source tables. By default, the database of the PeerDB peer."
+    ),
+    extend_primary_key: Optional[bool] = typer.Option(False, "--extend-primary-key"),
+    replace: Optional[bool] = typer.Option(
+        False, "--replace", help="Whether to replace existing models and factories."
+    ),
+):
+    project = Project.from_name(project_name)
+
+    if database is None:
+        peerdb_config = PeerDB.prepare_config(
+            project.settings.peerdb.config,
+            dbt_project_dir=project.dbt_directory,
+            generate_exclude=False,
+        )
+        database = peerdb_config["peers"][PEERDB_DESTINATION_PEER]["clickhouse_config"]["database"]
+
+    dbt = Dbt(project.dbt_directory)
+    sources = [
+        source
+        for source in dbt.list_resources(resource_types=[DbtResourceType.SOURCE])
+        if source.original_config and source.original_config.meta
+    ]
+    directory = project.models_directory
+    os.makedirs(directory, exist_ok=True)
+
+    # The statements of all tables are fetched in a single query
+    create_model_files(
+        project.settings.destination_db,
+        database,
+        sources,
+        directory,
+        extend_primary_key=extend_primary_key,
+        replace_model=replace,
+        replace_factory=replace,
+    )
+    create_init_file(sources, directory)
+
+    app.console.print(
+        f"Generated models of {len(sources)} sources in {directory}",
+        style="green",
+    )
+
+
 @dbt_app.command(help="Generate model YAML.")
 def model_yaml(models: list[str]):
     cwd = os.getcwd()
@@ -0,0 +1,105 @@
+from package.cli.root import app
+from package.database import CHAdapter
+from package.dbt import Dbt, load_run_results
+from package.dbt_history import DbtRunHistory
+from package.project import Project
+from rich.table import Table
+from typing import Any, Dict, List, Optional
+
+import typer
+
+history_app = typer.Typer(name="history", add_completion=False)
+
+
+@history_app.command(help="Record the results of the last dbt run of a project.")
+def ingest(project_name: str) -> None:
+    project = Project.from_name(project_name)
+    dbt = Dbt(project.dbt_directory)
+    summary = load_run_results(dbt.run_results_path)
+    adapter = CHAdapter(project.settings.destination_db)
+
+    try:
+        report = DbtRunHistory(adapter).ingest(summary, dbt)
+    finally:
+        adapter.close()
+
+    app.console.print(
+        f"Recorded {report.rows} results of dbt invocation {summary.invocation_id}", style="green"
+    )
+
+
+@history_app.command(
+    help="Print the slowest models, the biggest regressions and the critical path of dbt runs."
+)
+def report(
+    project_name: str,
+    days: int = typer.Option(7, help="Number of days of runs of the slowest models."),
+    limit: int = typer.Option(20, help="Maximum number of models per table."),
+    baseline_days: int = typer.Option(30, help="Number of days of runs of the baseline."),
+    baseline_runs: int = typer.Option(10, help="Maximum number of runs of the baseline."),
+    invocation_id: Optional[str] = typer.Option(
+        None, help="Invocation of the critical path. Default: latest run."
+    ),
+) -> None:
+    project = Project.from_name(project_name)
+    adapter = CHAdapter(project.settings.destination_db, profile="interactive")
+    history = DbtRunHistory(adapter)
+    dbt_project_name = project.settings.dbt.config["name"]
+
+    try:
+        slowest = history.get_slowest(days=days, limit=limit, project=dbt_project_name)
+        regressions = history.get_regressions(
+            days=baseline_days, baseline_runs=baseline_runs, limit=limit, project=dbt_project_name
+        )
+        critical_path = history.get_critical_path(
+            invocation_id=invocation_id, project=dbt_project_name
+        )
+    finally:
+        adapter.close()
+
+    app.console.print(
+        _build_table(
+            f"Slowest models (last {days} days)",
+            slowest,
+            ["unique_id", "materialization", "runs", "avg_time", "p95_time", "latest_time"],
+        )
+    )
+    app.console.print(
+        _build_table(
+            f"Regressions against the median of the previous {baseline_runs} runs",
+            regressions,
+            ["unique_id", "latest_time", "baseline_time", "baseline_runs", "ratio"],
+        )
+    )
+    app.console.print(
+        _build_table(
+            f"Critical path ({sum(node['execution_time'] for node in critical_path):,.1f}s)",
+            critical_path,
+            ["unique_id", "status", "execution_time"],
+        )
+    )
+
+
+def _format_value(value: Any) -> str:
+    if value is None:
+        return ""
+
+    if isinstance(value, float):
+        return f"{value:,.2f}"
+
+    if isinstance(value, int):
+        return f"{value:,}"
+
+    return str(value)
+
+
+def _build_table(title: str, rows: List[Dict[str, Any]], columns: List[str]) -> Table:
+    table = Table(title=title)
+
+    for column in columns:
+        table.add_column(column, justify="left" if column in ["unique_id", "status"] else "right")
+
+    for row in rows:
+        table.add_row(*[_format_value(row.get(column)) for column in columns])
+
+    return table
@@ -1,16 +1,33 @@
 from package.cli.root import app
 from package.config.constants import PEERDB_DESTINATION_PEER, PEERDB_SOURCE_PEER
+from package.database.adapters.async_base import AsyncAdapter
+from package.database.catalog import Catalog
 from package.peerdb import DestinationPeer, PeerDB, SourcePeer
 from package.project import Project
 from package.types import PGTableIdentifier
 from package.utils.typer_utils import typer_async
 
+import asyncio
 import typer
 
 peerdb_app = typer.Typer(name="peerdb", add_completion=False)
 app.add_typer(peerdb_app)
 
 
+def get_replica_identity_catalog(source_peer: SourcePeer, peerdb_config: dict) -> Catalog:
+    schemas = sorted(
+        set(
+            PGTableIdentifier.from_string(table_mapping["source_table_identifier"]).schema_
+            or source_peer.settings.schema_
+            for mirror in peerdb_config["mirrors"].values()
+            for table_mapping in mirror["table_mappings"]
+            if "replica_identity" in table_mapping
+        )
+    )
+
+    return source_peer.get_catalog(schema=schemas)
+
+
 @peerdb_app.command()
 @typer_async
 async def install(project_name: str) -> None:
@@ -21,76 +38,118 @@ async def install(project_name: str) -> None:
         generate_exclude=True,
     )
     peerdb = PeerDB(project.settings.peerdb.api_url)
-    source_peer = SourcePeer(project.settings.source_db)
-    destination_peer = DestinationPeer(
-        project.settings.destination_db,
-        peerdb_config["peers"][PEERDB_DESTINATION_PEER]["clickhouse_config"]["database"],
+    source_peer = AsyncAdapter(SourcePeer(project.settings.source_db, pool=True))
+    destination_peer = AsyncAdapter(
+        DestinationPeer(
+            project.settings.destination_db,
+            peerdb_config["peers"][PEERDB_DESTINATION_PEER]["clickhouse_config"]["database"],
+        )
     )
     source_user = peerdb_config["users"].get(PEERDB_SOURCE_PEER)
 
-    peerdb.update_settings(peerdb_config["settings"])
-    app.console.print("Updated PeerDB settings", style="green")
+    async def update_settings() -> None:
+        await asyncio.to_thread(peerdb.update_settings, peerdb_config["settings"])
+        app.console.print("Updated PeerDB settings", style="green")
+
+    async def grant_user_privileges(schema: str) -> None:
+        await source_peer.grant_user_privileges(source_user["username"], schema)
+        app.console.print(
+            f"Granted privileges to user '{source_user['username']}' on source schema '{schema}'",
+            style="green",
+        )
+
+    async def set_table_replica_identity(table_mapping: dict, source_catalog: Catalog) -> None:
+        source_table_identifier = PGTableIdentifier.from_string(
+            table_mapping["source_table_identifier"]
+        )
+        await source_peer.set_table_replica_identity(
+            source_table_identifier.table,
+            table_mapping["replica_identity"],
+            database=source_table_identifier.database,
+            schema=source_table_identifier.schema_,
+            catalog=source_catalog,
+        )
+        app.console.print(
+            f"Set replica identity of '{table_mapping['source_table_identifier']}' to '{table_mapping['replica_identity']}'",
+            style="green",
+        )
 
-    if source_user:
-        source_peer.create_user(**source_user)
+    async def create_publication(publication: dict) -> None:
+        await source_peer.create_publication(
+            publication["name"], publication["table_identifiers"], replace=True
+        )
         app.console.print(
-            f"Created user '{source_user['username']}' on source",
+            f"Created publication '{publication['name']}' on source",
             style="green",
         )
 
-        for schema in peerdb_config["publication_schemas"]:
-            source_peer.grant_user_privileges(source_user["username"], schema)
+    async def prepare_source() -> None:
+        if source_user:
+            await source_peer.create_user(**source_user)
             app.console.print(
-                f"Granted privileges to user '{source_user['username']}' on source schema '{schema}'",
+                f"Created user '{source_user['username']}' on source",
                 style="green",
             )
 
-    for mirror in peerdb_config["mirrors"].values():
-        for table_mapping in mirror["table_mappings"]:
-            if "replica_identity" in table_mapping:
-                source_table_identifier = PGTableIdentifier.from_string(
-                    table_mapping["source_table_identifier"]
-                )
-                source_peer.set_table_replica_identity(
-                    source_table_identifier.table,
-                    table_mapping["replica_identity"],
-                    database=source_table_identifier.database,
-                    schema=source_table_identifier.schema_,
-                )
-                app.console.print(
-                    f"Set replica identity of '{table_mapping['source_table_identifier']}' to '{table_mapping['replica_identity']}'",
-                    style="green",
-                )
+            async with asyncio.TaskGroup() as group:
+                for schema in peerdb_config["publication_schemas"]:
+                    group.create_task(grant_user_privileges(schema))
 
-    for publication in peerdb_config["publications"].values():
-        source_peer.create_publication(
-            publication["name"], publication["table_identifiers"], replace=True
+        source_catalog = await source_peer.run_sync(
+            get_replica_identity_catalog, source_peer.adapter, peerdb_config
         )
+
+        async with asyncio.TaskGroup() as group:
+            for mirror in peerdb_config["mirrors"].values():
+                for table_mapping in mirror["table_mappings"]:
+                    if "replica_identity" in table_mapping:
+                        group.create_task(set_table_replica_identity(table_mapping, source_catalog))
+
+        async with asyncio.TaskGroup() as group:
+            for publication in peerdb_config["publications"].values():
+                group.create_task(create_publication(publication))
+
+    async def prepare_destination() -> None:
+        await destination_peer.create_database(destination_peer.database)
         app.console.print(
-            f"Created publication '{publication['name']}' on source",
+            f"Created database '{destination_peer.database}' on destination",
             style="green",
         )
 
-    destination_peer.create_database(destination_peer.database)
-    app.console.print(
-        f"Created database '{destination_peer.database}' on destination",
-        style="green",
-    )
-
-    for peer in peerdb_config["peers"].values():
-        peerdb.create_peer(peer)
+    async def create_peer(peer: dict) -> None:
+        await asyncio.to_thread(peerdb.create_peer, peer)
         app.console.print(
             f"Created PeerDB peer '{peer['name']}'",
             style="green",
         )
 
-    for mirror in peerdb_config["mirrors"].values():
-        peerdb.create_mirror(mirror)
+    async def create_mirror(mirror: dict) -> None:
+        await asyncio.to_thread(peerdb.create_mirror, mirror)
         app.console.print(
             f"Created PeerDB mirror '{mirror['flow_job_name']}'",
             style="green",
         )
 
+    try:
+        # The source, destination and PeerDB settings are independent, so they are prepared
+        # concurrently. Peers are created once the user and database exist. Task groups cancel the
+        # remaining tasks when one fails, so no task uses the adapters after they are closed.
+        async with asyncio.TaskGroup() as group:
+            group.create_task(update_settings())
+            group.create_task(prepare_source())
+            group.create_task(prepare_destination())
+
+        async with asyncio.TaskGroup() as group:
+            for peer in peerdb_config["peers"].values():
+                group.create_task(create_peer(peer))
+
+        async with asyncio.TaskGroup() as group:
+            for mirror in peerdb_config["mirrors"].values():
+                group.create_task(create_mirror(mirror))
+    finally:
+        await source_peer.close()
+        await destination_peer.close()
+
 
 @peerdb_app.command()
 @typer_async
@@ -102,68 +161,75 @@ async def uninstall(project_name: str) -> None:
         generate_exclude=False,
     )
     peerdb = PeerDB(project.settings.peerdb.api_url)
-    source_peer = SourcePeer(project.settings.source_db)
+    source_peer = SourcePeer(project.settings.source_db, pool=True)
     destination_peer = DestinationPeer(
         project.settings.destination_db,
         peerdb_config["peers"][PEERDB_DESTINATION_PEER]["clickhouse_config"]["database"],
     )
     source_user = peerdb_config["users"].get(PEERDB_SOURCE_PEER)
 
-    for mirror in peerdb_config["mirrors"].values():
-        peerdb.drop_mirror(mirror)
-        app.console.print(
-            f"Dropped PeerDB mirror '{mirror['flow_job_name']}'",
-            style="green",
-        )
+    try:
+        for mirror in peerdb_config["mirrors"].values():
+            peerdb.drop_mirror(mirror)
+            app.console.print(
+                f"Dropped PeerDB mirror '{mirror['flow_job_name']}'",
+                style="green",
+            )
 
-    for peer in peerdb_config["peers"].values():
-        peerdb.drop_peer(peer)
-        app.console.print(
-            f"Dropped PeerDB peer '{peer['name']}'",
-            style="green",
-        )
+        for peer in peerdb_config["peers"].values():
+            peerdb.drop_peer(peer)
+            app.console.print(
+                f"Dropped PeerDB peer '{peer['name']}'",
+                style="green",
+            )
 
-    for publication in peerdb_config["publications"].values():
-        source_peer.drop_publication(publication["name"])
-        app.console.print(
-            f"Dropped publication '{publication['name']}' on source",
-            style="green",
-        )
+        for publication in peerdb_config["publications"].values():
+            source_peer.drop_publication(publication["name"])
+            app.console.print(
+                f"Dropped publication '{publication['name']}' on source",
+                style="green",
+            )
 
-    for mirror in peerdb_config["mirrors"].values():
-        for table_mapping in mirror["table_mappings"]:
-            if "replica_identity" in table_mapping:
-                source_table_identifier = PGTableIdentifier.from_string(
-                    table_mapping["source_table_identifier"]
-                )
-                replica_identity = "default"
-                source_peer.set_table_replica_identity(
-                    source_table_identifier.table,
-                    replica_identity,
-                    database=source_table_identifier.database,
-                    schema=source_table_identifier.schema_,
-                )
+        source_catalog = get_replica_identity_catalog(source_peer, peerdb_config)
+
+        for mirror in peerdb_config["mirrors"].values():
+            for table_mapping in mirror["table_mappings"]:
+                if "replica_identity" in table_mapping:
+                    source_table_identifier = PGTableIdentifier.from_string(
+                        table_mapping["source_table_identifier"]
+                    )
+                    replica_identity = "default"
+                    source_peer.set_table_replica_identity(
+                        source_table_identifier.table,
+                        replica_identity,
+                        database=source_table_identifier.database,
+                        schema=source_table_identifier.schema_,
+                        catalog=source_catalog,
+                    )
+                    app.console.print(
+                        f"Set replica identity of '{table_mapping['source_table_identifier']}' to '{replica_identity}'",
+                        style="green",
+                    )
+
+        if source_user:
+            for schema in peerdb_config["publication_schemas"]:
+                source_peer.revoke_user_privileges(source_user["username"], schema)
                 app.console.print(
-                    f"Set replica identity of '{table_mapping['source_table_identifier']}' to '{replica_identity}'",
+                    f"Revoked privileges from user '{source_user['username']}' on source schema '{schema}'",
                     style="green",
                 )
 
-    if source_user:
-        for schema in peerdb_config["publication_schemas"]:
-            source_peer.revoke_user_privileges(source_user["username"], schema)
+            source_peer.drop_user(source_user["username"])
             app.console.print(
-                f"Revoked privileges from user '{source_user['username']}' on source schema '{schema}'",
+                f"Dropped user '{source_user['username']}' on source",
                 style="green",
             )
 
-        source_peer.drop_user(source_user["username"])
+        destination_peer.drop_database(destination_peer.database)
         app.console.print(
-            f"Dropped user '{source_user['username']}' on source",
+            f"Dropped database '{destination_peer.database}' on destination",
             style="green",
         )
-
-    destination_peer.drop_database(destination_peer.database)
-    app.console.print(
-        f"Dropped database '{destination_peer.database}' on destination",
-        style="green",
-    )
+    finally:
+        source_peer.close()
+        destination_peer.close()
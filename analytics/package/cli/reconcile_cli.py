@@ -0,0 +1,104 @@
+from package.cli.root import app
+from package.config.constants import PEERDB_DESTINATION_PEER
+from package.database import CHAdapter, PGAdapter
+from package.peerdb import PeerDB
+from package.project import Project
+from package.reconcile import Reconcile
+from package.types import ReconcileReport
+from typing import Optional
+
+import typer
+
+reconcile_app = typer.Typer(name="reconcile", add_completion=False)
+app.add_typer(reconcile_app)
+
+
+def print_report(report: ReconcileReport) -> None:
+    timings = (
+        f"{report.elapsed:,.1f}s, source {report.source_elapsed:,.1f}s, "
+        f"destination {report.destination_elapsed:,.1f}s"
+    )
+
+    if report.matches:
+        app.console.print(
+            f"'{report.source_table}' matches '{report.destination_table}' "
+            f"({report.source_rows:,} rows, {report.ranges} ranges in {timings})",
+            style="green",
+        )
+    else:
+        app.console.print(
+            f"'{report.source_table}' does not match '{report.destination_table}' "
+            f"({report.source_rows:,} source rows, {report.destination_rows:,} destination rows, "
+            f"{len(report.mismatched_ranges)} of {report.ranges} ranges mismatch in {timings})",
+            style="red",
+        )
+
+        for range_ in report.mismatched_ranges:
+            if range_.start is not None:
+                app.console.print(
+                    f"  [{range_.start}, {range_.end}): {range_.source_rows:,} source rows, "
+                    f"{range_.destination_rows:,} destination rows"
+                )
+
+        for name in ["missing_keys", "extra_keys", "different_keys"]:
+            if keys := getattr(report, name):
+                app.console.print(f"  {name}: {', '.join(str(key) for key in keys)}")
+
+    if report.skipped_columns:
+        app.console.print(f"  Skipped columns: {', '.join(report.skipped_columns)}", style="yellow")
+
+
+@reconcile_app.command(
+    help="Compare mirrored tables of the source and destination databases by checksums."
+)
+def run(
+    project_name: str,
+    tables: Optional[list[str]] = typer.Option(
+        None, "-t", "--table", help="1 or more source table identifiers. By default, all tables."
+    ),
+    workers: int = typer.Option(4, help="Number of queries per database that run in parallel."),
+    ranges: int = typer.Option(16, help="Number of key ranges that a table is split into."),
+    fanout: int = typer.Option(
+        16, help="Number of key ranges that a mismatching range is split into."
+    ),
+    leaf_rows: int = typer.Option(1000, help="Number of rows below which rows are compared."),
+    max_keys: int = typer.Option(100, help="Maximum number of reported keys per kind."),
+) -> None:
+    project = Project.from_name(project_name)
+    peerdb_config = PeerDB.prepare_config(
+        project.settings.peerdb.config,
+        dbt_project_dir=project.dbt_directory,
+        generate_exclude=True,
+    )
+    database = peerdb_config["peers"][PEERDB_DESTINATION_PEER]["clickhouse_config"]["database"]
+    table_mappings = [
+        table_mapping
+        for mirror in peerdb_config["mirrors"].values()
+        for table_mapping in mirror["table_mappings"]
+        if not tables or table_mapping["source_table_identifier"] in tables
+    ]
+
+    source = PGAdapter(project.settings.source_db, pool=True, pool_max_size=workers)
+    destination = CHAdapter(project.settings.destination_db, pool_size=workers, profile="batch")
+    reconcile = Reconcile(
+        source,
+        destination,
+        workers=workers,
+        ranges=ranges,
+        fanout=fanout,
+        leaf_rows=leaf_rows,
+        max_keys=max_keys,
+    )
+    mismatches = 0
+
+    try:
+        for table_mapping in table_mappings:
+            report = reconcile.run(table_mapping, database=database)
+            print_report(report)
+            mismatches += not report.matches
+    finally:
+        source.close()
+        destination.close()
+
+    if mismatches:
+        raise typer.Exit(code=1)
@@ -1,9 +1,13 @@
 __all__ = [
+    "AsyncCHAdapter",
+    "AsyncPGAdapter",
     "CHAdapter",
     "PGAdapter",
     "render_statement",
 ]
 
+from .adapters.async_clickhouse import AsyncCHAdapter
+from .adapters.async_postgres import AsyncPGAdapter
 from .adapters.clickhouse import CHAdapter
 from .adapters.postgres import PGAdapter
 from .utils import render_statement
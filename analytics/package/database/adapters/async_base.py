@@ -0,0 +1,107 @@
+from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager, asynccontextmanager
+from package.database.adapters.base import BaseAdapter
+from typing import Any, Callable, Iterator, Optional
+
+import asyncio
+import contextvars
+import functools
+import inspect
+
+# Methods of the adapter that do not do I/O, or return context managers, which are not wrapped
+SYNC_METHODS = [
+    "add_listener",
+    "create_engine",
+    "create_session",
+    "create_url",
+    "get_engine",
+    "get_profile",
+    "instrument",
+    "invalidate_results",
+    "pool_stats",
+    "remove_listener",
+    "resolve_settings",
+]
+
+
+class AsyncAdapter:
+    """Async counterpart of an adapter, with the same method surface.
+
+    Methods that are not implemented natively run the method of the adapter in a thread pool, so
+    they do not block the event loop. Both share the pool, listeners and caches of the adapter.
+    """
+
+    def __init__(self, adapter: BaseAdapter, max_workers: Optional[int] = None) -> None:
+        self.adapter = adapter
+        self.settings = adapter.settings
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"{adapter.dialect}_async"
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.adapter, name)
+
+        if name.startswith("_") or name in SYNC_METHODS or not callable(attribute):
+            return attribute
+
+        if inspect.isgeneratorfunction(attribute):
+
+            @functools.wraps(attribute)
+            def iterate(*args, **kwargs) -> AsyncGenerator[Any, None]:
+                return self.iterate(attribute(*args, **kwargs))
+
+            return iterate
+
+        @functools.wraps(attribute)
+        async def run(*args, **kwargs) -> Any:
+            return await self.run_sync(attribute, *args, **kwargs)
+
+        return run
+
+    async def __aenter__(self) -> "AsyncAdapter":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.close()
+
+    async def run_sync(self, function: Callable, *args, **kwargs) -> Any:
+        """Run a blocking function in the thread pool of the adapter."""
+        loop = asyncio.get_running_loop()
+        # Copy the context, so the query instrumentation sees the context variables of the caller
+        context = contextvars.copy_context()
+
+        return await loop.run_in_executor(
+            self._executor, functools.partial(context.run, function, *args, **kwargs)
+        )
+
+    async def iterate(self, iterator: Iterator[Any]) -> AsyncGenerator[Any, None]:
+        """Consume a blocking iterator in the thread pool, one item at a time."""
+        done = object()
+
+        try:
+            while (item := await self.run_sync(next, iterator, done)) is not done:
+                yield item
+        finally:
+            # Close the generator in the thread pool, because closing may release a connection
+            if hasattr(iterator, "close"):
+                await self.run_sync(iterator.close)
+
+    @asynccontextmanager
+    async def enter(self, context: AbstractContextManager) -> AsyncGenerator[Any, None]:
+        """Enter and exit a blocking context manager in the thread pool."""
+        value = await self.run_sync(context.__enter__)
+
+        try:
+            yield value
+        except BaseException as e:
+            if not await self.run_sync(context.__exit__, type(e), e, e.__traceback__):
+                raise
+        else:
+            await self.run_sync(context.__exit__, None, None, None)
+
+    async def close(self) -> None:
+        # Wait for the calls that are still running in the thread pool (e.g. of cancelled tasks)
+        # before closing the adapter they use
+        await asyncio.to_thread(self._executor.shutdown, wait=True)
+        await asyncio.to_thread(self.adapter.close)
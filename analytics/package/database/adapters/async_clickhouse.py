@@ -0,0 +1,72 @@
+from clickhouse_connect.driver.asyncclient import AsyncClient
+from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from package.database.adapters.async_base import AsyncAdapter
+from package.database.adapters.clickhouse import CHAdapter
+from package.types import CHSettings
+from typing import Any, Optional
+
+import asyncio
+
+
+class PooledAsyncClient(AsyncClient):
+    """Async client over a pooled client, which runs queries in the thread pool of the adapter."""
+
+    def __init__(self, client: Any, executor: ThreadPoolExecutor) -> None:
+        super().__init__(client=client, executor_threads=1)
+        # Queries run in the thread pool of the adapter instead of a thread pool per client. The
+        # thread pool created by AsyncClient has not started any threads yet.
+        self.executor.shutdown(wait=False)
+        self.executor = executor
+
+    async def close(self) -> None:
+        raise Exception("Pooled clients are returned to the pool by the adapter")
+
+
+class AsyncCHAdapter(AsyncAdapter):
+    """Async counterpart of CHAdapter. Like the async client of clickhouse-connect, queries run in
+    a thread pool.
+    """
+
+    adapter_class = CHAdapter
+
+    def __init__(
+        self,
+        settings: CHSettings,
+        pool_size: int = 4,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(
+            self.adapter_class(settings, pool_size=pool_size, **kwargs), max_workers=max_workers
+        )
+        # Queries of acquired clients run in a separate thread pool, so they can not be starved by
+        # methods that wait for a client in the thread pool of the adapter
+        self._client_executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="clickhouse_client"
+        )
+
+    @asynccontextmanager
+    async def create_client(self) -> AsyncGenerator[AsyncClient, None]:
+        pool = self.adapter.pool
+        client = await self.run_sync(pool.acquire)
+        failed = False
+
+        try:
+            yield PooledAsyncClient(client, self._client_executor)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            # Resetting or closing the client does I/O, so it must not block the event loop
+            await self.run_sync(pool.release, client, check=failed)
+
+    @asynccontextmanager
+    async def shadow_table(self, table: str, *args, **kwargs) -> AsyncGenerator[str, None]:
+        async with self.enter(self.adapter.shadow_table(table, *args, **kwargs)) as shadow_table:
+            yield shadow_table
+
+    async def close(self) -> None:
+        await asyncio.to_thread(self._client_executor.shutdown, wait=True)
+        await super().close()
@@ -0,0 +1,161 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from package.database.adapters.async_base import AsyncAdapter
+from package.database.adapters.postgres import PGAdapter
+from package.types import PGSettings
+from typing import Any, List, Optional, Sequence
+
+import asyncio
+import asyncpg
+import re
+
+_parameter_pattern = re.compile(r"%\((\w+)\)s|%s|%%")
+
+
+def convert_parameters(
+    query: str, parameters: Optional[dict | Sequence] = None
+) -> tuple[str, List[Any]]:
+    """Convert a query with psycopg2 placeholders (%(name)s or %s) to asyncpg placeholders ($1)."""
+    if parameters is None:
+        return query, []
+
+    args = []
+    positions = {}
+    values = iter(parameters) if not isinstance(parameters, dict) else None
+
+    def replace(match: re.Match) -> str:
+        if match.group(0) == "%%":
+            return "%"
+
+        name = match.group(1)
+
+        if name is None:
+            args.append(next(values))
+            return f"${len(args)}"
+
+        if name not in positions:
+            args.append(parameters[name])
+            positions[name] = len(args)
+
+        return f"${positions[name]}"
+
+    return _parameter_pattern.sub(replace, query), args
+
+
+class AsyncPGAdapter(AsyncAdapter):
+    """Async counterpart of PGAdapter. Queries of its clients run on asyncpg connections from a
+    native pool. The other methods run the method of PGAdapter in a thread pool.
+    """
+
+    adapter_class = PGAdapter
+
+    def __init__(
+        self,
+        settings: PGSettings,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_idle_timeout: Optional[float] = 300,
+        pool_timeout: Optional[float] = 30,
+        max_workers: Optional[int] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(
+            self.adapter_class(
+                settings,
+                pool=True,
+                pool_min_size=pool_min_size,
+                pool_max_size=pool_max_size,
+                pool_idle_timeout=pool_idle_timeout,
+                pool_timeout=pool_timeout,
+                **kwargs,
+            ),
+            max_workers=max_workers,
+        )
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_timeout = pool_timeout
+        self._pool: asyncpg.Pool | None = None
+        self._pool_lock = asyncio.Lock()
+
+    async def get_pool(self) -> asyncpg.Pool:
+        if self._pool is None:
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await asyncpg.create_pool(
+                        host=self.settings.host,
+                        port=self.settings.port,
+                        user=self.settings.username,
+                        password=self.settings.password,
+                        database=self.settings.database,
+                        min_size=self.pool_min_size,
+                        max_size=self.pool_max_size,
+                        max_inactive_connection_lifetime=self.pool_idle_timeout or 0,
+                    )
+
+        return self._pool
+
+    @asynccontextmanager
+    async def create_client(self) -> AsyncGenerator[asyncpg.Connection, None]:
+        """Acquire a connection. Its queries are not reported to the listeners, unlike the
+        queries of fetch(), execute() and stream().
+        """
+        pool = await self.get_pool()
+
+        async with pool.acquire(timeout=self.pool_timeout) as connection:
+            yield connection
+
+    async def fetch(
+        self, query: str, parameters: Optional[dict | Sequence] = None
+    ) -> List[asyncpg.Record]:
+        query, args = convert_parameters(query, parameters)
+
+        async with self.create_client() as connection:
+            with self.adapter.instrument("fetch", query) as event:
+                rows = await connection.fetch(query, *args)
+                event.rows_read = len(rows)
+
+        return rows
+
+    async def execute(self, query: str, parameters: Optional[dict | Sequence] = None) -> str:
+        query, args = convert_parameters(query, parameters)
+
+        async with self.create_client() as connection:
+            with self.adapter.instrument("execute", query) as event:
+                status = await connection.execute(query, *args)
+                command = status.split(" ")
+
+                if command[0] in ["DELETE", "INSERT", "MERGE", "UPDATE"] and command[-1].isdigit():
+                    event.rows_written = int(command[-1])
+
+        return status
+
+    async def stream(
+        self,
+        query: str,
+        parameters: Optional[dict | Sequence] = None,
+        batch_size: int = 10000,
+    ) -> AsyncGenerator[List[tuple], None]:
+        """Yield the result of a query lazily, in batches of rows."""
+        query, args = convert_parameters(query, parameters)
+
+        async with self.create_client() as connection:
+            # Cursors only exist in a transaction
+            async with connection.transaction(readonly=True):
+                with self.adapter.instrument("stream", query) as event:
+                    event.rows_read = 0
+                    cursor = await connection.cursor(query, *args)
+
+                    while rows := await cursor.fetch(batch_size):
+                        event.rows_read += len(rows)
+                        yield [tuple(row) for row in rows]
+
+    async def close(self) -> None:
+        async with self._pool_lock:
+            pool = self._pool
+            self._pool = None
+
+        if pool is not None:
+            await pool.close()
+
+        await super().close()
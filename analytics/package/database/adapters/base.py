@@ -1,14 +1,136 @@
 from abc import ABC, abstractmethod
 from contextlib import contextmanager
-from package.types import CHSettings, PGSettings
-from sqlalchemy import URL
-from sqlmodel import create_engine, Session, Table
-from typing import Any, Generator, List, Optional, overload
+from package.database.cache import ReflectionCache
+from package.database.catalog import Catalog
+from package.database.instrumentation import (
+    create_fingerprint,
+    opened_connection,
+    pending_acquire,
+    QueryEvent,
+    QueryListener,
+)
+from package.types import CHSettings, PGSettings, TableOperationReport, TableStats
+from sqlalchemy import Engine, event, inspect, URL
+from sqlmodel import create_engine, MetaData, Session, Table
+from typing import Any, Dict, Generator, List, Optional, overload
+
+import logging
+import pydash
+import threading
+import time
+
+DEFAULT_ENGINE_OPTIONS = {
+    "pool_pre_ping": True,
+    "pool_recycle": 3600,
+}
 
 
 class BaseAdapter(ABC):
-    def __init__(self, settings: CHSettings | PGSettings) -> None:
+    dialect: str
+
+    def __init__(
+        self,
+        settings: CHSettings | PGSettings,
+        engine_options: Optional[dict] = None,
+        reflection_ttl: Optional[float] = 300,
+        listeners: Optional[List[QueryListener]] = None,
+    ) -> None:
         self.settings = settings
+        self.engine_options = {**DEFAULT_ENGINE_OPTIONS, **(engine_options or {})}
+        self.reflection_cache = ReflectionCache(ttl=reflection_ttl)
+        self.listeners: List[QueryListener] = list(listeners or [])
+        self._engines: dict[str, Engine] = {}
+        self._engines_lock = threading.Lock()
+
+    def add_listener(self, listener: QueryListener) -> None:
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener: QueryListener) -> None:
+        self.listeners.remove(listener)
+
+    def _notify(self, method: str, query_event: QueryEvent) -> None:
+        for listener in self.listeners:
+            # A failing listener must not fail the query
+            try:
+                getattr(listener, method)(query_event)
+            except Exception:
+                logging.getLogger(__name__).exception(f"Query listener {listener!r} failed")
+
+    @contextmanager
+    def instrument(
+        self,
+        operation: str,
+        statement: str,
+        query_id: Optional[str] = None,
+        settings: Optional[dict] = None,
+    ) -> Generator[QueryEvent, Any, None]:
+        """Notify the listeners of the start and end of a query. The caller can set the rows and
+        bytes of the yielded event.
+        """
+        query_event = QueryEvent(
+            adapter=self.dialect,
+            operation=operation,
+            statement=statement,
+            # Fingerprinting is skipped when nobody is listening
+            fingerprint=create_fingerprint(statement) if self.listeners else "",
+            query_id=query_id,
+            settings=settings or None,
+            started_at=time.time(),
+        )
+        acquire = pending_acquire.get()
+
+        if acquire is not None:
+            query_event.acquire_wait, query_event.connected = acquire
+            pending_acquire.set(None)
+
+        self._notify("on_query_start", query_event)
+        started_at = time.perf_counter()
+
+        try:
+            yield query_event
+        except BaseException as e:
+            query_event.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            query_event.duration = time.perf_counter() - started_at
+            self._notify("on_query_end", query_event)
+
+    @classmethod
+    def _start_acquire(cls) -> float:
+        opened_connection.set(False)
+
+        return time.perf_counter()
+
+    @classmethod
+    def _end_acquire(cls, started_at: float) -> None:
+        pending_acquire.set((time.perf_counter() - started_at, opened_connection.get()))
+
+    @classmethod
+    def _mark_connected(cls) -> None:
+        opened_connection.set(True)
+
+    def _instrument_engine(self, engine: Engine) -> None:
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            context._instrument = self.instrument("execute", statement)
+            context._query_event = context._instrument.__enter__()
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                if context.isinsert or context.isupdate or context.isdelete:
+                    context._query_event.rows_written = cursor.rowcount
+
+            context._instrument.__exit__(None, None, None)
+
+        def handle_error(exception_context):
+            context = exception_context.execution_context
+            error = exception_context.original_exception
+
+            if context is not None and hasattr(context, "_instrument"):
+                context._instrument.__exit__(type(error), error, error.__traceback__)
+
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", after_cursor_execute)
+        event.listen(engine, "handle_error", handle_error)
 
     @overload
     @classmethod
@@ -44,22 +166,85 @@ class BaseAdapter(ABC):
     @abstractmethod
     def create_client(): ...
 
-    @contextmanager
-    def create_engine(self):
-        engine = create_engine(self.url, echo=False)
+    def get_engine(self, url: Optional[URL] = None) -> Engine:
+        if url is None:
+            url = self.url
+
+        key = url.render_as_string(hide_password=False)
 
-        yield engine
+        with self._engines_lock:
+            if key not in self._engines:
+                engine = create_engine(url, echo=False, **self.engine_options)
+                self._instrument_engine(engine)
+                self._engines[key] = engine
 
-        engine.dispose()
+            return self._engines[key]
+
+    @contextmanager
+    def create_engine(self) -> Generator[Engine, Any, None]:
+        yield self.get_engine()
 
     @contextmanager
     def create_session(self) -> Generator[Session, Any, None]:
-        with self.create_engine() as engine:
-            session = Session(engine)
+        session = Session(self.get_engine())
+
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def reflect_tables(
+        self,
+        schema: str,
+        tables: Optional[List[str]] = None,
+        url: Optional[URL] = None,
+    ) -> List[Table]:
+        """Reflect the given tables (default: all tables) of a schema, reusing cached tables."""
+        if url is None:
+            url = self.url
+
+        engine = self.get_engine(url)
 
-        yield session
+        if tables is None:
+            inspector = inspect(engine)
+            tables = pydash.uniq(
+                inspector.get_table_names(schema=schema) + inspector.get_view_names(schema=schema)
+            )
 
-        session.close()
+        result = {}
+        missing = set()
+
+        for table in tables:
+            value = self.reflection_cache.get(url, schema, table)
+
+            if value is None:
+                missing.add(table)
+            else:
+                result[table] = value
+
+        if missing:
+            metadata = MetaData(schema=schema)
+            metadata.reflect(bind=engine, views=True, only=lambda name, _: name in missing)
+
+            for table in missing:
+                value = metadata.tables.get(f"{schema}.{table}")
+
+                if value is not None:
+                    self.reflection_cache.set(url, schema, table, value)
+                    result[table] = value
+
+        return [result[table] for table in tables if table in result]
+
+    def dispose(self) -> None:
+        with self._engines_lock:
+            engines = list(self._engines.values())
+            self._engines.clear()
+
+        for engine in engines:
+            engine.dispose()
+
+    def close(self) -> None:
+        self.dispose()
 
     @abstractmethod
     def has_database(self, database: str) -> bool: ...
@@ -83,17 +268,75 @@ class BaseAdapter(ABC):
 
     @overload
     @abstractmethod
-    def has_table(self, table: str, database: Optional[str] = None) -> bool: ...
+    def has_table(
+        self, table: str, database: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> bool: ...
 
     @overload
     @abstractmethod
     def has_table(
-        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+        self,
+        table: str,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> bool: ...
 
     @abstractmethod
     def has_table(self, *args, **kwargs) -> bool: ...
 
+    @overload
+    @abstractmethod
+    def has_tables(self, tables: List[str], database: Optional[str] = None) -> Dict[str, bool]: ...
+
+    @overload
+    @abstractmethod
+    def has_tables(
+        self, tables: List[str], database: Optional[str] = None, schema: Optional[str] = None
+    ) -> Dict[str, bool]: ...
+
+    @abstractmethod
+    def has_tables(self, *args, **kwargs) -> Dict[str, bool]: ...
+
+    @overload
+    @abstractmethod
+    def get_catalog(self, database: Optional[str] = None) -> Catalog: ...
+
+    @overload
+    @abstractmethod
+    def get_catalog(
+        self, database: Optional[str] = None, schema: Optional[str | List[str]] = None
+    ) -> Catalog: ...
+
+    @abstractmethod
+    def get_catalog(self, *args, **kwargs) -> Catalog: ...
+
+    @overload
+    @abstractmethod
+    def get_table_stats(self, table: str, database: Optional[str] = None) -> TableStats: ...
+
+    @overload
+    @abstractmethod
+    def get_table_stats(
+        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+    ) -> TableStats: ...
+
+    @abstractmethod
+    def get_table_stats(self, *args, **kwargs) -> TableStats: ...
+
+    @overload
+    @abstractmethod
+    def get_database_stats(self, database: Optional[str] = None) -> List[TableStats]: ...
+
+    @overload
+    @abstractmethod
+    def get_database_stats(
+        self, database: Optional[str] = None, schema: Optional[str | List[str]] = None
+    ) -> List[TableStats]: ...
+
+    @abstractmethod
+    def get_database_stats(self, *args, **kwargs) -> List[TableStats]: ...
+
     @overload
     @abstractmethod
     def create_table(
@@ -133,12 +376,18 @@ class BaseAdapter(ABC):
 
     @overload
     @abstractmethod
-    def drop_table(self, table: str, database: Optional[str] = None) -> None: ...
+    def drop_table(
+        self, table: str, database: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> None: ...
 
     @overload
     @abstractmethod
     def drop_table(
-        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+        self,
+        table: str,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None: ...
 
     @abstractmethod
@@ -146,12 +395,18 @@ class BaseAdapter(ABC):
 
     @overload
     @abstractmethod
-    def truncate_table(self, table: str, database: Optional[str] = None) -> None: ...
+    def truncate_table(
+        self, table: str, database: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> None: ...
 
     @overload
     @abstractmethod
     def truncate_table(
-        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+        self,
+        table: str,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None: ...
 
     @abstractmethod
@@ -172,7 +427,9 @@ class BaseAdapter(ABC):
 
     @overload
     @abstractmethod
-    def get_table_replica_identity(self, table: str, database: Optional[str] = None) -> None: ...
+    def get_table_replica_identity(
+        self, table: str, database: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> None: ...
 
     @overload
     @abstractmethod
@@ -181,6 +438,7 @@ class BaseAdapter(ABC):
         table: str,
         database: Optional[str] = None,
         schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None: ...
 
     @abstractmethod
@@ -189,7 +447,11 @@ class BaseAdapter(ABC):
     @overload
     @abstractmethod
     def set_table_replica_identity(
-        self, table: str, replica_identity: str, database: Optional[str] = None
+        self,
+        table: str,
+        replica_identity: str,
+        database: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None: ...
 
     @overload
@@ -200,6 +462,7 @@ class BaseAdapter(ABC):
         replica_identity: str,
         database: Optional[str] = None,
         schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None: ...
 
     @abstractmethod
@@ -207,14 +470,39 @@ class BaseAdapter(ABC):
 
     @overload
     @abstractmethod
-    def drop_tables(self, database: Optional[str] = None) -> None: ...
+    def drop_tables(
+        self, database: Optional[str] = None, tables: Optional[List[str]] = None
+    ) -> TableOperationReport: ...
 
     @overload
     @abstractmethod
-    def drop_tables(self, database: Optional[str] = None, schema: Optional[str] = None) -> None: ...
+    def drop_tables(
+        self,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        tables: Optional[List[str]] = None,
+    ) -> TableOperationReport: ...
+
+    @abstractmethod
+    def drop_tables(self, *args, **kwargs) -> TableOperationReport: ...
+
+    @overload
+    @abstractmethod
+    def truncate_tables(
+        self, database: Optional[str] = None, tables: Optional[List[str]] = None
+    ) -> TableOperationReport: ...
+
+    @overload
+    @abstractmethod
+    def truncate_tables(
+        self,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        tables: Optional[List[str]] = None,
+    ) -> TableOperationReport: ...
 
     @abstractmethod
-    def drop_tables(self, *args, **kwargs) -> None: ...
+    def truncate_tables(self, *args, **kwargs) -> TableOperationReport: ...
 
     @overload
     @abstractmethod
@@ -1,19 +1,168 @@
 from clickhouse_connect.driver.client import Client
 from collections.abc import Generator
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from package.database.adapters.base import BaseAdapter
-from package.types import CHIdentifier, CHSettings, CHTableIdentifier
+from package.database.catalog import Catalog, CatalogColumn, CatalogTable
+from package.database.instrumentation import QueryListener
+from package.database.pool import Pool
+from package.database.result_cache import ResultCache
+from package.types import (
+    CHIdentifier,
+    CHSettings,
+    CHTableIdentifier,
+    ColumnStats,
+    InsertReport,
+    Partition,
+    PartitionOperationReport,
+    StreamFormat,
+    TableOperationReport,
+    TableOperationTiming,
+    TableStats,
+)
 from sqlalchemy import URL
-from sqlmodel import create_engine, MetaData, Table
-from typing import List, Optional
+from sqlmodel import Table
+from typing import Any, Callable, Dict, Iterable, List, Optional, TYPE_CHECKING
 
 import clickhouse_connect
+import functools
+import logging
+import pandas as pd
+import pyarrow as pa
 import pydash
+import threading
+import time
+import uuid
+
+if TYPE_CHECKING:
+    import polars as pl
+
+# Client methods that are instrumented, and the position of their `settings` argument
+INSTRUMENTED_METHODS = {
+    "command": 3,
+    "insert": 7,
+    "insert_arrow": 3,
+    "insert_df": 3,
+    "query": 2,
+    "query_arrow": 2,
+    "query_arrow_stream": 2,
+    "query_df": 2,
+    "query_df_stream": 2,
+    "query_row_block_stream": 2,
+    "raw_insert": 3,
+    "raw_query": 2,
+    "raw_stream": 2,
+}
+INSTRUMENTED_INSERT_METHODS = ["insert", "insert_arrow", "insert_df", "raw_insert"]
+
+# Settings of the Arrow output format. LowCardinality columns are returned as dictionary arrays,
+# and buffers are not compressed, so the Arrow arrays can reference the response without copies.
+ARROW_SETTINGS = {
+    "output_format_arrow_compression_method": "none",
+    "output_format_arrow_low_cardinality_as_dictionary": 1,
+}
+
+
+class InstrumentedClient:
+    """Proxy of a client that reports queries to the listeners of an adapter, and tags them with
+    a query_id and log_comment so they can be found in system.query_log.
+    """
+
+    def __init__(self, client: Client, adapter: "CHAdapter") -> None:
+        self.client = client
+        self.adapter = adapter
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self.client, name)
+
+        if name in INSTRUMENTED_METHODS:
+            return functools.partial(self._call, name, attribute)
+
+        return attribute
+
+    def _call(self, name: str, method, *args, **kwargs) -> Any:
+        context = kwargs.get("context")
+
+        if name in INSTRUMENTED_INSERT_METHODS:
+            table = context.table if context is not None else (args[0] if args else kwargs["table"])
+            statement = f"insert into {table}"
+        else:
+            statement = args[0] if args else kwargs.get("query", kwargs.get("cmd", ""))
+
+        tags = {"query_id": str(uuid.uuid4())}
+
+        if self.adapter.log_comment is not None:
+            tags["log_comment"] = self.adapter.log_comment
+
+        # Settings given by the caller take precedence, so a query_id of the caller is kept
+        if context is not None:
+            # The settings argument is ignored if an insert context is given
+            settings = self.adapter.resolve_settings(context.settings)
+            context.settings = sent = {**tags, **settings}
+        elif len(args) <= INSTRUMENTED_METHODS[name]:
+            settings = self.adapter.resolve_settings(kwargs.get("settings"))
+            kwargs["settings"] = sent = {**tags, **settings}
+        else:
+            args = list(args)
+            settings = self.adapter.resolve_settings(args[INSTRUMENTED_METHODS[name]])
+            args[INSTRUMENTED_METHODS[name]] = sent = {**tags, **settings}
+
+        with self.adapter.instrument(
+            name,
+            statement,
+            query_id=sent["query_id"],
+            settings=settings,
+        ) as event:
+            result = method(*args, **kwargs)
+            summary = getattr(result, "summary", None)
+
+            if isinstance(summary, dict):
+                event.rows_read = int(summary.get("read_rows", 0))
+                event.bytes_read = int(summary.get("read_bytes", 0))
+                event.rows_written = int(summary.get("written_rows", 0))
+                event.bytes_written = int(summary.get("written_bytes", 0))
+
+        return result
 
 
 class CHAdapter(BaseAdapter):
-    def __init__(self, settings: CHSettings) -> None:
-        super().__init__(settings)
+    dialect = "clickhouse"
+
+    def __init__(
+        self,
+        settings: CHSettings,
+        pool_size: int = 4,
+        pool_idle_timeout: Optional[float] = 300,
+        pool_health_check_interval: Optional[float] = 30,
+        pool_timeout: Optional[float] = 30,
+        engine_options: Optional[dict] = None,
+        reflection_ttl: Optional[float] = 300,
+        compress: Optional[bool | str] = None,
+        listeners: Optional[List[QueryListener]] = None,
+        log_comment: Optional[str] = "package",
+        result_cache: Optional[ResultCache] = None,
+        profile: Optional[str] = None,
+    ) -> None:
+        super().__init__(
+            settings,
+            engine_options=engine_options,
+            reflection_ttl=reflection_ttl,
+            listeners=listeners,
+        )
+        self.pool_size = pool_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_health_check_interval = pool_health_check_interval
+        self.pool_timeout = pool_timeout
+        self.compress = compress
+        self.log_comment = log_comment
+        self.result_cache = result_cache
+        self.profile = profile
+        self._pool = None
+        self._background_executor = None
+        self._pool_lock = threading.Lock()
+
+        if profile is not None:
+            self.get_profile(profile)
 
     @classmethod
     def create_url(
@@ -59,25 +208,380 @@ class CHAdapter(BaseAdapter):
             self.settings.secure,
         )
 
-    @contextmanager
-    def create_client(self) -> Generator[Client | None]:
+    @property
+    def pool(self) -> Pool[Client]:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = Pool(
+                        create=self._connect,
+                        close=lambda client: client.close(),
+                        check=lambda client: client.ping(),
+                        max_size=self.pool_size,
+                        idle_timeout=self.pool_idle_timeout,
+                        health_check_interval=self.pool_health_check_interval,
+                        timeout=self.pool_timeout,
+                    )
+
+        return self._pool
+
+    def _connect(self, database: Optional[str] = None) -> Client:
+        if database is None:
+            database = self.settings.database
+
         if self.settings.driver == "native":
             port = self.settings.tcp_port
         else:
             port = self.settings.http_port
 
+        options = {}
+
+        if self.compress is not None:
+            options["compress"] = self.compress
+
         client = clickhouse_connect.get_client(
             host=self.settings.host,
             port=port,
             username=self.settings.username,
             password=self.settings.password,
-            database=self.settings.database,
+            database=database,
             secure=self.settings.secure,
+            **options,
+        )
+        self._mark_connected()
+
+        return InstrumentedClient(client, self)
+
+    def get_profile(self, name: str) -> Dict[str, Any]:
+        if name not in self.settings.profiles:
+            raise Exception(f"Settings profile '{name}' not found")
+
+        return self.settings.profiles[name]
+
+    def resolve_settings(self, settings: Optional[str | dict] = None) -> Dict[str, Any]:
+        """Return the settings of a query: the settings of the default profile of the adapter,
+        overridden by a profile (by name) or a dict of settings.
+        """
+        if isinstance(settings, str):
+            settings = self.get_profile(settings)
+
+        defaults = self.get_profile(self.profile) if self.profile is not None else {}
+
+        return {**defaults, **(settings or {})}
+
+    @contextmanager
+    def create_client(self) -> Generator[Client | None]:
+        started_at = self._start_acquire()
+
+        with self.pool.connection() as client:
+            self._end_acquire(started_at)
+
+            yield client
+
+    def stream(
+        self,
+        query: str,
+        parameters: Optional[dict] = None,
+        format: Optional[StreamFormat] = StreamFormat.ROWS,
+        block_size: Optional[int] = None,
+        settings: Optional[str | dict] = None,
+    ) -> Generator[Any, None, None]:
+        """Yield the result of a query lazily, one block at a time."""
+        settings = self.resolve_settings(settings)
+
+        if block_size is not None:
+            settings["max_block_size"] = block_size
+
+        if format == StreamFormat.ARROW:
+            settings = {**ARROW_SETTINGS, **settings}
+
+        with self.create_client() as client:
+            if format == StreamFormat.ARROW:
+                stream = client.query_arrow_stream(query, parameters=parameters, settings=settings)
+            elif format == StreamFormat.PANDAS:
+                stream = client.query_df_stream(query, parameters=parameters, settings=settings)
+            else:
+                stream = client.query_row_block_stream(
+                    query, parameters=parameters, settings=settings
+                )
+
+            # Blocks are only read from the response as they are consumed. Closing the generator
+            # early closes the response before the client is returned to the pool.
+            with stream:
+                yield from stream
+
+    def query_df(
+        self,
+        query: str,
+        parameters: Optional[dict] = None,
+        settings: Optional[str | dict] = None,
+        ttl: Optional[float] = None,
+        cache: Optional[bool] = True,
+        dtype_backend: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Run a query and return the result as a DataFrame, from the result cache if enabled.
+        With dtype_backend="pyarrow", the columns are backed by the Arrow result without copies.
+        """
+        if dtype_backend == "pyarrow":
+            table = self.query_arrow(
+                query, parameters=parameters, settings=settings, ttl=ttl, cache=cache
+            )
+
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+
+        settings = self.resolve_settings(settings)
+
+        def compute() -> pd.DataFrame:
+            with self.create_client() as client:
+                return client.query_df(query, parameters=parameters, settings=settings)
+
+        return self._query_cached(
+            query, compute, parameters, "df", settings=settings, ttl=ttl, cache=cache
+        )
+
+    def query_arrow(
+        self,
+        query: str,
+        parameters: Optional[dict] = None,
+        settings: Optional[str | dict] = None,
+        ttl: Optional[float] = None,
+        cache: Optional[bool] = True,
+    ) -> pa.Table:
+        """Run a query and return the result as an Arrow table, read from the Arrow output format
+        of ClickHouse. LowCardinality columns are dictionary encoded.
+        """
+        settings = {**ARROW_SETTINGS, **self.resolve_settings(settings)}
+
+        def compute() -> pa.Table:
+            with self.create_client() as client:
+                return client.query_arrow(query, parameters=parameters, settings=settings)
+
+        return self._query_cached(
+            query, compute, parameters, "arrow", settings=settings, ttl=ttl, cache=cache
+        )
+
+    def query_polars(
+        self,
+        query: str,
+        parameters: Optional[dict] = None,
+        settings: Optional[str | dict] = None,
+        ttl: Optional[float] = None,
+        cache: Optional[bool] = True,
+    ) -> "pl.DataFrame":
+        """Run a query and return the result as a Polars DataFrame, which references the Arrow
+        result without copies where the types allow it. Dictionary columns become categoricals.
+        """
+        import polars as pl
+
+        table = self.query_arrow(
+            query, parameters=parameters, settings=settings, ttl=ttl, cache=cache
+        )
+
+        return pl.from_arrow(table, rechunk=False)
+
+    def query_records(
+        self,
+        query: str,
+        parameters: Optional[dict] = None,
+        settings: Optional[str | dict] = None,
+        ttl: Optional[float] = None,
+        cache: Optional[bool] = True,
+    ) -> List[Dict[str, Any]]:
+        """Run a query and return the rows as dicts, from the result cache if enabled."""
+        settings = self.resolve_settings(settings)
+
+        def compute() -> List[Dict[str, Any]]:
+            with self.create_client() as client:
+                result = client.query(query, parameters=parameters, settings=settings)
+
+            return list(result.named_results())
+
+        return self._query_cached(
+            query, compute, parameters, "records", settings=settings, ttl=ttl, cache=cache
+        )
+
+    def _query_cached(
+        self,
+        query: str,
+        compute: Callable[[], Any],
+        parameters: Optional[dict],
+        format: str,
+        settings: Optional[dict] = None,
+        ttl: Optional[float] = None,
+        cache: Optional[bool] = True,
+    ) -> Any:
+        if self.result_cache is None or not cache:
+            return compute()
+
+        return self.result_cache.get_or_set(
+            query,
+            compute,
+            parameters=parameters,
+            database=self.settings.database,
+            format=format,
+            ttl=ttl,
+            settings=settings,
+        )
+
+    def invalidate_results(
+        self, table: Optional[str] = None, database: Optional[str] = None
+    ) -> None:
+        """Remove cached results that read from a table, or from any table of a database. This
+        is done by the methods of the adapter that write to tables, but not for statements that
+        are run with a client directly.
+        """
+        if self.result_cache is None:
+            return
+
+        if database is None:
+            database = self.settings.database
+
+        self.result_cache.invalidate(database, table=table)
+
+    def insert(
+        self,
+        table: str,
+        data: pa.Table | pa.RecordBatch | pd.DataFrame | List[List[Any]],
+        column_names: Optional[List[str]] = None,
+        database: Optional[str] = None,
+        column_oriented: Optional[bool] = False,
+        batch_size: Optional[int] = 100000,
+        async_insert: Optional[bool] = None,
+        wait_for_async_insert: Optional[bool] = None,
+        settings: Optional[str | dict] = None,
+    ) -> InsertReport:
+        """Insert an Arrow table, DataFrame or list of rows (or columns) with native columnar
+        inserts, one batch of rows per request.
+        """
+        if database is None:
+            database = self.settings.database
+
+        settings = self.resolve_settings(settings)
+
+        if async_insert is not None:
+            settings["async_insert"] = int(async_insert)
+
+        if wait_for_async_insert is not None:
+            settings["wait_for_async_insert"] = int(wait_for_async_insert)
+
+        if isinstance(data, pa.RecordBatch):
+            data = pa.Table.from_batches([data])
+
+        if isinstance(data, pa.Table):
+            if column_names:
+                data = data.select(column_names)
+
+            num_rows = data.num_rows
+        elif isinstance(data, pd.DataFrame):
+            num_rows = len(data)
+        elif column_oriented:
+            num_rows = len(data[0]) if data else 0
+        else:
+            num_rows = len(data)
+
+        if not batch_size:
+            batch_size = max(num_rows, 1)
+
+        started_at = time.perf_counter()
+        batches = 0
+
+        with self.create_client() as client:
+            if not isinstance(data, pa.Table):
+                if column_names is None and isinstance(data, pd.DataFrame):
+                    column_names = list(data.columns)
+
+                # Create the insert context once, so the column types are only fetched once
+                context = client.create_insert_context(
+                    table,
+                    column_names=column_names or "*",
+                    database=database,
+                    column_oriented=column_oriented,
+                    settings=settings,
+                )
+
+            for offset in range(0, num_rows, batch_size):
+                if isinstance(data, pa.Table):
+                    client.insert_arrow(
+                        CHTableIdentifier(database=database, table=table).to_string(),
+                        data.slice(offset, batch_size),
+                        settings=settings,
+                    )
+                elif isinstance(data, pd.DataFrame):
+                    client.insert_df(df=data.iloc[offset : offset + batch_size], context=context)
+                elif column_oriented:
+                    client.insert(
+                        data=[column[offset : offset + batch_size] for column in data],
+                        context=context,
+                    )
+                else:
+                    client.insert(data=data[offset : offset + batch_size], context=context)
+
+                batches += 1
+
+        self.invalidate_results(table=table, database=database)
+
+        return InsertReport(
+            database=database,
+            table=table,
+            rows=num_rows,
+            batches=batches,
+            elapsed=time.perf_counter() - started_at,
+        )
+
+    def insert_raw(
+        self,
+        table: str,
+        data: bytes | Iterable[bytes],
+        column_names: Optional[List[str]] = None,
+        database: Optional[str] = None,
+        format: Optional[str] = "CSVWithNames",
+        settings: Optional[str | dict] = None,
+    ) -> InsertReport:
+        """Insert data that is already serialized in a ClickHouse input format. Chunks of an
+        iterable are streamed in a single request.
+        """
+        if database is None:
+            database = self.settings.database
+
+        if not isinstance(data, bytes):
+            data = (chunk for chunk in data)
+
+        started_at = time.perf_counter()
+
+        with self.create_client() as client:
+            summary = client.raw_insert(
+                CHTableIdentifier(database=database, table=table).to_string(),
+                column_names=column_names,
+                insert_block=data,
+                settings=settings,
+                fmt=format,
+            )
+
+        self.invalidate_results(table=table, database=database)
+
+        return InsertReport(
+            database=database,
+            table=table,
+            rows=summary.written_rows,
+            batches=1,
+            elapsed=time.perf_counter() - started_at,
         )
 
-        yield client
+    def close(self) -> None:
+        with self._pool_lock:
+            pool = self._pool
+            self._pool = None
+            background_executor = self._background_executor
+            self._background_executor = None
+
+        # Wait for background drops, which need the pool
+        if background_executor is not None:
+            background_executor.shutdown(wait=True)
 
-        client.close()
+        if pool is not None:
+            pool.close()
+
+        super().close()
 
     def has_database(self, database: str) -> bool:
         statement = "select 1 from system.databases where name = {database:String};"
@@ -108,6 +612,9 @@ class CHAdapter(BaseAdapter):
         with self.create_client() as client:
             client.command(statement, parameters={"database": database})
 
+        self.reflection_cache.invalidate(schema=database)
+        self.invalidate_results(database=database)
+
     def has_schema(self, schema: str, database: Optional[str] = None) -> bool:
         raise NotImplementedError()
 
@@ -119,10 +626,15 @@ class CHAdapter(BaseAdapter):
     def drop_schema(self, schema: str, database: Optional[str] = None) -> None:
         raise NotImplementedError()
 
-    def has_table(self, table: str, database: Optional[str] = None) -> bool:
+    def has_table(
+        self, table: str, database: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> bool:
         if database is None:
             database = self.settings.database
 
+        if catalog is not None and catalog.includes(database):
+            return catalog.has_table(table)
+
         statement = "select 1 from system.tables where database = {database:String} and name = {table:String};"
 
         with self.create_client() as client:
@@ -134,6 +646,151 @@ class CHAdapter(BaseAdapter):
 
         return result
 
+    def has_tables(self, tables: List[str], database: Optional[str] = None) -> Dict[str, bool]:
+        if database is None:
+            database = self.settings.database
+
+        statement = "select name from system.tables where database = {database:String} and has({tables:Array(String)}, name);"
+
+        with self.create_client() as client:
+            result = client.query(
+                statement, parameters={"database": database, "tables": tables}
+            ).result_rows
+
+        existing = set([row[0] for row in result])
+
+        return {table: table in existing for table in tables}
+
+    def get_catalog(self, database: Optional[str] = None) -> Catalog:
+        if database is None:
+            database = self.settings.database
+
+        statement = """
+        select t.name, t.engine, c.name, c.type, c.position
+        from system.tables as t
+        left join system.columns as c on c.database = t.database and c.table = t.name
+        where t.database = {database:String}
+        order by t.name, c.position;
+        """
+
+        with self.create_client() as client:
+            result = client.query(statement, parameters={"database": database}).result_rows
+
+        tables = {}
+        for table_name, engine, column_name, data_type, position in result:
+            if table_name not in tables:
+                tables[table_name] = CatalogTable(database=database, name=table_name, engine=engine)
+
+            if column_name:
+                tables[table_name].columns.append(
+                    CatalogColumn(
+                        name=column_name,
+                        data_type=data_type,
+                        position=position,
+                        nullable=data_type.startswith("Nullable("),
+                    )
+                )
+
+        return Catalog(database, list(tables.values()))
+
+    def get_table_stats(self, table: str, database: Optional[str] = None) -> TableStats:
+        if database is None:
+            database = self.settings.database
+
+        stats = self._get_stats(database, tables=[table])
+
+        if not stats:
+            raise Exception(f"Table '{database}.{table}' not found")
+
+        return stats[0]
+
+    def get_database_stats(self, database: Optional[str] = None) -> List[TableStats]:
+        if database is None:
+            database = self.settings.database
+
+        return self._get_stats(database)
+
+    def _get_stats(self, database: str, tables: Optional[List[str]] = None) -> List[TableStats]:
+        table_statement = """
+        select
+            t.name,
+            t.engine,
+            t.total_rows,
+            t.total_bytes,
+            p.parts,
+            p.compressed_bytes,
+            p.uncompressed_bytes
+        from system.tables as t
+        left join (
+            select
+                table,
+                count() as parts,
+                sum(data_compressed_bytes) as compressed_bytes,
+                sum(data_uncompressed_bytes) as uncompressed_bytes
+            from system.parts
+            where database = {database:String} and active
+            group by table
+        ) as p on p.table = t.name
+        where
+            t.database = {database:String}
+            and ({all:Bool} or has({tables:Array(String)}, t.name))
+        order by t.name
+        settings join_use_nulls = 1;
+        """
+        column_statement = """
+        select table, name, type, data_compressed_bytes, data_uncompressed_bytes
+        from system.columns
+        where
+            database = {database:String}
+            and ({all:Bool} or has({tables:Array(String)}, table))
+        order by table, position;
+        """
+        parameters = {"database": database, "all": tables is None, "tables": tables or []}
+
+        with self.create_client() as client:
+            table_result = client.query(table_statement, parameters=parameters).result_rows
+            column_result = client.query(column_statement, parameters=parameters).result_rows
+
+        columns = {}
+        for (
+            table_name,
+            column_name,
+            data_type,
+            compressed_bytes,
+            uncompressed_bytes,
+        ) in column_result:
+            columns.setdefault(table_name, []).append(
+                ColumnStats(
+                    name=column_name,
+                    data_type=data_type,
+                    compressed_bytes=compressed_bytes,
+                    uncompressed_bytes=uncompressed_bytes,
+                )
+            )
+
+        return [
+            TableStats(
+                database=database,
+                table=table_name,
+                engine=engine,
+                rows=rows,
+                total_bytes=total_bytes or 0,
+                parts=parts,
+                compressed_bytes=compressed_bytes,
+                uncompressed_bytes=uncompressed_bytes,
+                columns=columns.get(table_name, []),
+            )
+            for (
+                table_name,
+                engine,
+                rows,
+                total_bytes,
+                parts,
+                compressed_bytes,
+                uncompressed_bytes,
+            ) in table_result
+        ]
+
     def create_table(
         self,
         table: str,
@@ -153,6 +810,125 @@ class CHAdapter(BaseAdapter):
         with self.create_client() as client:
             client.command(statement)
 
+        self.reflection_cache.invalidate(schema=database, table=table)
+        self.invalidate_results(table=table, database=database)
+
+    def exchange_tables(self, table: str, other_table: str, database: Optional[str] = None) -> None:
+        """Swap the names of two tables atomically. Requires an Atomic database."""
+        if database is None:
+            database = self.settings.database
+
+        quoted_table = CHTableIdentifier(database=database, table=table).to_string()
+        quoted_other_table = CHTableIdentifier(database=database, table=other_table).to_string()
+        statement = f"exchange tables {quoted_table} and {quoted_other_table};"
+
+        with self.create_client() as client:
+            client.command(statement)
+
+        for name in [table, other_table]:
+            self.reflection_cache.invalidate(schema=database, table=name)
+            self.invalidate_results(table=name, database=database)
+
+    @contextmanager
+    def shadow_table(
+        self,
+        table: str,
+        statement: Optional[str] = None,
+        database: Optional[str] = None,
+        suffix: str = "__new",
+        drop_in_background: Optional[bool] = True,
+    ) -> Generator[str, Any, None]:
+        """Build a table under a temporary name and swap it with the table when the block exits,
+        so readers never see a missing or partially populated table.
+
+        The shadow table is created with the statement, in which '{table}' is replaced with the
+        quoted name of the shadow table, or with the structure of the existing table. The block
+        populates it, e.g. with insert() or INSERT SELECT. If the block fails, the shadow table
+        is dropped and the table is left as is. Otherwise, the tables are exchanged atomically
+        and the old data is dropped.
+        """
+        if database is None:
+            database = self.settings.database
+
+        shadow_table = f"{table}{suffix}"
+        quoted_table = CHTableIdentifier(database=database, table=table).to_string()
+        quoted_shadow_table = CHTableIdentifier(database=database, table=shadow_table).to_string()
+        exists = self.has_table(table, database=database)
+
+        if statement is not None:
+            statement = statement.replace("{table}", quoted_shadow_table)
+        elif exists:
+            statement = f"create table {quoted_shadow_table} as {quoted_table};"
+        else:
+            raise Exception(f"Table '{table}' does not exist, so a statement is required")
+
+        with self.create_client() as client:
+            # Drop the leftover of a failed build
+            client.command(f"drop table if exists {quoted_shadow_table} sync;")
+            client.command(statement)
+
+        try:
+            yield shadow_table
+        except BaseException:
+            self._drop_table_sync(shadow_table, database)
+            raise
+
+        if exists:
+            self.exchange_tables(table, shadow_table, database=database)
+
+            # The shadow table now holds the old data
+            if drop_in_background:
+                with self._pool_lock:
+                    if self._background_executor is None:
+                        self._background_executor = ThreadPoolExecutor(
+                            max_workers=1, thread_name_prefix="clickhouse_background"
+                        )
+
+                    self._background_executor.submit(self._drop_table_sync, shadow_table, database)
+            else:
+                self._drop_table_sync(shadow_table, database)
+        else:
+            with self.create_client() as client:
+                client.command(f"rename table {quoted_shadow_table} to {quoted_table};")
+
+            self.reflection_cache.invalidate(schema=database, table=table)
+            self.invalidate_results(table=table, database=database)
+
+    def _drop_table_sync(self, table: str, database: str) -> None:
+        quoted_table = CHTableIdentifier(database=database, table=table).to_string()
+
+        try:
+            with self.create_client() as client:
+                client.command(f"drop table if exists {quoted_table} sync;")
+        except Exception:
+            # A leftover shadow table is dropped by the next build
+            logging.getLogger(__name__).exception(f"Failed to drop table {quoted_table}")
+            return
+
+        self.reflection_cache.invalidate(schema=database, table=table)
+
+    def get_create_table_statements(
+        self, database: Optional[str] = None, tables: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        if database is None:
+            database = self.settings.database
+
+        # formatQuery() formats the statement like SHOW CREATE TABLE
+        statement = """
+        select name, formatQuery(create_table_query)
+        from system.tables
+        where
+            database = {database:String}
+            and ({all:Bool} or has({tables:Array(String)}, name))
+        order by name;
+        """
+        parameters = {"database": database, "all": tables is None, "tables": tables or []}
+
+        with self.create_client() as client:
+            result = client.query(statement, parameters=parameters).result_rows
+
+        return {table: statement for table, statement in result}
+
     def get_create_table_statement(self, table: str, database: Optional[str] = None) -> None:
         if database is None:
             database = self.settings.database
@@ -165,11 +941,13 @@ class CHAdapter(BaseAdapter):
 
         return statement
 
-    def drop_table(self, table: str, database: Optional[str] = None) -> None:
+    def drop_table(
+        self, table: str, database: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> None:
         if database is None:
             database = self.settings.database
 
-        if not self.has_table(table=table, database=database):
+        if not self.has_table(table=table, database=database, catalog=catalog):
             return
 
         quoted_table = CHTableIdentifier(database=database, table=table).to_string()
@@ -178,11 +956,16 @@ class CHAdapter(BaseAdapter):
         with self.create_client() as client:
             client.command(statement)
 
-    def truncate_table(self, table: str, database: Optional[str] = None) -> None:
+        self.reflection_cache.invalidate(schema=database, table=table)
+        self.invalidate_results(table=table, database=database)
+
+    def truncate_table(
+        self, table: str, database: Optional[str] = None, catalog: Optional[Catalog] = None
+    ) -> None:
         if database is None:
             database = self.settings.database
 
-        if not self.has_table(table=table, database=database):
+        if not self.has_table(table=table, database=database, catalog=catalog):
             return
 
         quoted_table = CHTableIdentifier(database=database, table=table).to_string()
@@ -191,16 +974,176 @@ class CHAdapter(BaseAdapter):
         with self.create_client() as client:
             client.command(statement)
 
+        self.invalidate_results(table=table, database=database)
+
+    def list_partitions(self, table: str, database: Optional[str] = None) -> List[Partition]:
+        if database is None:
+            database = self.settings.database
+
+        statement = """
+        select partition, partition_id, count(), sum(rows), sum(bytes_on_disk)
+        from system.parts
+        where database = {database:String} and table = {table:String} and active
+        group by partition, partition_id
+        order by partition_id;
+        """
+
+        with self.create_client() as client:
+            result = client.query(
+                statement, parameters={"database": database, "table": table}
+            ).result_rows
+
+        return [
+            Partition(
+                partition=partition, partition_id=partition_id, parts=parts, rows=rows, bytes=bytes_
+            )
+            for partition, partition_id, parts, rows, bytes_ in result
+        ]
+
+    def get_partition(
+        self, table: str, partition_id: str, database: Optional[str] = None
+    ) -> Partition | None:
+        if database is None:
+            database = self.settings.database
+
+        return pydash.find(
+            self.list_partitions(table, database=database),
+            lambda partition: partition.partition_id == partition_id,
+        )
+
+    def drop_partition(
+        self, table: str, partition_id: str, database: Optional[str] = None
+    ) -> PartitionOperationReport:
+        return self._run_partition_operation("drop", table, partition_id, database=database)
+
+    def detach_partition(
+        self, table: str, partition_id: str, database: Optional[str] = None
+    ) -> PartitionOperationReport:
+        """Move the parts of a partition to the detached directory of the table."""
+        return self._run_partition_operation("detach", table, partition_id, database=database)
+
+    def attach_partition(
+        self, table: str, partition_id: str, database: Optional[str] = None
+    ) -> PartitionOperationReport:
+        """Attach the detached parts of a partition."""
+        return self._run_partition_operation("attach", table, partition_id, database=database)
+
+    def replace_partition_from(
+        self,
+        table: str,
+        staging_table: str,
+        partition_id: str,
+        database: Optional[str] = None,
+        staging_database: Optional[str] = None,
+    ) -> PartitionOperationReport:
+        """Replace a partition with the partition of a staging table with the same structure. The
+        parts are hard-linked, so the staging table keeps its data.
+        """
+        return self._run_partition_operation(
+            "replace",
+            table,
+            partition_id,
+            database=database,
+            other_table=staging_table,
+            other_database=staging_database,
+        )
+
+    def move_partition_to(
+        self,
+        table: str,
+        destination_table: str,
+        partition_id: str,
+        database: Optional[str] = None,
+        destination_database: Optional[str] = None,
+    ) -> PartitionOperationReport:
+        """Move a partition to a table with the same structure and storage policy."""
+        return self._run_partition_operation(
+            "move",
+            table,
+            partition_id,
+            database=database,
+            other_table=destination_table,
+            other_database=destination_database,
+        )
+
+    def _run_partition_operation(
+        self,
+        operation: str,
+        table: str,
+        partition_id: str,
+        database: Optional[str] = None,
+        other_table: Optional[str] = None,
+        other_database: Optional[str] = None,
+    ) -> PartitionOperationReport:
+        if database is None:
+            database = self.settings.database
+
+        if other_database is None:
+            other_database = database
+
+        quoted_table = CHTableIdentifier(database=database, table=table).to_string()
+        quoted_other_table = (
+            CHTableIdentifier(database=other_database, table=other_table).to_string()
+            if other_table
+            else None
+        )
+
+        # The affected parts are those of the partition that is copied in, or otherwise the
+        # partition of the table before the operation
+        if operation == "replace":
+            before = self.get_partition(other_table, partition_id, database=other_database)
+        else:
+            before = self.get_partition(table, partition_id, database=database)
+
+        statements = {
+            "attach": f"alter table {quoted_table} attach partition id %(partition_id)s;",
+            "detach": f"alter table {quoted_table} detach partition id %(partition_id)s;",
+            "drop": f"alter table {quoted_table} drop partition id %(partition_id)s;",
+            "move": f"alter table {quoted_table} move partition id %(partition_id)s to table {quoted_other_table};",
+            "replace": f"alter table {quoted_table} replace partition id %(partition_id)s from {quoted_other_table};",
+        }
+        started_at = time.perf_counter()
+
+        with self.create_client() as client:
+            client.command(statements[operation], parameters={"partition_id": partition_id})
+
+        elapsed = time.perf_counter() - started_at
+
+        if operation == "attach":
+            # Detached parts are not listed with their size, so the attached parts are measured
+            after = self.get_partition(table, partition_id, database=database)
+            parts, rows, bytes_ = [
+                (getattr(after, key) if after else 0) - (getattr(before, key) if before else 0)
+                for key in ["parts", "rows", "bytes"]
+            ]
+        elif before is not None:
+            parts, rows, bytes_ = before.parts, before.rows, before.bytes
+        else:
+            parts, rows, bytes_ = 0, 0, 0
+
+        self.invalidate_results(table=table, database=database)
+
+        if operation == "move":
+            self.invalidate_results(table=other_table, database=other_database)
+
+        return PartitionOperationReport(
+            operation=operation,
+            database=database,
+            table=table,
+            partition_id=partition_id,
+            parts=parts,
+            rows=rows,
+            bytes=bytes_,
+            elapsed=elapsed,
+        )
+
     def get_table(self, table: str, database: Optional[str] = None) -> Table:
         if database is None:
             database = self.settings.database
 
-        url = self.create_url(**self.settings.model_dump())
-        engine = create_engine(url, echo=False)
-        metadata = MetaData(schema=database)
-        metadata.reflect(bind=engine, views=True)
+        tables = self.reflect_tables(database, [table])
 
-        return metadata.tables.get(f"{database}.{table}")
+        return tables[0] if tables else None
 
     def get_table_replica_identity(self, table: str, database: Optional[str] = None) -> None:
         raise NotImplementedError()
@@ -210,23 +1153,121 @@ class CHAdapter(BaseAdapter):
     ) -> None:
         raise NotImplementedError()
 
-    def drop_tables(self, database: Optional[str] = None) -> None:
+    def drop_tables(
+        self,
+        database: Optional[str] = None,
+        tables: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+        recreate_database: Optional[bool] = False,
+    ) -> TableOperationReport:
         if database is None:
             database = self.settings.database
 
-        for table in self.list_tables(database=database):
-            self.drop_table(table.name, database=database)
+        if recreate_database and tables is None:
+            return self._recreate_database(database)
 
-    def list_tables(self, database: Optional[str] = None) -> List[Table]:
+        report = self._run_table_operation("drop", database, tables=tables, max_workers=max_workers)
+        self.reflection_cache.invalidate(schema=database)
+
+        return report
+
+    def truncate_tables(
+        self,
+        database: Optional[str] = None,
+        tables: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> TableOperationReport:
         if database is None:
             database = self.settings.database
 
-        url = self.create_url(**self.settings.model_dump())
-        engine = create_engine(url, echo=False)
-        metadata = MetaData(schema=database)
-        metadata.reflect(bind=engine, views=True)
+        return self._run_table_operation(
+            "truncate", database, tables=tables, max_workers=max_workers
+        )
+
+    def _run_table_operation(
+        self,
+        operation: str,
+        database: str,
+        tables: Optional[List[str]] = None,
+        max_workers: Optional[int] = None,
+    ) -> TableOperationReport:
+        if max_workers is None:
+            max_workers = self.pool_size
+
+        started_at = time.perf_counter()
+
+        if tables is None:
+            catalog = self.get_catalog(database=database)
+            tables = [
+                table.name
+                for table in catalog.tables
+                # Views hold no data, so there is nothing to truncate
+                if operation == "drop" or table.engine not in ["View", "Dictionary"]
+            ]
+        else:
+            exists = self.has_tables(tables, database=database)
+            tables = [table for table in tables if exists[table]]
+
+        def run(table: str) -> TableOperationTiming:
+            table_started_at = time.perf_counter()
+            quoted_table = CHTableIdentifier(database=database, table=table).to_string()
+            # Drop synchronously, so the data is removed before the next statement runs
+            statement = f"{operation} table {quoted_table}{' sync' if operation == 'drop' else ''};"
+
+            with self.create_client() as client:
+                client.command(statement)
+
+            return TableOperationTiming(table=table, elapsed=time.perf_counter() - table_started_at)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            timings = list(executor.map(run, tables))
+
+        for table in tables:
+            self.invalidate_results(table=table, database=database)
+
+        return TableOperationReport(
+            operation=operation,
+            method="parallel",
+            database=database,
+            tables=tables,
+            timings=timings,
+            elapsed=time.perf_counter() - started_at,
+        )
+
+    def _recreate_database(self, database: str) -> TableOperationReport:
+        started_at = time.perf_counter()
+        tables = [table.name for table in self.get_catalog(database=database).tables]
+
+        # Use a client outside of the pool, because the pooled clients default to the dropped database
+        client = self._connect(database="default")
+
+        try:
+            result = client.query(
+                "show create database {database:Identifier};", parameters={"database": database}
+            ).result_rows
+            client.command(
+                "drop database {database:Identifier} sync;", parameters={"database": database}
+            )
+            client.command(result[0][0])
+        finally:
+            client.close()
+
+        self.reflection_cache.invalidate(schema=database)
+        self.invalidate_results(database=database)
+
+        return TableOperationReport(
+            operation="drop",
+            method="database",
+            database=database,
+            tables=tables,
+            elapsed=time.perf_counter() - started_at,
+        )
+
+    def list_tables(self, database: Optional[str] = None) -> List[Table]:
+        if database is None:
+            database = self.settings.database
 
-        return pydash.sort_by(list(metadata.tables.values()), lambda table: table.name)
+        return pydash.sort_by(self.reflect_tables(database), lambda table: table.name)
 
     def has_user(self, username: str) -> bool:
         statement = "select 1 from system.users where name = {username:String};"
@@ -1,18 +1,132 @@
 from collections.abc import Generator
 from contextlib import contextmanager
 from package.database.adapters.base import BaseAdapter
-from package.types import PGIdentifier, PGSettings, PGTableIdentifier
+from package.database.catalog import Catalog, CatalogColumn, CatalogTable
+from package.database.instrumentation import QueryEvent, QueryListener
+from package.database.pool import Pool, PoolStats
+from package.database.streams import ChunkReader, QueueWriter
+from package.types import (
+    CopyFormat,
+    PGIdentifier,
+    PGSettings,
+    PGTableIdentifier,
+    TableOperationReport,
+    TableStats,
+)
 from sqlalchemy import URL
-from sqlmodel import create_engine, MetaData, Table
-from typing import Any, List, Optional
+from sqlmodel import Table
+from typing import Any, Dict, List, Optional
 
+import io
 import psycopg2
+import psycopg2.extensions
+import pyarrow as pa
+import pyarrow.csv
 import pydash
+import queue
+import threading
+import time
+import uuid
+
+# Arrow types of Postgres type OIDs. Other types are read as strings.
+PG_ARROW_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int16(),
+    23: pa.int32(),
+    700: pa.float32(),
+    701: pa.float64(),
+    1082: pa.date32(),
+    1114: pa.timestamp("us"),
+}
+
+
+def unique_column_names(names: List[str]) -> List[str]:
+    """Suffix repeated column names of a result (e.g. `id`, `id_1`), so they can be told apart."""
+    unique = []
+
+    for name in names:
+        candidate, index = name, 0
+
+        while candidate in unique:
+            index += 1
+            candidate = f"{name}_{index}"
+
+        unique.append(candidate)
+
+    return unique
+
+
+class InstrumentedCursor(psycopg2.extensions.cursor):
+    """Cursor that reports the statements it executes to the listeners of an adapter."""
+
+    adapter: Optional["PGAdapter"] = None
+
+    def execute(self, query, vars=None) -> None:
+        with self.adapter.instrument("execute", self._to_string(query)) as event:
+            super().execute(query, vars)
+            self._set_rows(event)
+
+    def executemany(self, query, vars_list) -> None:
+        with self.adapter.instrument("executemany", self._to_string(query)) as event:
+            super().executemany(query, vars_list)
+            self._set_rows(event)
+
+    def copy_expert(self, sql, file, size=8192) -> None:
+        with self.adapter.instrument("copy", self._to_string(sql)) as event:
+            super().copy_expert(sql, file, size)
+            self._set_rows(event)
+
+    def _to_string(self, query) -> str:
+        if isinstance(query, str):
+            return query
+        elif isinstance(query, bytes):
+            return query.decode()
+        else:
+            return query.as_string(self)
+
+    def _set_rows(self, event: QueryEvent) -> None:
+        if self.rowcount is None or self.rowcount < 0:
+            return
+
+        command = (self.statusmessage or "").split(" ")[0].upper()
+
+        if command in ["SELECT", "COPY", "FETCH"]:
+            event.rows_read = self.rowcount
+        elif command in ["DELETE", "INSERT", "MERGE", "UPDATE"]:
+            event.rows_written = self.rowcount
 
 
 class PGAdapter(BaseAdapter):
-    def __init__(self, settings: PGSettings) -> None:
-        super().__init__(settings)
+    dialect = "postgres"
+
+    def __init__(
+        self,
+        settings: PGSettings,
+        pool: Optional[bool] = False,
+        pool_min_size: int = 1,
+        pool_max_size: int = 10,
+        pool_idle_timeout: Optional[float] = 300,
+        pool_health_check_interval: Optional[float] = 30,
+        pool_timeout: Optional[float] = 30,
+        engine_options: Optional[dict] = None,
+        reflection_ttl: Optional[float] = 300,
+        listeners: Optional[List[QueryListener]] = None,
+    ) -> None:
+        super().__init__(
+            settings,
+            engine_options=engine_options,
+            reflection_ttl=reflection_ttl,
+            listeners=listeners,
+        )
+        self.pooled = pool
+        self.pool_min_size = pool_min_size
+        self.pool_max_size = pool_max_size
+        self.pool_idle_timeout = pool_idle_timeout
+        self.pool_health_check_interval = pool_health_check_interval
+        self.pool_timeout = pool_timeout
+        self._pool = None
+        self._pool_lock = threading.Lock()
 
     @classmethod
     def create_url(
@@ -44,10 +158,32 @@ class PGAdapter(BaseAdapter):
             self.settings.schema_,
         )
 
-    @contextmanager
-    def create_client(
-        self, autocommit: bool = True
-    ) -> Generator[tuple[psycopg2.extensions.connection, psycopg2.extensions.cursor], Any, None]:
+    @property
+    def pool(self) -> Pool[psycopg2.extensions.connection]:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = Pool(
+                        create=self._connect,
+                        close=lambda connection: connection.close(),
+                        check=self._check_connection,
+                        reset=self._reset_connection,
+                        min_size=self.pool_min_size,
+                        max_size=self.pool_max_size,
+                        idle_timeout=self.pool_idle_timeout,
+                        health_check_interval=self.pool_health_check_interval,
+                        timeout=self.pool_timeout,
+                    )
+
+        return self._pool
+
+    def pool_stats(self) -> PoolStats | None:
+        if self._pool is None:
+            return None
+
+        return self._pool.stats()
+
+    def _connect(self) -> psycopg2.extensions.connection:
         connection = psycopg2.connect(
             host=self.settings.host,
             port=self.settings.port,
@@ -55,13 +191,202 @@ class PGAdapter(BaseAdapter):
             password=self.settings.password,
             database=self.settings.database,
         )
+        connection.cursor_factory = self._create_cursor
+        self._mark_connected()
+
+        return connection
+
+    def _create_cursor(self, *args, **kwargs) -> InstrumentedCursor:
+        cursor = InstrumentedCursor(*args, **kwargs)
+        cursor.adapter = self
+
+        return cursor
+
+    @classmethod
+    def _check_connection(cls, connection: psycopg2.extensions.connection) -> bool:
+        if connection.closed:
+            return False
+
+        connection.rollback()
+
+        # Use a plain cursor, so health checks are not reported to the listeners
+        with connection.cursor(cursor_factory=psycopg2.extensions.cursor) as cursor:
+            cursor.execute("select 1;")
+
+        connection.rollback()
 
-        connection.autocommit = autocommit
+        return True
 
-        with connection.cursor() as cursor:
-            yield (connection, cursor)
+    @classmethod
+    def _reset_connection(cls, connection: psycopg2.extensions.connection) -> None:
+        if connection.closed:
+            raise psycopg2.InterfaceError("connection already closed")
+
+        # Roll back any open or failed transaction, so that the next borrower starts clean
+        if connection.info.transaction_status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+
+        connection.autocommit = False
+
+    @contextmanager
+    def create_client(
+        self, autocommit: bool = True
+    ) -> Generator[tuple[psycopg2.extensions.connection, psycopg2.extensions.cursor], Any, None]:
+        started_at = self._start_acquire()
+
+        if self.pooled:
+            with self.pool.connection() as connection:
+                self._end_acquire(started_at)
+                connection.autocommit = autocommit
+
+                with connection.cursor() as cursor:
+                    yield (connection, cursor)
+        else:
+            connection = self._connect()
+            self._end_acquire(started_at)
+
+            try:
+                connection.autocommit = autocommit
+
+                with connection.cursor() as cursor:
+                    yield (connection, cursor)
+            finally:
+                connection.close()
+
+    def stream(
+        self, query: str, parameters: Optional[dict] = None, batch_size: int = 10000
+    ) -> Generator[List[tuple], None, None]:
+        """Yield the result of a query lazily, in batches of rows."""
+        with self.create_client(autocommit=False) as (conn, cur):
+            # Server-side cursor, so only one batch of rows is held in memory at a time
+            with conn.cursor(name=f"stream_{uuid.uuid4().hex}") as named_cursor:
+                named_cursor.itersize = batch_size
+                named_cursor.execute(query, parameters)
+
+                while rows := named_cursor.fetchmany(batch_size):
+                    yield rows
+
+            conn.rollback()
+
+    def copy_stream(
+        self,
+        query: str,
+        parameters: Optional[dict] = None,
+        format: Optional[CopyFormat] = CopyFormat.BINARY,
+        chunk_size: int = 1024 * 1024,
+        max_chunks: int = 8,
+    ) -> Generator[bytes | pa.RecordBatch, None, None]:
+        """Yield the result of a query with `COPY ... TO STDOUT`, as raw buffers of the binary or
+        CSV format, or as Arrow record batches.
+        """
+        # Use a dedicated connection, because it is closed if the consumer stops early
+        connection = self._connect()
+
+        try:
+            with connection.cursor() as cursor:
+                query = cursor.mogrify(query.strip().rstrip(";"), parameters).decode()
+
+                if format == CopyFormat.ARROW:
+                    cursor.execute(f"select * from ({query}) as q limit 0;")
+                    column_names = unique_column_names(
+                        [column.name for column in cursor.description]
+                    )
+                    column_types = {
+                        name: PG_ARROW_TYPES.get(column.type_code, pa.string())
+                        for name, column in zip(column_names, cursor.description)
+                    }
+
+            if format == CopyFormat.ARROW:
+                statement = f"copy ({query}) to stdout with (format csv);"
+            elif format == CopyFormat.CSV:
+                statement = f"copy ({query}) to stdout with (format csv, header true);"
+            else:
+                statement = f"copy ({query}) to stdout with (format binary);"
+
+            chunks = self._copy_chunks(connection, statement, chunk_size, max_chunks)
+
+            if format != CopyFormat.ARROW:
+                yield from chunks
+                return
+
+            try:
+                reader = pyarrow.csv.open_csv(
+                    io.BufferedReader(ChunkReader(chunks), buffer_size=chunk_size),
+                    read_options=pyarrow.csv.ReadOptions(
+                        column_names=column_names,
+                        block_size=chunk_size,
+                        use_threads=False,
+                    ),
+                    convert_options=pyarrow.csv.ConvertOptions(
+                        column_types=column_types,
+                        null_values=[""],
+                        true_values=["t"],
+                        false_values=["f"],
+                        strings_can_be_null=True,
+                        quoted_strings_can_be_null=False,
+                    ),
+                )
+
+                yield from reader
+            finally:
+                chunks.close()
+        finally:
+            connection.close()
 
-        connection.close()
+    @classmethod
+    def _copy_chunks(
+        cls,
+        connection: psycopg2.extensions.connection,
+        statement: str,
+        chunk_size: int,
+        max_chunks: int,
+    ) -> Generator[bytes, None, None]:
+        # psycopg2 pushes the output of COPY into a file, so run it in a thread that writes to a
+        # bounded queue. The thread blocks while the queue is full, until the consumer catches up.
+        chunks = queue.Queue(maxsize=max_chunks)
+        cancelled = threading.Event()
+        writer = QueueWriter(chunks, cancelled, chunk_size=chunk_size)
+        errors = []
+
+        def run() -> None:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.copy_expert(statement, writer, size=chunk_size)
+
+                writer.flush()
+                writer.close()
+            except Exception as e:
+                errors.append(e)
+
+                if not cancelled.is_set():
+                    writer.close()
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        try:
+            while (chunk := chunks.get()) is not None:
+                yield chunk
+
+            thread.join()
+
+            if errors:
+                raise errors[0]
+        finally:
+            if thread.is_alive():
+                cancelled.set()
+                connection.cancel()
+                thread.join()
+
+    def close(self) -> None:
+        with self._pool_lock:
+            pool = self._pool
+            self._pool = None
+
+        if pool is not None:
+            pool.close()
+
+        super().close()
 
     def has_database(self, database: str) -> bool:
         statement = """
@@ -108,7 +433,11 @@ class PGAdapter(BaseAdapter):
         raise NotImplementedError()
 
     def has_table(
-        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+        self,
+        table: str,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> bool:
         if database is None:
             database = self.settings.database
@@ -116,6 +445,9 @@ class PGAdapter(BaseAdapter):
         if schema is None:
             schema = self.settings.schema_
 
+        if catalog is not None and catalog.includes(database, schema):
+            return catalog.has_table(table, schema=schema)
+
         statement = """
         select 1 from information_schema.tables
         where table_catalog = %(database)s
@@ -129,6 +461,204 @@ class PGAdapter(BaseAdapter):
 
         return result
 
+    def has_tables(
+        self, tables: List[str], database: Optional[str] = None, schema: Optional[str] = None
+    ) -> Dict[str, bool]:
+        if database is None:
+            database = self.settings.database
+
+        if schema is None:
+            schema = self.settings.schema_
+
+        statement = """
+        select table_name from information_schema.tables
+        where table_catalog = %(database)s
+        and table_schema = %(schema)s
+        and table_name = any(%(tables)s);
+        """
+
+        with self.create_client() as (conn, cur):
+            cur.execute(statement, {"database": database, "schema": schema, "tables": list(tables)})
+            existing = set([row[0] for row in cur.fetchall()])
+
+        return {table: table in existing for table in tables}
+
+    def get_catalog(
+        self, database: Optional[str] = None, schema: Optional[str | List[str]] = None
+    ) -> Catalog:
+        if database is None:
+            database = self.settings.database
+
+        if schema is None:
+            schemas = [self.settings.schema_]
+        elif isinstance(schema, str):
+            schemas = [schema]
+        else:
+            schemas = pydash.uniq(schema)
+
+        statement = """
+        select
+            n.nspname,
+            c.relname,
+            case c.relkind
+                when 'r' then 'table'
+                when 'p' then 'partitioned_table'
+                when 'v' then 'view'
+                when 'm' then 'materialized_view'
+                when 'f' then 'foreign_table'
+            end,
+            case c.relreplident
+                when 'd' then 'default'
+                when 'n' then 'nothing'
+                when 'f' then 'full'
+                when 'i' then 'index'
+            end,
+            a.attname,
+            format_type(a.atttypid, a.atttypmod),
+            a.attnum,
+            not a.attnotnull
+        from pg_catalog.pg_class as c
+        join pg_catalog.pg_namespace as n on n.oid = c.relnamespace
+        left join pg_catalog.pg_attribute as a
+            on a.attrelid = c.oid and a.attnum > 0 and not a.attisdropped
+        where
+            current_database() = %(database)s
+            and n.nspname = any(%(schemas)s)
+            and c.relkind in ('r', 'p', 'v', 'm', 'f')
+        order by n.nspname, c.relname, a.attnum;
+        """
+
+        with self.create_client() as (conn, cur):
+            cur.execute(statement, {"database": database, "schemas": schemas})
+            result = cur.fetchall()
+
+        tables = {}
+        for (
+            schema_name,
+            table_name,
+            engine,
+            replica_identity,
+            column_name,
+            data_type,
+            position,
+            nullable,
+        ) in result:
+            key = (schema_name, table_name)
+
+            if key not in tables:
+                tables[key] = CatalogTable(
+                    database=database,
+                    schema_=schema_name,
+                    name=table_name,
+                    engine=engine,
+                    replica_identity=replica_identity,
+                )
+
+            if column_name:
+                tables[key].columns.append(
+                    CatalogColumn(
+                        name=column_name,
+                        data_type=data_type,
+                        position=position,
+                        nullable=nullable,
+                    )
+                )
+
+        return Catalog(database, list(tables.values()), schemas=schemas)
+
+    def get_table_stats(
+        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+    ) -> TableStats:
+        if schema is None:
+            schema = self.settings.schema_
+
+        stats = self._get_stats(database, [schema], tables=[table])
+
+        if not stats:
+            raise Exception(f"Table '{schema}.{table}' not found")
+
+        return stats[0]
+
+    def get_database_stats(
+        self, database: Optional[str] = None, schema: Optional[str | List[str]] = None
+    ) -> List[TableStats]:
+        if schema is None:
+            schemas = [self.settings.schema_]
+        elif isinstance(schema, str):
+            schemas = [schema]
+        else:
+            schemas = pydash.uniq(schema)
+
+        return self._get_stats(database, schemas)
+
+    def _get_stats(
+        self, database: Optional[str], schemas: List[str], tables: Optional[List[str]] = None
+    ) -> List[TableStats]:
+        if database is None:
+            database = self.settings.database
+
+        # Tuple counts are estimates of the statistics collector, which are updated by autovacuum
+        # and ANALYZE
+        statement = """
+        select
+            n.nspname,
+            c.relname,
+            case c.relkind
+                when 'r' then 'table'
+                when 'p' then 'partitioned_table'
+                when 'm' then 'materialized_view'
+            end,
+            s.n_live_tup,
+            s.n_dead_tup,
+            pg_total_relation_size(c.oid),
+            pg_table_size(c.oid),
+            pg_indexes_size(c.oid)
+        from pg_catalog.pg_class as c
+        join pg_catalog.pg_namespace as n on n.oid = c.relnamespace
+        left join pg_catalog.pg_stat_all_tables as s on s.relid = c.oid
+        where
+            current_database() = %(database)s
+            and n.nspname = any(%(schemas)s)
+            and c.relkind in ('r', 'p', 'm')
+            and (%(all)s or c.relname = any(%(tables)s))
+        order by n.nspname, c.relname;
+        """
+        parameters = {
+            "database": database,
+            "schemas": schemas,
+            "all": tables is None,
+            "tables": tables or [],
+        }
+
+        with self.create_client() as (conn, cur):
+            cur.execute(statement, parameters)
+            result = cur.fetchall()
+
+        return [
+            TableStats(
+                database=database,
+                schema_=schema_name,
+                table=table_name,
+                engine=engine,
+                rows=live_tuples,
+                total_bytes=total_bytes,
+                live_tuples=live_tuples,
+                dead_tuples=dead_tuples,
+                table_bytes=table_bytes,
+                index_bytes=index_bytes,
+            )
+            for (
+                schema_name,
+                table_name,
+                engine,
+                live_tuples,
+                dead_tuples,
+                total_bytes,
+                table_bytes,
+                index_bytes,
+            ) in result
+        ]
+
     def create_table(
         self,
         table: str,
@@ -152,13 +682,21 @@ class PGAdapter(BaseAdapter):
         with self.create_client() as (conn, cur):
             cur.execute(statement)
 
+        self.reflection_cache.invalidate(
+            url=self.url.set(database=database), schema=schema, table=table
+        )
+
     def get_create_table_statement(
         self, table: str, database: Optional[str] = None, schema: Optional[str] = None
     ) -> None:
         raise NotImplementedError()
 
     def drop_table(
-        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+        self,
+        table: str,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None:
         if database is None:
             database = self.settings.database
@@ -166,7 +704,7 @@ class PGAdapter(BaseAdapter):
         if schema is None:
             schema = self.settings.schema_
 
-        if not self.has_table(table=table, database=database, schema=schema):
+        if not self.has_table(table=table, database=database, schema=schema, catalog=catalog):
             return
 
         quoted_table = PGTableIdentifier(database=database, schema_=schema, table=table).to_string()
@@ -175,8 +713,16 @@ class PGAdapter(BaseAdapter):
         with self.create_client() as (conn, cur):
             cur.execute(statement)
 
+        self.reflection_cache.invalidate(
+            url=self.url.set(database=database), schema=schema, table=table
+        )
+
     def truncate_table(
-        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+        self,
+        table: str,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None:
         if database is None:
             database = self.settings.database
@@ -184,7 +730,7 @@ class PGAdapter(BaseAdapter):
         if schema is None:
             schema = self.settings.schema_
 
-        if not self.has_table(table=table, database=database, schema=schema):
+        if not self.has_table(table=table, database=database, schema=schema, catalog=catalog):
             return
 
         quoted_table = PGTableIdentifier(database=database, schema_=schema, table=table).to_string()
@@ -202,20 +748,45 @@ class PGAdapter(BaseAdapter):
         if schema is None:
             schema = self.settings.schema_
 
-        url = self.create_url(
-            **self.settings.model_copy(update={"database": database}).model_dump(by_alias=True)
-        )
-        engine = create_engine(url, echo=False)
-        metadata = MetaData(schema=schema)
-        metadata.reflect(bind=engine, views=True)
+        tables = self.reflect_tables(schema, [table], url=self.url.set(database=database))
+
+        return tables[0] if tables else None
+
+    def get_primary_key(
+        self, table: str, database: Optional[str] = None, schema: Optional[str] = None
+    ) -> List[str]:
+        if database is None:
+            database = self.settings.database
+
+        if schema is None:
+            schema = self.settings.schema_
+
+        statement = """
+        select a.attname
+        from pg_catalog.pg_index as i
+        join pg_catalog.pg_class as c on c.oid = i.indrelid
+        join pg_catalog.pg_namespace as n on n.oid = c.relnamespace
+        join pg_catalog.pg_attribute as a on a.attrelid = c.oid and a.attnum = any(i.indkey)
+        where
+            current_database() = %(database)s
+            and n.nspname = %(schema)s
+            and c.relname = %(table)s
+            and i.indisprimary
+        order by array_position(i.indkey, a.attnum);
+        """
+
+        with self.create_client() as (conn, cur):
+            cur.execute(statement, {"database": database, "schema": schema, "table": table})
+            result = [row[0] for row in cur.fetchall()]
 
-        return metadata.tables.get(f"{schema}.{table}")
+        return result
 
     def get_table_replica_identity(
         self,
         table: str,
         database: Optional[str] = None,
         schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None:
         if database is None:
             database = self.settings.database
@@ -223,6 +794,11 @@ class PGAdapter(BaseAdapter):
         if schema is None:
             schema = self.settings.schema_
 
+        if catalog is not None and catalog.includes(database, schema):
+            catalog_table = catalog.get_table(table, schema=schema)
+
+            return catalog_table.replica_identity if catalog_table else None
+
         if not self.has_table(table=table, database=database, schema=schema):
             return
 
@@ -254,6 +830,7 @@ class PGAdapter(BaseAdapter):
         replica_identity: str,
         database: Optional[str] = None,
         schema: Optional[str] = None,
+        catalog: Optional[Catalog] = None,
     ) -> None:
         if database is None:
             database = self.settings.database
@@ -261,7 +838,7 @@ class PGAdapter(BaseAdapter):
         if schema is None:
             schema = self.settings.schema_
 
-        if not self.has_table(table=table, database=database, schema=schema):
+        if not self.has_table(table=table, database=database, schema=schema, catalog=catalog):
             return
 
         quoted_table = PGTableIdentifier(database=database, schema_=schema, table=table).to_string()
@@ -270,15 +847,82 @@ class PGAdapter(BaseAdapter):
         with self.create_client() as (conn, cur):
             cur.execute(statement)
 
-    def drop_tables(self, database: Optional[str] = None, schema: Optional[str] = None) -> None:
+    def drop_tables(
+        self,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        tables: Optional[List[str]] = None,
+        cascade: Optional[bool] = False,
+    ) -> TableOperationReport:
         if database is None:
             database = self.settings.database
 
         if schema is None:
             schema = self.settings.schema_
 
-        for table in self.list_tables(database=database, schema=schema):
-            self.drop_table(table.name, database=database, schema=schema)
+        report = self._run_table_operation("drop", database, schema, tables=tables, cascade=cascade)
+        self.reflection_cache.invalidate(url=self.url.set(database=database), schema=schema)
+
+        return report
+
+    def truncate_tables(
+        self,
+        database: Optional[str] = None,
+        schema: Optional[str] = None,
+        tables: Optional[List[str]] = None,
+        cascade: Optional[bool] = False,
+    ) -> TableOperationReport:
+        if database is None:
+            database = self.settings.database
+
+        if schema is None:
+            schema = self.settings.schema_
+
+        return self._run_table_operation(
+            "truncate", database, schema, tables=tables, cascade=cascade
+        )
+
+    def _run_table_operation(
+        self,
+        operation: str,
+        database: str,
+        schema: str,
+        tables: Optional[List[str]] = None,
+        cascade: Optional[bool] = False,
+    ) -> TableOperationReport:
+        started_at = time.perf_counter()
+        catalog = self.get_catalog(database=database, schema=schema)
+
+        if tables is None:
+            tables = [
+                table.name
+                for table in catalog.list_tables(schema=schema)
+                if table.engine in ["table", "partitioned_table"]
+            ]
+        else:
+            tables = [table for table in tables if catalog.has_table(table, schema=schema)]
+
+        if tables:
+            quoted_tables = ", ".join(
+                PGTableIdentifier(database=database, schema_=schema, table=table).to_string()
+                for table in tables
+            )
+            # A single statement in a single transaction, so foreign keys between the tables are
+            # handled by Postgres and either all or none of the tables are affected
+            statement = f"{operation} table {quoted_tables}{' cascade' if cascade else ''};"
+
+            with self.create_client(autocommit=False) as (conn, cur):
+                cur.execute(statement)
+                conn.commit()
+
+        return TableOperationReport(
+            operation=operation,
+            method="statement",
+            database=database,
+            schema_=schema,
+            tables=tables,
+            elapsed=time.perf_counter() - started_at,
+        )
 
     def list_tables(
         self, database: Optional[str] = None, schema: Optional[str] = None
@@ -289,14 +933,9 @@ class PGAdapter(BaseAdapter):
         if schema is None:
             schema = self.settings.schema_
 
-        url = self.create_url(
-            **self.settings.model_copy(update={"database": database}).model_dump(by_alias=True)
-        )
-        engine = create_engine(url, echo=False)
-        metadata = MetaData(schema=schema)
-        metadata.reflect(bind=engine, views=True)
+        tables = self.reflect_tables(schema, url=self.url.set(database=database))
 
-        return pydash.sort_by(list(metadata.tables.values()), lambda table: table.name)
+        return pydash.sort_by(tables, lambda table: table.name)
 
     def has_user(self, username: str) -> bool:
         statement = """
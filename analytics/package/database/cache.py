@@ -0,0 +1,63 @@
+from sqlalchemy import URL
+from sqlmodel import Table
+from typing import Optional
+
+import threading
+import time
+
+
+class ReflectionCache:
+    """Cache of reflected tables, keyed by (URL, schema, table)."""
+
+    def __init__(self, ttl: Optional[float] = 300) -> None:
+        self.ttl = ttl
+        self._entries: dict[tuple[str, str, str], tuple[Table, float]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create_key(cls, url: URL, schema: str, table: str) -> tuple[str, str, str]:
+        return (url.render_as_string(hide_password=True), schema, table)
+
+    def get(self, url: URL, schema: str, table: str) -> Table | None:
+        key = self.create_key(url, schema, table)
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            value, created_at = entry
+
+            if self.ttl is not None and time.monotonic() - created_at > self.ttl:
+                del self._entries[key]
+                return None
+
+            return value
+
+    def set(self, url: URL, schema: str, table: str, value: Table) -> None:
+        key = self.create_key(url, schema, table)
+
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+
+    def invalidate(
+        self,
+        url: Optional[URL] = None,
+        schema: Optional[str] = None,
+        table: Optional[str] = None,
+    ) -> None:
+        url_key = None if url is None else url.render_as_string(hide_password=True)
+
+        with self._lock:
+            for key in list(self._entries.keys()):
+                if (
+                    (url_key is None or key[0] == url_key)
+                    and (schema is None or key[1] == schema)
+                    and (table is None or key[2] == table)
+                ):
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
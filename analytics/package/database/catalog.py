@@ -0,0 +1,73 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+
+
+class CatalogColumn(BaseModel):
+    name: str
+    data_type: str
+    position: int
+    nullable: Optional[bool] = None
+
+
+class CatalogTable(BaseModel):
+    database: str
+    schema_: Optional[str] = Field(default=None, serialization_alias="schema")
+    name: str
+    engine: Optional[str] = None
+    replica_identity: Optional[str] = None
+    columns: List[CatalogColumn] = Field(default_factory=list)
+
+    @property
+    def column_names(self) -> List[str]:
+        return [column.name for column in self.columns]
+
+    def get_column(self, name: str) -> CatalogColumn | None:
+        for column in self.columns:
+            if column.name == name:
+                return column
+
+
+class Catalog:
+    """In-memory snapshot of the tables and columns of a database or schemas."""
+
+    def __init__(
+        self, database: str, tables: List[CatalogTable], schemas: Optional[List[str]] = None
+    ) -> None:
+        self.database = database
+        self.schemas = schemas or []
+        self.schema = self.schemas[0] if self.schemas else None
+        self._tables: Dict[tuple[str | None, str], CatalogTable] = {
+            (table.schema_, table.name): table for table in tables
+        }
+
+    def __len__(self) -> int:
+        return len(self._tables)
+
+    def __contains__(self, table: str) -> bool:
+        return self.has_table(table)
+
+    def includes(self, database: str, schema: Optional[str] = None) -> bool:
+        """Whether the snapshot was taken of the given database and schema."""
+        if database != self.database:
+            return False
+
+        return schema is None or schema in self.schemas
+
+    @property
+    def tables(self) -> List[CatalogTable]:
+        return list(self._tables.values())
+
+    def has_table(self, table: str, schema: Optional[str] = None) -> bool:
+        return self.get_table(table, schema=schema) is not None
+
+    def get_table(self, table: str, schema: Optional[str] = None) -> CatalogTable | None:
+        if schema is None:
+            schema = self.schema
+
+        return self._tables.get((schema, table))
+
+    def list_tables(self, schema: Optional[str] = None) -> List[CatalogTable]:
+        if schema is None:
+            return self.tables
+
+        return [table for table in self._tables.values() if table.schema_ == schema]
@@ -0,0 +1,230 @@
+from collections import defaultdict
+from contextvars import ContextVar
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+import bisect
+import hashlib
+import logging
+import re
+import threading
+
+# Upper bounds (in seconds) of the duration histogram buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Acquire wait and whether a connection was opened, set when a client is acquired and consumed by
+# the first query that is run with it
+pending_acquire: ContextVar[tuple[float, bool] | None] = ContextVar("pending_acquire", default=None)
+opened_connection: ContextVar[bool] = ContextVar("opened_connection", default=False)
+
+_comment_pattern = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_string_pattern = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_number_pattern = re.compile(r"\b\d+(?:\.\d+)?\b")
+_in_list_pattern = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_whitespace_pattern = re.compile(r"\s+")
+
+
+def normalize_statement(statement: str) -> str:
+    """Normalize a statement by removing comments and replacing literals with placeholders."""
+    statement = _comment_pattern.sub(" ", statement)
+    statement = _string_pattern.sub("?", statement)
+    statement = _number_pattern.sub("?", statement)
+    statement = _in_list_pattern.sub("(?)", statement)
+    statement = _whitespace_pattern.sub(" ", statement)
+
+    return statement.strip().rstrip(";").strip().lower()
+
+
+def create_fingerprint(statement: str) -> str:
+    return hashlib.md5(normalize_statement(statement).encode()).hexdigest()[:16]
+
+
+class QueryEvent(BaseModel):
+    adapter: str
+    operation: str
+    statement: str
+    fingerprint: str
+    query_id: Optional[str] = None
+    started_at: float
+    duration: Optional[float] = None
+    rows_read: Optional[int] = None
+    rows_written: Optional[int] = None
+    bytes_read: Optional[int] = None
+    bytes_written: Optional[int] = None
+    acquire_wait: Optional[float] = None
+    connected: bool = False
+    settings: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class QueryListener:
+    def on_query_start(self, event: QueryEvent) -> None:
+        pass
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        pass
+
+
+class LoggingListener(QueryListener):
+    """Log a structured (JSON) record of every query."""
+
+    def __init__(
+        self,
+        logger: Optional[logging.Logger] = None,
+        level: int = logging.INFO,
+        max_statement_length: Optional[int] = 200,
+    ) -> None:
+        self.logger = logger or logging.getLogger("package.database")
+        self.level = level
+        self.max_statement_length = max_statement_length
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        level = logging.ERROR if event.error else self.level
+
+        if not self.logger.isEnabledFor(level):
+            return
+
+        statement = _whitespace_pattern.sub(" ", event.statement).strip()
+
+        if self.max_statement_length is not None:
+            statement = statement[: self.max_statement_length]
+
+        self.logger.log(
+            level,
+            event.model_copy(update={"statement": statement}).model_dump_json(exclude_none=True),
+        )
+
+
+class QueryStats(BaseModel):
+    adapter: str
+    operation: str
+    fingerprint: str
+    statement: str
+    count: int = 0
+    errors: int = 0
+    duration: float = 0
+    buckets: List[int]
+    rows_read: int = 0
+    rows_written: int = 0
+    bytes_read: int = 0
+    bytes_written: int = 0
+    acquire_wait: float = 0
+    connections: int = 0
+
+
+class HistogramListener(QueryListener):
+    """Aggregate the duration, rows and bytes of queries in memory, by statement fingerprint."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._stats: Dict[tuple[str, str, str], QueryStats] = {}
+        self._lock = threading.Lock()
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        key = (event.adapter, event.operation, event.fingerprint)
+
+        with self._lock:
+            stats = self._stats.get(key)
+
+            if stats is None:
+                stats = QueryStats(
+                    adapter=event.adapter,
+                    operation=event.operation,
+                    fingerprint=event.fingerprint,
+                    statement=normalize_statement(event.statement)[:200],
+                    buckets=[0] * (len(self.buckets) + 1),
+                )
+                self._stats[key] = stats
+
+            stats.count += 1
+            stats.errors += int(event.error is not None)
+            stats.duration += event.duration or 0
+            stats.buckets[bisect.bisect_left(self.buckets, event.duration or 0)] += 1
+            stats.rows_read += event.rows_read or 0
+            stats.rows_written += event.rows_written or 0
+            stats.bytes_read += event.bytes_read or 0
+            stats.bytes_written += event.bytes_written or 0
+            stats.acquire_wait += event.acquire_wait or 0
+            stats.connections += int(event.connected)
+
+    def get_stats(self) -> List[QueryStats]:
+        with self._lock:
+            return [stats.model_copy(deep=True) for stats in self._stats.values()]
+
+    def percentile(self, stats: QueryStats, q: float) -> float:
+        """Estimate a percentile (0-1) of the duration as the upper bound of its bucket."""
+        rank = q * stats.count
+        total = 0
+
+        for bound, count in zip(self.buckets + (float("inf"),), stats.buckets):
+            total += count
+
+            if total >= rank:
+                return bound
+
+        return float("inf")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+class PrometheusListener(HistogramListener):
+    """Aggregate queries like HistogramListener and render them in the Prometheus text format."""
+
+    def __init__(
+        self, buckets: tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "package"
+    ) -> None:
+        super().__init__(buckets=buckets)
+        self.prefix = prefix
+
+    @classmethod
+    def escape(cls, value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    def render(self) -> str:
+        metrics: Dict[str, List[str]] = defaultdict(list)
+        name = f"{self.prefix}_query_duration_seconds"
+
+        for stats in self.get_stats():
+            labels = ",".join(
+                f'{key}="{self.escape(value)}"'
+                for key, value in [
+                    ("adapter", stats.adapter),
+                    ("operation", stats.operation),
+                    ("fingerprint", stats.fingerprint),
+                ]
+            )
+            cumulative = 0
+
+            for bound, count in zip(self.buckets + (float("inf"),), stats.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                metrics[name].append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+
+            metrics[name].append(f"{name}_sum{{{labels}}} {stats.duration}")
+            metrics[name].append(f"{name}_count{{{labels}}} {stats.count}")
+
+            for key in [
+                "errors",
+                "rows_read",
+                "rows_written",
+                "bytes_read",
+                "bytes_written",
+                "connections",
+            ]:
+                metrics[f"{self.prefix}_query_{key}_total"].append(
+                    f"{self.prefix}_query_{key}_total{{{labels}}} {getattr(stats, key)}"
+                )
+
+            metrics[f"{self.prefix}_query_acquire_wait_seconds_total"].append(
+                f"{self.prefix}_query_acquire_wait_seconds_total{{{labels}}} {stats.acquire_wait}"
+            )
+
+        lines = []
+
+        for metric, samples in metrics.items():
+            lines.append(f"# TYPE {metric} {'histogram' if metric == name else 'counter'}")
+            lines.extend(samples)
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,281 @@
+from collections import deque
+from collections.abc import Generator
+from contextlib import contextmanager
+from pydantic import BaseModel
+from typing import Callable, Generic, Optional, TypeVar
+
+import threading
+import time
+
+T = TypeVar("T")
+
+
+class PoolClosedError(Exception):
+    pass
+
+
+class PoolTimeoutError(Exception):
+    pass
+
+
+class PoolStats(BaseModel):
+    min_size: int
+    max_size: int
+    size: int
+    idle: int
+    in_use: int
+    checkouts: int
+    waits: int
+    wait_time: float
+    created: int
+    reconnects: int
+
+
+class Pool(Generic[T]):
+    """Thread-safe, lazily filled pool of reusable clients."""
+
+    def __init__(
+        self,
+        create: Callable[[], T],
+        close: Callable[[T], None],
+        check: Optional[Callable[[T], bool]] = None,
+        reset: Optional[Callable[[T], None]] = None,
+        min_size: int = 0,
+        max_size: int = 4,
+        idle_timeout: Optional[float] = 300,
+        health_check_interval: Optional[float] = 30,
+        timeout: Optional[float] = 30,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("'max_size' must be 1 or more")
+
+        if not 0 <= min_size <= max_size:
+            raise ValueError("'min_size' must be between 0 and 'max_size'")
+
+        self._create = create
+        self._close = close
+        self._check = check
+        self._reset = reset
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._idle: deque[tuple[T, float]] = deque()
+        self._size = 0
+        self._closed = False
+        self._filled = False
+        self._filling = False
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._created = 0
+        self._reconnects = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def stats(self) -> PoolStats:
+        with self._condition:
+            return PoolStats(
+                min_size=self.min_size,
+                max_size=self.max_size,
+                size=self._size,
+                idle=len(self._idle),
+                in_use=self._size - len(self._idle),
+                checkouts=self._checkouts,
+                waits=self._waits,
+                wait_time=self._wait_time,
+                created=self._created,
+                reconnects=self._reconnects,
+            )
+
+    def acquire(self, timeout: Optional[float] = None) -> T:
+        if timeout is None:
+            timeout = self.timeout
+
+        if not self._filled:
+            self._fill()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while True:
+            with self._condition:
+                client, released_at = self._checkout(deadline)
+
+            if client is None:
+                # A slot has been reserved, so create the client outside of the lock
+                return self._create_reserved()
+
+            if self._is_usable(client, released_at):
+                return client
+
+            with self._condition:
+                self._reconnects += 1
+
+            self._destroy(client)
+
+    def release(
+        self, client: T, discard: Optional[bool] = False, check: Optional[bool] = False
+    ) -> None:
+        """Return a client to the pool. With `check`, the client is only kept if it is healthy,
+        e.g. after a query failed.
+        """
+        if not discard and check:
+            discard = not self._is_healthy(client)
+
+        if not discard and self._reset is not None:
+            try:
+                self._reset(client)
+            except Exception:
+                discard = True
+
+        with self._condition:
+            if not (self._closed or discard):
+                self._idle.append((client, time.monotonic()))
+                self._condition.notify()
+                return
+
+            if discard:
+                self._reconnects += 1
+
+        self._destroy(client)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Generator[T, None, None]:
+        client = self.acquire(timeout=timeout)
+        failed = False
+
+        try:
+            yield client
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            self.release(client, check=failed)
+
+    def close(self) -> None:
+        with self._condition:
+            self._closed = True
+            idle = [client for client, _ in self._idle]
+            self._idle.clear()
+            self._condition.notify_all()
+
+        for client in idle:
+            self._destroy(client)
+
+    def _fill(self) -> None:
+        with self._condition:
+            if self._filled or self._filling:
+                return
+
+            self._filling = True
+            count = max(self.min_size - self._size, 0)
+            self._size += count
+
+        try:
+            for index in range(count):
+                try:
+                    client = self._create_reserved()
+                except Exception:
+                    # Give back the slots that were reserved for the clients not created yet
+                    for _ in range(count - index - 1):
+                        self._discard_slot()
+
+                    raise
+
+                self.release(client)
+
+            with self._condition:
+                self._filled = True
+        finally:
+            with self._condition:
+                self._filling = False
+
+    def _create_reserved(self) -> T:
+        try:
+            client = self._create()
+        except Exception:
+            self._discard_slot()
+            raise
+
+        with self._condition:
+            self._created += 1
+
+        return client
+
+    def _checkout(self, deadline: Optional[float]) -> tuple[T | None, float | None]:
+        waited_at = None
+
+        try:
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Pool is closed")
+
+                if self._idle:
+                    self._checkouts += 1
+                    # Reuse the most recently released client, because it is the least likely to be stale
+                    return self._idle.pop()
+
+                if self._size < self.max_size:
+                    self._checkouts += 1
+                    self._size += 1
+                    return None, None
+
+                if waited_at is None:
+                    waited_at = time.monotonic()
+                    self._waits += 1
+
+                remaining = None if deadline is None else deadline - time.monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"Timed out waiting for a client (max_size={self.max_size})"
+                    )
+
+                self._condition.wait(remaining)
+        finally:
+            if waited_at is not None:
+                self._wait_time += time.monotonic() - waited_at
+
+    def _is_usable(self, client: T, released_at: float) -> bool:
+        idle_time = time.monotonic() - released_at
+
+        if self.idle_timeout is not None and idle_time > self.idle_timeout:
+            return False
+
+        # Only check clients that have been idle for a while, to avoid a round trip per checkout
+        if self.health_check_interval is not None and idle_time > self.health_check_interval:
+            return self._is_healthy(client)
+
+        return True
+
+    def _is_healthy(self, client: T) -> bool:
+        if self._check is None:
+            return True
+
+        try:
+            return bool(self._check(client))
+        except Exception:
+            return False
+
+    def _destroy(self, client: T) -> None:
+        try:
+            self._close(client)
+        except Exception:
+            pass
+        finally:
+            self._discard_slot()
+
+    def _discard_slot(self) -> None:
+        with self._condition:
+            self._size -= 1
+            self._condition.notify()
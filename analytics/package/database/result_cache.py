@@ -0,0 +1,441 @@
+from collections import OrderedDict
+from pathlib import Path
+from pydantic import BaseModel
+from sqlglot import exp
+from typing import Any, Callable, List, Optional
+
+import hashlib
+import json
+import pickle
+import re
+import sqlglot
+import sqlite3
+import threading
+import time
+
+# Table name of entries that could not be attributed to tables, which are invalidated by any write
+# to their database
+ANY_TABLE = "*"
+
+_string_pattern = re.compile(r"('(?:[^'\\]|\\.|'')*')")
+_whitespace_pattern = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Collapse whitespace outside of string literals and remove the trailing semicolon."""
+    parts = _string_pattern.split(query)
+
+    # Every odd part is a string literal, which is kept as is
+    for index in range(0, len(parts), 2):
+        parts[index] = _whitespace_pattern.sub(" ", parts[index])
+
+    return "".join(parts).strip().rstrip(";").strip()
+
+
+def extract_tables(query: str, database: str) -> List[str]:
+    """List the tables that a query reads from as 'database.table'."""
+    try:
+        expression = sqlglot.parse_one(query, read="clickhouse")
+    except sqlglot.errors.ParseError:
+        return [ANY_TABLE]
+
+    if not isinstance(expression, exp.Query):
+        return [ANY_TABLE]
+
+    # Names of common table expressions are not tables
+    ctes = set([cte.alias_or_name for cte in expression.find_all(exp.CTE)])
+    tables = set()
+
+    for table in expression.find_all(exp.Table):
+        if not table.name or (not table.db and table.name in ctes):
+            continue
+
+        tables.add(f"{table.db or database}.{table.name}")
+
+    return sorted(tables)
+
+
+class CacheEntry(BaseModel):
+    key: str
+    value: bytes
+    database: str
+    tables: List[str]
+    expires_at: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.value)
+
+    def matches(self, database: str, table: Optional[str] = None) -> bool:
+        if self.database != database and not any(
+            entry_table.startswith(f"{database}.") for entry_table in self.tables
+        ):
+            return False
+
+        return table is None or ANY_TABLE in self.tables or f"{database}.{table}" in self.tables
+
+
+class CacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    size: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+
+        return self.hits / total if total else 0
+
+
+class MemoryBackend:
+    """In-process LRU store of cache entries, bounded by number of entries and total size."""
+
+    def __init__(
+        self, max_entries: Optional[int] = 1024, max_size: Optional[int] = 256 << 20
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+            return entry
+
+    def set(self, entry: CacheEntry) -> int:
+        """Store an entry and return the number of entries that were evicted."""
+        evictions = 0
+
+        with self._lock:
+            self._pop(entry.key)
+            self._entries[entry.key] = entry
+            self._size += entry.size
+
+            while self._entries and (
+                (self.max_entries is not None and len(self._entries) > self.max_entries)
+                or (self.max_size is not None and self._size > self.max_size)
+            ):
+                self._pop(next(iter(self._entries)))
+                evictions += 1
+
+        return evictions
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._pop(key)
+
+    def delete_matching(self, database: str, table: Optional[str] = None) -> int:
+        with self._lock:
+            keys = [
+                key for key, entry in self._entries.items() if entry.matches(database, table=table)
+            ]
+
+            for key in keys:
+                self._pop(key)
+
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _pop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+
+        if entry is not None:
+            self._size -= entry.size
+
+
+class SQLiteBackend:
+    """LRU store of cache entries in a local SQLite file, which is shared by processes and kept
+    across restarts.
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        max_entries: Optional[int] = 1024,
+        max_size: Optional[int] = 1 << 30,
+    ) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("pragma journal_mode = wal;")
+        self._conn.execute(
+            """
+            create table if not exists result_cache (
+                key text primary key,
+                value blob not null,
+                database text not null,
+                tables text not null,
+                expires_at real,
+                size integer not null,
+                accessed_at real not null
+            );
+            """
+        )
+        self._conn.execute(
+            "create index if not exists result_cache_accessed_at on result_cache (accessed_at);"
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("select count(*) from result_cache;").fetchone()[0]
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "select coalesce(sum(size), 0) from result_cache;"
+            ).fetchone()[0]
+
+    def get(self, key: str) -> CacheEntry | None:
+        with self._lock:
+            row = self._conn.execute(
+                "select value, database, tables, expires_at from result_cache where key = ?;",
+                (key,),
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            self._conn.execute(
+                "update result_cache set accessed_at = ? where key = ?;", (time.time(), key)
+            )
+
+        value, database, tables, expires_at = row
+
+        return CacheEntry(
+            key=key,
+            value=value,
+            database=database,
+            tables=json.loads(tables),
+            expires_at=expires_at,
+        )
+
+    def set(self, entry: CacheEntry) -> int:
+        """Store an entry and return the number of entries that were evicted."""
+        evictions = 0
+
+        with self._lock:
+            self._conn.execute(
+                "insert or replace into result_cache values (?, ?, ?, ?, ?, ?, ?);",
+                (
+                    entry.key,
+                    entry.value,
+                    entry.database,
+                    json.dumps(entry.tables),
+                    entry.expires_at,
+                    entry.size,
+                    time.time(),
+                ),
+            )
+
+            if self.max_entries is not None:
+                evictions += self._conn.execute(
+                    """
+                    delete from result_cache where key in (
+                        select key from result_cache order by accessed_at desc limit -1 offset ?
+                    );
+                    """,
+                    (self.max_entries,),
+                ).rowcount
+
+            if self.max_size is not None:
+                evictions += self._conn.execute(
+                    """
+                    delete from result_cache where key in (
+                        select key from (
+                            select key, sum(size) over (order by accessed_at desc) as total
+                            from result_cache
+                        )
+                        where total > ?
+                    );
+                    """,
+                    (self.max_size,),
+                ).rowcount
+
+        return evictions
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("delete from result_cache where key = ?;", (key,))
+
+    def delete_matching(self, database: str, table: Optional[str] = None) -> int:
+        with self._lock:
+            rows = self._conn.execute(
+                "select key, database, tables from result_cache where database = ? or tables like ?;",
+                (database, f'%"{database}.%'),
+            ).fetchall()
+            keys = [
+                key
+                for key, entry_database, tables in rows
+                if CacheEntry(
+                    key=key, value=b"", database=entry_database, tables=json.loads(tables)
+                ).matches(database, table=table)
+            ]
+            self._conn.executemany(
+                "delete from result_cache where key = ?;", [(key,) for key in keys]
+            )
+
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("delete from result_cache;")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """Cache of query results, keyed by normalized query, parameters and database.
+
+    Results are stored pickled, so callers can not modify cached results in place.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[MemoryBackend | SQLiteBackend] = None,
+        ttl: Optional[float] = 300,
+    ) -> None:
+        self.backend = backend if backend is not None else MemoryBackend()
+        self.ttl = ttl
+        self._stats = CacheStats()
+        self._listeners: List[Callable[[str, Optional[str]], None]] = []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create_key(
+        cls,
+        query: str,
+        parameters: Optional[dict] = None,
+        database: Optional[str] = None,
+        format: Optional[str] = None,
+        settings: Optional[dict] = None,
+    ) -> str:
+        key = json.dumps(
+            [normalize_query(query), parameters or {}, database, format, settings or {}],
+            sort_keys=True,
+            default=repr,
+        )
+
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str) -> Any | None:
+        entry = self.backend.get(key)
+
+        if entry is not None and entry.expires_at is not None and entry.expires_at <= time.time():
+            self.backend.delete(key)
+            self._count("expirations")
+            entry = None
+
+        if entry is None:
+            self._count("misses")
+            return None
+
+        self._count("hits")
+
+        return pickle.loads(entry.value)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        database: str,
+        tables: List[str],
+        ttl: Optional[float] = None,
+    ) -> None:
+        if ttl is None:
+            ttl = self.ttl
+
+        entry = CacheEntry(
+            key=key,
+            value=pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            database=database,
+            tables=tables,
+            expires_at=time.time() + ttl if ttl is not None else None,
+        )
+        evictions = self.backend.set(entry)
+
+        self._count("sets")
+        self._count("evictions", evictions)
+
+    def get_or_set(
+        self,
+        query: str,
+        compute: Callable[[], Any],
+        parameters: Optional[dict] = None,
+        database: Optional[str] = None,
+        format: Optional[str] = None,
+        ttl: Optional[float] = None,
+        settings: Optional[dict] = None,
+    ) -> Any:
+        key = self.create_key(
+            query, parameters=parameters, database=database, format=format, settings=settings
+        )
+        value = self.get(key)
+
+        if value is None:
+            value = compute()
+            self.set(key, value, database, extract_tables(query, database), ttl=ttl)
+
+        return value
+
+    def add_listener(self, listener: Callable[[str, Optional[str]], None]) -> None:
+        """Add a function that is called with (database, table) when results are invalidated."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[str, Optional[str]], None]) -> None:
+        self._listeners.remove(listener)
+
+    def invalidate(self, database: str, table: Optional[str] = None) -> int:
+        """Remove the results that read from a table, or from any table of a database."""
+        count = self.backend.delete_matching(database, table=table)
+        self._count("invalidations", count)
+
+        for listener in list(self._listeners):
+            listener(database, table)
+
+        return count
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return self._stats.model_copy(
+                update={"entries": len(self.backend), "size": self.backend.size}
+            )
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats = CacheStats()
+
+    def _count(self, name: str, value: int = 1) -> None:
+        with self._lock:
+            setattr(self._stats, name, getattr(self._stats, name) + value)
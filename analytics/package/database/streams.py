@@ -0,0 +1,80 @@
+from typing import Iterator, Optional
+
+import io
+import queue
+import threading
+
+
+class StreamCancelledError(Exception):
+    pass
+
+
+class QueueWriter:
+    """File-like object that groups written data into chunks and puts them on a bounded queue.
+
+    Writes block while the queue is full, which throttles the producer to the speed of the consumer.
+    """
+
+    def __init__(
+        self,
+        chunks: queue.Queue,
+        cancelled: threading.Event,
+        chunk_size: int = 1024 * 1024,
+    ) -> None:
+        self._chunks = chunks
+        self._cancelled = cancelled
+        self.chunk_size = chunk_size
+        self._buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+
+        if len(self._buffer) >= self.chunk_size:
+            self.flush()
+
+        return len(data)
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._put(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self) -> None:
+        self._put(None)
+
+    def _put(self, chunk: bytes | None) -> None:
+        while True:
+            if self._cancelled.is_set():
+                raise StreamCancelledError("Stream was cancelled by the consumer")
+
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+
+class ChunkReader(io.RawIOBase):
+    """Readable file-like object over an iterator of byte chunks."""
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._chunk = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: memoryview) -> int:
+        while not self._chunk:
+            chunk: Optional[bytes] = next(self._chunks, None)
+
+            if chunk is None:
+                return 0
+
+            self._chunk = memoryview(chunk)
+
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+
+        return size
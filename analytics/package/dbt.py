@@ -1,18 +1,78 @@
+from collections import defaultdict
+from collections.abc import AsyncGenerator
 from dbt.cli.main import dbtRunner, dbtRunnerResult
-from package.config.constants import DBT_PROFILES_DIR
+from dbt.contracts.graph.manifest import Manifest
+from dbt_artifacts_parser.parser import parse_run_results
+from dbt_common.events.base_types import EventMsg
+from google.protobuf.json_format import MessageToDict
+from package.config.constants import DBT_PROFILES_DIR, DBT_PROFILES_FILE
 from package.project import Project
-from package.types import DbtModel, DbtResourceType, DbtSeed, DbtSource
+from package.types import (
+    DbtModel,
+    DbtNodeEvent,
+    DbtNodeEventType,
+    DbtNodeResult,
+    DbtResourceType,
+    DbtRunSummary,
+    DbtSeed,
+    DbtSource,
+)
 from package.utils.filesystem import get_file_extension
 from package.utils.yaml_utils import safe_load_file
-from prefect_shell.commands import ShellOperation
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, TYPE_CHECKING
 
+import asyncio
+import hashlib
+import inspect
 import json
+import logging
 import os
+import pydash
+import re
+import threading
+
+if TYPE_CHECKING:
+    from package.dbt_history import DbtRunHistory
+
+logger = logging.getLogger(__name__)
 
 RE_REF = r"^ref\(['\"](.*?)['\"]\)$"
 RE_SOURCE = r"^source\(['\"](.*?)['\"], ['\"](.*?)['\"]\)$"
 
+# Selectors that may be resolved from the manifest instead of `dbt list`, if they are the name of
+# a node and not the name of a package or top-level folder
+RE_NAME_SELECTOR = re.compile(r"^\w+$")
+
+# Collections of the manifest with the nodes that are matched by name selectors (all but sources)
+DBT_SELECTABLE_COLLECTIONS = [
+    "exposures",
+    "metrics",
+    "nodes",
+    "saved_queries",
+    "semantic_models",
+    "unit_tests",
+]
+
+DBT_MANIFEST_PATH = os.path.join("target", "manifest.json")
+DBT_RUN_RESULTS_PATH = os.path.join("target", "run_results.json")
+
+# Directories of a dbt project that do not affect the manifest
+DBT_IGNORED_DIRECTORIES = ["logs", "target"]
+
+# Keys of the resources in the JSON output of `dbt list`
+DBT_LIST_KEYS = [
+    "alias",
+    "config",
+    "depends_on",
+    "name",
+    "original_file_path",
+    "package_name",
+    "resource_type",
+    "source_name",
+    "tags",
+    "unique_id",
+]
+
 RESOURCE_TYPE_TO_CLASS = {
     DbtResourceType.MODEL: DbtModel,
     DbtResourceType.SEED: DbtSeed,
@@ -32,10 +92,293 @@ def resolve_resource_path(project_dir: str, resource: dict) -> str | None:
         return path
 
 
-class Dbt:
+def to_node_event(event: EventMsg) -> DbtNodeEvent | None:
+    """Convert a NodeStart or NodeFinished event of dbt. Other events are ignored."""
+    if event.info.name not in ["NodeStart", "NodeFinished"]:
+        return None
+
+    node_info = event.data.node_info
+    node_event = DbtNodeEvent(
+        type=DbtNodeEventType.START if event.info.name == "NodeStart" else DbtNodeEventType.FINISH,
+        unique_id=node_info.unique_id,
+        name=node_info.node_name,
+        resource_type=node_info.resource_type,
+        materialized=node_info.materialized or None,
+        relation_name=node_info.node_relation.relation_name or None,
+        status=node_info.node_status or None,
+        started_at=node_info.node_started_at or None,
+        finished_at=node_info.node_finished_at or None,
+    )
+
+    if event.info.name == "NodeFinished":
+        run_result = event.data.run_result
+        adapter_response = MessageToDict(run_result.adapter_response)
+        rows_affected = adapter_response.get("rows_affected")
+
+        node_event.status = run_result.status
+        node_event.execution_time = run_result.execution_time
+        node_event.rows_affected = int(rows_affected) if rows_affected is not None else None
+        node_event.adapter_response = adapter_response
+        node_event.thread = run_result.thread or None
+        node_event.message = run_result.message or None
+
+    return node_event
+
+
+def load_run_results(path: str) -> DbtRunSummary:
+    with open(path) as f:
+        run_results = parse_run_results(run_results=json.load(f))
+
+    results = []
+
+    for result in run_results.results:
+        timing = pydash.find(result.timing, lambda timing: timing.name == "execute")
+        adapter_response = result.adapter_response or {}
+
+        results.append(
+            DbtNodeResult(
+                unique_id=result.unique_id,
+                status=getattr(result.status, "value", result.status),
+                thread=result.thread_id,
+                execution_time=result.execution_time,
+                started_at=timing.started_at if timing else None,
+                completed_at=timing.completed_at if timing else None,
+                rows_affected=adapter_response.get("rows_affected"),
+                adapter_response=adapter_response,
+                message=result.message,
+                relation_name=getattr(result, "relation_name", None),
+            )
+        )
+
+    return DbtRunSummary(
+        invocation_id=run_results.metadata.invocation_id,
+        dbt_version=run_results.metadata.dbt_version,
+        generated_at=run_results.metadata.generated_at,
+        elapsed_time=run_results.elapsed_time,
+        results=results,
+    )
+
+
+class DbtResourceIndex:
+    """Index of the resources in the manifest of a dbt project, by unique_id, name and type.
+
+    The manifest is loaded once, and only loaded again when the project files or the manifest
+    change. It is parsed again with `dbt parse` if a project file is newer than the manifest.
+    """
+
     def __init__(self, project_dir: str, target: Optional[str] = None) -> None:
+        self.project_dir = str(project_dir)
+        self.target = target
+        self.resources: Dict[str, dict] = {}
+        self._by_name: Dict[str, List[dict]] = defaultdict(list)
+        self._selector_prefixes: Set[str] = set()
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    @property
+    def manifest_path(self) -> str:
+        return os.path.join(self.project_dir, DBT_MANIFEST_PATH)
+
+    def get_project_fingerprint(self) -> tuple[int, str]:
+        """Return the newest mtime of the project files, and a hash of their paths, sizes and
+        mtimes.
+        """
+        newest_mtime = 0
+        digest = hashlib.sha256()
+        paths = [DBT_PROFILES_FILE] if os.path.exists(DBT_PROFILES_FILE) else []
+
+        for root, dirs, files in os.walk(self.project_dir):
+            dirs[:] = sorted(
+                directory
+                for directory in dirs
+                if not directory.startswith(".")
+                and not (root == self.project_dir and directory in DBT_IGNORED_DIRECTORIES)
+            )
+            paths.extend(os.path.join(root, file) for file in sorted(files))
+
+        for path in paths:
+            stat = os.stat(path)
+            newest_mtime = max(newest_mtime, stat.st_mtime_ns)
+            digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+
+        return newest_mtime, digest.hexdigest()
+
+    def refresh(self) -> None:
+        with self._lock:
+            newest_mtime, project_fingerprint = self.get_project_fingerprint()
+
+            if not os.path.exists(self.manifest_path) or (
+                os.stat(self.manifest_path).st_mtime_ns < newest_mtime
+            ):
+                self.parse()
+
+            fingerprint = (project_fingerprint, os.stat(self.manifest_path).st_mtime_ns)
+
+            if fingerprint != self._fingerprint:
+                self.load()
+                self._fingerprint = fingerprint
+
+    def parse(self) -> None:
+        result = Dbt(self.project_dir, target=self.target).parse_sync(quiet=True)
+
+        if not result.success:
+            raise Exception(f"Failed to parse dbt project '{self.project_dir}': {result.exception}")
+
+    def load(self) -> None:
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+
+        resources = {}
+        by_name = defaultdict(list)
+        selector_prefixes = set()
+
+        for unique_id in sorted([*manifest["nodes"], *manifest["sources"]]):
+            node = manifest["nodes"].get(unique_id) or manifest["sources"][unique_id]
+
+            if node["resource_type"] not in RESOURCE_TYPE_TO_CLASS:
+                continue
+
+            resource = {key: node.get(key) for key in DBT_LIST_KEYS if key in node}
+            resources[unique_id] = resource
+
+            # Like dbt, name selectors do not match sources
+            if node["resource_type"] != DbtResourceType.SOURCE:
+                by_name[resource["name"]].append(resource)
+
+        # dbt also matches a name selector with the package and the first folder of the path (the
+        # first parts of the fqn, with and without the package) of every node
+        for collection in DBT_SELECTABLE_COLLECTIONS:
+            for node in manifest.get(collection, {}).values():
+                fqn = [part for segment in node.get("fqn", []) for part in segment.split(".")]
+                unscoped_fqn = [
+                    part for segment in node.get("fqn", [])[1:] for part in segment.split(".")
+                ]
+
+                if fqn:
+                    selector_prefixes.add(fqn[0])
+
+                if len(unscoped_fqn) > 1:
+                    selector_prefixes.add(unscoped_fqn[0])
+
+        self.resources = resources
+        self._by_name = by_name
+        self._selector_prefixes = selector_prefixes
+
+    def get(self, unique_id: str) -> dict | None:
+        self.refresh()
+
+        return self.resources.get(unique_id)
+
+    def is_node_name(self, selector: str) -> bool:
+        """Return whether a selector only selects the nodes with that name, so it can be resolved
+        with `list(name=selector)`.
+        """
+        self.refresh()
+
+        return selector in self._by_name and selector not in self._selector_prefixes
+
+    def list(
+        self,
+        resource_types: Optional[List[DbtResourceType]] = None,
+        name: Optional[str] = None,
+    ) -> List[dict]:
+        """List the resources, or the nodes (not sources) with a name."""
+        self.refresh()
+
+        if name is None:
+            resources = self.resources.values()
+        else:
+            resources = self._by_name.get(name, [])
+
+        return [
+            resource
+            for resource in resources
+            if resource_types is None or resource["resource_type"] in resource_types
+        ]
+
+
+class Dbt:
+    # Resource indexes by project directory and target, shared by the instances of the process
+    _resource_indexes: Dict[tuple[str, str | None], DbtResourceIndex] = {}
+    _resource_indexes_lock = threading.Lock()
+
+    def __init__(
+        self,
+        project_dir: str,
+        target: Optional[str] = None,
+        session: Optional[bool] = False,
+        history: Optional["DbtRunHistory"] = None,
+    ) -> None:
+        """In session mode, the project is parsed once, and the parsed manifest is reused by the
+        in-process invocations until a project file changes. If a history is given, the results
+        of runs are recorded in it.
+        """
         self.project_dir = project_dir
         self.target = target
+        self.session = session
+        self.history = history
+        self._manifest = None
+        self._manifest_key = None
+        self._manifest_lock = threading.Lock()
+
+    @property
+    def resource_index(self) -> DbtResourceIndex:
+        key = (os.path.abspath(self.project_dir), self.target)
+
+        with self._resource_indexes_lock:
+            if key not in self._resource_indexes:
+                self._resource_indexes[key] = DbtResourceIndex(key[0], target=self.target)
+
+            return self._resource_indexes[key]
+
+    def get_manifest(self, vars: Optional[dict[str, Any]] = None) -> Manifest:
+        """Return the manifest of the session, which is parsed again only when a project file or
+        the vars changed.
+        """
+        with self._manifest_lock:
+            _, fingerprint = self.resource_index.get_project_fingerprint()
+            key = (fingerprint, json.dumps(vars, sort_keys=True))
+
+            if self._manifest is None or key != self._manifest_key:
+                result = self.parse_sync(quiet=True, vars=vars)
+
+                if not result.success:
+                    raise Exception(
+                        f"Failed to parse dbt project '{self.project_dir}': {result.exception}"
+                    )
+
+                self._manifest = result.result
+                self._manifest_key = key
+
+            return self._manifest
+
+    def create_runner(
+        self,
+        vars: Optional[dict[str, Any]] = None,
+        callbacks: Optional[List[Callable[[EventMsg], None]]] = None,
+    ) -> dbtRunner:
+        if not self.session:
+            return dbtRunner(callbacks=callbacks)
+
+        return dbtRunner(manifest=self.get_manifest(vars=vars), callbacks=callbacks)
+
+    @property
+    def run_results_path(self) -> str:
+        return os.path.join(self.project_dir, DBT_RUN_RESULTS_PATH)
+
+    def record_history(self, summary: DbtRunSummary) -> None:
+        """Record the results of a run in the history. A failure is logged, and does not fail
+        the run.
+        """
+        if self.history is None:
+            return
+
+        try:
+            self.history.ingest(summary, self)
+        except Exception:
+            logger.exception(
+                f"Failed to record the results of dbt invocation {summary.invocation_id}"
+            )
 
     def list_command(
         self,
@@ -107,7 +450,7 @@ class Dbt:
             cmd.extend(["--no-use-colors"])
 
         if vars:
-            cmd.extend(["--vars", f"'{json.dumps(vars)}'"])
+            cmd.extend(["--vars", json.dumps(vars)])
 
         return cmd
 
@@ -141,7 +484,7 @@ class Dbt:
             vars=vars,
         )
 
-        return dbtRunner().invoke(cmd[1:])
+        return self.create_runner(vars=vars).invoke(cmd[1:])
 
     def get_resource(self, name: str) -> DbtModel | DbtSeed | DbtSource | None:
         resources = self.list_resources(select=name)
@@ -155,7 +498,13 @@ class Dbt:
         self,
         resource_types: Optional[List[DbtResourceType]] = None,
         select: Optional[str] = None,
+        use_manifest: Optional[bool] = True,
+        exclude: Optional[str] = None,
     ) -> List[DbtModel | DbtSeed | DbtSource]:
+        """List resources from the manifest, or with `dbt list` if `select` is not the name of a
+        node (e.g. a folder, package or graph selector), `exclude` is given or `use_manifest` is
+        false.
+        """
         valid_resource_types = RESOURCE_TYPE_TO_CLASS.keys()
 
         if resource_types is None:
@@ -167,13 +516,31 @@ class Dbt:
                     f"'resource_types' must be any of: {', '.join(valid_resource_types)}"
                 )
 
-        result = self.list_sync(
-            output="json",
-            quiet=True,
-            resource_types=resource_types,
-            select=select,
-        )
-        resource_dicts = [json.loads(string) for string in result.result]
+        if use_manifest and exclude is None and self.session:
+            # Parse in the session, which writes the manifest that is read by the index
+            self.get_manifest()
+
+        if (
+            use_manifest
+            and exclude is None
+            and (
+                select is None
+                or (RE_NAME_SELECTOR.match(select) and self.resource_index.is_node_name(select))
+            )
+        ):
+            resource_dicts = [
+                dict(resource)
+                for resource in self.resource_index.list(resource_types=resource_types, name=select)
+            ]
+        else:
+            result = self.list_sync(
+                exclude=exclude,
+                output="json",
+                quiet=True,
+                resource_types=resource_types,
+                select=select,
+            )
+            resource_dicts = [json.loads(string) for string in result.result]
 
         cache = {}
         for resource in resource_dicts:
@@ -268,7 +635,7 @@ class Dbt:
             cmd.extend(["--no-use-colors"])
 
         if vars:
-            cmd.extend(["--vars", f"'{json.dumps(vars)}'"])
+            cmd.extend(["--vars", json.dumps(vars)])
 
         return cmd
 
@@ -285,7 +652,57 @@ class Dbt:
         target: Optional[str] = None,
         use_colors: Optional[bool] = False,
         vars: Optional[dict[str, Any]] = None,
-    ) -> str:
+        on_event: Optional[Callable[[DbtNodeEvent], Any]] = None,
+    ) -> DbtRunSummary:
+        """Run dbt, and return the summary of run_results.json. `on_event` is called (or awaited)
+        with the start and finish events of the nodes as they happen.
+        """
+        async for event in self.stream_run(
+            debug=debug,
+            exclude=exclude,
+            fail_fast=fail_fast,
+            full_refresh=full_refresh,
+            models=models,
+            quiet=quiet,
+            select=select,
+            selector=selector,
+            target=target,
+            use_colors=use_colors,
+            vars=vars,
+        ):
+            if on_event is not None:
+                result = on_event(event)
+
+                if inspect.isawaitable(result):
+                    await result
+
+        summary = load_run_results(self.run_results_path)
+
+        if self.history is not None:
+            await asyncio.to_thread(self.record_history, summary)
+
+        return summary
+
+    async def stream_run(
+        self,
+        debug: Optional[bool] = False,
+        exclude: Optional[str] = None,
+        fail_fast: Optional[bool] = True,
+        full_refresh: Optional[bool] = False,
+        models: Optional[str] = None,
+        quiet: Optional[bool] = False,
+        select: Optional[str] = None,
+        selector: Optional[str] = None,
+        target: Optional[str] = None,
+        use_colors: Optional[bool] = False,
+        vars: Optional[dict[str, Any]] = None,
+    ) -> AsyncGenerator[DbtNodeEvent, None]:
+        """Run dbt in a thread, and yield the start and finish events of the nodes as they
+        happen. Failing nodes do not raise, but a failing invocation does.
+
+        dbt can not be interrupted, so if the consumer stops iterating or is cancelled, closing
+        the generator waits for the invocation to finish and logs its outcome.
+        """
         cmd = self.run_command(
             debug=debug,
             fail_fast=fail_fast,
@@ -299,13 +716,50 @@ class Dbt:
             use_colors=use_colors,
             vars=vars,
         )
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
 
-        async with ShellOperation(commands=[" ".join(cmd)], working_dir=self.project_dir) as op:
-            process = await op.trigger()
-            await process.wait_for_completion()
-            result = await process.fetch_result()
+        def callback(event: EventMsg) -> None:
+            node_event = to_node_event(event)
 
-        return result
+            if node_event is not None:
+                loop.call_soon_threadsafe(queue.put_nowait, node_event)
+
+        def invoke() -> dbtRunnerResult:
+            try:
+                return self.create_runner(vars=vars, callbacks=[callback]).invoke(cmd[1:])
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        def log_outcome(future: asyncio.Future) -> None:
+            if future.cancelled():
+                return
+
+            if future.exception() is not None:
+                logger.error(f"Detached dbt invocation failed: {future.exception()}")
+            elif future.result().exception is not None:
+                logger.error(f"Detached dbt invocation failed: {future.result().exception}")
+
+        future = loop.run_in_executor(None, invoke)
+        stopped = True
+
+        try:
+            while (event := await queue.get()) is not done:
+                yield event
+
+            stopped = False
+        finally:
+            if stopped:
+                future.add_done_callback(log_outcome)
+                # If the wait is cancelled too, the invocation finishes in the background and its
+                # outcome is still logged by the callback
+                await asyncio.wait([future])
+
+        result = await future
+
+        if result.exception is not None:
+            raise Exception(f"dbt run failed: {result.exception}")
 
     def run_sync(
         self,
@@ -335,7 +789,12 @@ class Dbt:
             vars=vars,
         )
 
-        return dbtRunner().invoke(cmd[1:])
+        result = self.create_runner(vars=vars).invoke(cmd[1:])
+
+        if self.history is not None and result.exception is None:
+            self.record_history(load_run_results(self.run_results_path))
+
+        return result
 
     def seed_command(
         self,
@@ -404,4 +863,66 @@ class Dbt:
             use_colors=use_colors,
         )
 
+        return self.create_runner().invoke(cmd[1:])
+
+    def parse_command(
+        self,
+        debug: Optional[bool] = False,
+        quiet: Optional[bool] = False,
+        target: Optional[str] = None,
+        use_colors: Optional[bool] = False,
+        vars: Optional[dict[str, Any]] = None,
+    ) -> list[str]:
+        if target is None:
+            target = self.target
+
+        cmd = [
+            "dbt",
+            "parse",
+            "--profiles-dir",
+            DBT_PROFILES_DIR,
+            "--project-dir",
+            str(self.project_dir),
+        ]
+
+        if debug:
+            cmd.extend(["--debug"])
+        else:
+            cmd.extend(["--no-debug"])
+
+        if quiet:
+            cmd.extend(["--quiet"])
+        else:
+            cmd.extend(["--no-quiet"])
+
+        if target:
+            cmd.extend(["--target", target])
+
+        if use_colors:
+            cmd.extend(["--use-colors"])
+        else:
+            cmd.extend(["--no-use-colors"])
+
+        if vars:
+            cmd.extend(["--vars", json.dumps(vars)])
+
+        return cmd
+
+    def parse_sync(
+        self,
+        debug: Optional[bool] = False,
+        quiet: Optional[bool] = False,
+        target: Optional[str] = None,
+        use_colors: Optional[bool] = False,
+        vars: Optional[dict[str, Any]] = None,
+    ) -> dbtRunnerResult:
+        """Parse the project, and write its manifest. The result is the Manifest object."""
+        cmd = self.parse_command(
+            debug=debug,
+            quiet=quiet,
+            target=target,
+            use_colors=use_colors,
+            vars=vars,
+        )
+
         return dbtRunner().invoke(cmd[1:])
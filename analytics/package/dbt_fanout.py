@@ -0,0 +1,236 @@
+from asyncio.subprocess import PIPE, STDOUT
+from graphlib import TopologicalSorter
+from package.dbt import Dbt, load_run_results
+from package.types import DbtBranchResult, DbtFanoutStrategy, DbtResourceType, DbtRunSummary
+from prefect import get_run_logger, task
+from prefect.deployments import run_deployment
+from typing import Any, Dict, Iterable, List, Optional
+
+import asyncio
+import os
+import shutil
+import tempfile
+
+
+def get_selected_graph(
+    nodes: Dict[str, List[str]], selected: Iterable[str]
+) -> Dict[str, List[str]]:
+    """Return the dependencies between the selected nodes, including indirect dependencies
+    through nodes that are not selected.
+    """
+    selected = set(selected)
+    graph = {}
+
+    for unique_id in selected:
+        parents = set()
+        seen = set()
+        stack = list(nodes.get(unique_id, []))
+
+        while stack:
+            parent = stack.pop()
+
+            if parent in seen:
+                continue
+
+            seen.add(parent)
+
+            if parent in selected:
+                parents.add(parent)
+            else:
+                stack.extend(nodes.get(parent, []))
+
+        graph[unique_id] = sorted(parents)
+
+    return graph
+
+
+def split_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Split a graph into its independent (weakly connected) subgraphs, largest first."""
+    neighbours = {unique_id: set(parents) for unique_id, parents in graph.items()}
+
+    for unique_id, parents in graph.items():
+        for parent in parents:
+            neighbours[parent].add(unique_id)
+
+    components = []
+    seen = set()
+
+    for unique_id in sorted(graph):
+        if unique_id in seen:
+            continue
+
+        component = []
+        stack = [unique_id]
+        seen.add(unique_id)
+
+        while stack:
+            node = stack.pop()
+            component.append(node)
+
+            for neighbour in neighbours[node] - seen:
+                seen.add(neighbour)
+                stack.append(neighbour)
+
+        components.append(sorted(component))
+
+    return sorted(components, key=len, reverse=True)
+
+
+def split_layers(graph: Dict[str, List[str]]) -> List[List[str]]:
+    """Split a graph into topological layers. The nodes of a layer only depend on the nodes of
+    previous layers.
+    """
+    sorter = TopologicalSorter(graph)
+    sorter.prepare()
+    layers = []
+
+    while sorter.is_active():
+        layer = sorted(sorter.get_ready())
+        layers.append(layer)
+        sorter.done(*layer)
+
+    return layers
+
+
+def split_chunks(nodes: List[str], count: int) -> List[List[str]]:
+    """Split nodes into at most `count` chunks of about the same size."""
+    chunks = [nodes[index::count] for index in range(max(count, 1))]
+
+    return [chunk for chunk in chunks if chunk]
+
+
+@task(name="dbt_run_branch")
+async def run_branch(
+    project_dir: str,
+    names: List[str],
+    target: Optional[str] = None,
+    full_refresh: Optional[bool] = False,
+    vars: Optional[dict[str, Any]] = None,
+    deployment: Optional[str] = None,
+) -> DbtRunSummary | None:
+    """Run the nodes of a branch in a dbt process of its own, or as a flow run of a deployment
+    that runs dbt with the parameters `select`, `fail_fast`, `full_refresh`, `vars` and `target`.
+    The summary is only returned by the former.
+    """
+    select = " ".join(names)
+
+    if deployment is not None:
+        flow_run = await run_deployment(
+            deployment,
+            parameters={
+                "select": select,
+                "fail_fast": False,
+                "full_refresh": full_refresh,
+                "vars": vars,
+                "target": target,
+            },
+            timeout=None,
+        )
+
+        if not flow_run.state.is_completed():
+            raise Exception(f"Flow run '{flow_run.name}' ended in state {flow_run.state.name}")
+
+        return None
+
+    logger = get_run_logger()
+    dbt = Dbt(project_dir, target=target)
+    cmd = dbt.run_command(fail_fast=False, full_refresh=full_refresh, select=select, vars=vars)
+    # Every branch writes its artifacts to a directory of its own, so concurrent branches do not
+    # overwrite each other's run_results.json
+    target_path = tempfile.mkdtemp(prefix="fanout_", dir=os.path.join(project_dir, "target"))
+
+    try:
+        # Start from the partial parse state of the project, so branches do not parse it again
+        partial_parse_path = os.path.join(project_dir, "target", "partial_parse.msgpack")
+
+        if os.path.exists(partial_parse_path):
+            shutil.copy(partial_parse_path, target_path)
+
+        process = await asyncio.create_subprocess_exec(
+            *cmd, "--target-path", target_path, cwd=project_dir, stdout=PIPE, stderr=STDOUT
+        )
+        output, _ = await process.communicate()
+        logger.info(output.decode())
+        run_results_path = os.path.join(target_path, "run_results.json")
+
+        if not os.path.exists(run_results_path):
+            raise Exception(f"dbt run failed with exit code {process.returncode}")
+
+        return load_run_results(run_results_path)
+    finally:
+        shutil.rmtree(target_path, ignore_errors=True)
+
+
+async def dbt_fanout(
+    dbt: Dbt,
+    select: Optional[str] = None,
+    exclude: Optional[str] = None,
+    strategy: DbtFanoutStrategy = DbtFanoutStrategy.COMPONENTS,
+    concurrency: int = 4,
+    full_refresh: Optional[bool] = False,
+    vars: Optional[dict[str, Any]] = None,
+    deployment: Optional[str] = None,
+) -> List[DbtBranchResult]:
+    """Run the selected models in concurrent Prefect tasks, at most `concurrency` at a time.
+
+    With the components strategy, every independent subgraph of the selection is a branch. With
+    the layers strategy, the topological layers run one after the other, and every layer is
+    split into `concurrency` branches. A failing branch does not fail the other branches, but
+    the nodes that depend on its failed nodes are skipped.
+    """
+    models = dbt.list_resources(
+        resource_types=[DbtResourceType.MODEL], select=select, exclude=exclude
+    )
+    names = {model.unique_id: model.name for model in models}
+    nodes = {
+        resource["unique_id"]: (resource.get("depends_on") or {}).get("nodes") or []
+        for resource in dbt.resource_index.list()
+    }
+    graph = get_selected_graph(nodes, names)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(branch: List[str]) -> DbtBranchResult:
+        async with semaphore:
+            try:
+                summary = await run_branch(
+                    str(dbt.project_dir),
+                    [names[unique_id] for unique_id in branch],
+                    target=dbt.target,
+                    full_refresh=full_refresh,
+                    vars=vars,
+                    deployment=deployment,
+                )
+            except Exception as e:
+                return DbtBranchResult(nodes=branch, error=f"{type(e).__name__}: {e}")
+
+        if summary is not None:
+            await asyncio.to_thread(dbt.record_history, summary)
+
+        return DbtBranchResult(nodes=branch, summary=summary)
+
+    if strategy == DbtFanoutStrategy.COMPONENTS:
+        return list(await asyncio.gather(*[run(branch) for branch in split_components(graph)]))
+
+    results = []
+    failed = set()
+
+    for layer in split_layers(graph):
+        skipped = [
+            unique_id for unique_id in layer if any(parent in failed for parent in graph[unique_id])
+        ]
+        runnable = [unique_id for unique_id in layer if unique_id not in skipped]
+
+        if skipped:
+            failed.update(skipped)
+            results.append(DbtBranchResult(nodes=skipped, skipped=True))
+
+        layer_results = await asyncio.gather(
+            *[run(branch) for branch in split_chunks(runnable, concurrency)]
+        )
+
+        for result in layer_results:
+            failed.update(result.failed_nodes)
+
+        results.extend(layer_results)
+
+    return results
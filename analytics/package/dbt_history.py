@@ -0,0 +1,291 @@
+from collections import defaultdict
+from graphlib import TopologicalSorter
+from package.database import CHAdapter
+from package.types import CHTableIdentifier, DbtRunSummary, InsertReport
+from package.utils.yaml_utils import safe_load_file
+from typing import Any, Dict, List, Optional, TYPE_CHECKING
+
+import os
+
+if TYPE_CHECKING:
+    from package.dbt import Dbt
+
+DBT_RUN_HISTORY_TABLE = "dbt_run_history"
+
+DBT_RUN_HISTORY_COLUMNS = [
+    "invocation_id",
+    "project",
+    "generated_at",
+    "unique_id",
+    "name",
+    "resource_type",
+    "materialized",
+    "depends_on",
+    "status",
+    "thread",
+    "execution_time",
+    "started_at",
+    "completed_at",
+    "rows_affected",
+    "relation_name",
+    "table_rows",
+    "table_bytes",
+]
+
+
+def find_critical_path(nodes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return the chain of dependent nodes with the greatest total execution time. Dependencies
+    on nodes that are not in the list are ignored.
+    """
+    nodes_by_id = {node["unique_id"]: node for node in nodes}
+    graph = {
+        unique_id: [parent for parent in node["depends_on"] if parent in nodes_by_id]
+        for unique_id, node in nodes_by_id.items()
+    }
+    finished_at = {}
+    previous = {}
+
+    for unique_id in TopologicalSorter(graph).static_order():
+        parent = max(graph[unique_id], key=lambda parent: finished_at[parent], default=None)
+        finished_at[unique_id] = nodes_by_id[unique_id]["execution_time"] + (
+            finished_at[parent] if parent is not None else 0
+        )
+        previous[unique_id] = parent
+
+    path = []
+    unique_id = max(finished_at, key=finished_at.get, default=None)
+
+    while unique_id is not None:
+        path.append(nodes_by_id[unique_id])
+        unique_id = previous[unique_id]
+
+    return path[::-1]
+
+
+class DbtRunHistory:
+    """History of the node results of dbt runs in a ClickHouse table, for tracking the
+    performance of models over time.
+    """
+
+    def __init__(
+        self,
+        adapter: CHAdapter,
+        database: Optional[str] = None,
+        table: str = DBT_RUN_HISTORY_TABLE,
+    ) -> None:
+        if database is None:
+            database = adapter.settings.database
+
+        self.adapter = adapter
+        self.database = database
+        self.table = table
+
+    @property
+    def quoted_table(self) -> str:
+        return CHTableIdentifier(database=self.database, table=self.table).to_string()
+
+    def create_table(self) -> None:
+        statement = f"""
+        create table if not exists {self.quoted_table} (
+            invocation_id String,
+            project LowCardinality(String),
+            generated_at DateTime64(6, 'UTC'),
+            unique_id String,
+            name String,
+            resource_type LowCardinality(String),
+            materialized LowCardinality(String),
+            depends_on Array(String),
+            status LowCardinality(String),
+            thread LowCardinality(String),
+            execution_time Float64,
+            started_at Nullable(DateTime64(6, 'UTC')),
+            completed_at Nullable(DateTime64(6, 'UTC')),
+            rows_affected Nullable(Int64),
+            relation_name Nullable(String),
+            table_rows Nullable(UInt64),
+            table_bytes Nullable(UInt64)
+        )
+        engine = MergeTree
+        partition by toYYYYMM(generated_at)
+        order by (project, unique_id, generated_at)
+        """
+        self.adapter.create_table(self.table, statement, database=self.database)
+
+    def ingest(self, summary: DbtRunSummary, dbt: "Dbt") -> InsertReport:
+        """Insert the results of a run, with the metadata of the nodes from the manifest and the
+        size of the tables that were built.
+        """
+        self.create_table()
+
+        project = safe_load_file(os.path.join(dbt.project_dir, "dbt_project.yml"))["name"]
+        table_stats = self.get_table_stats(summary)
+        # Refresh the index once, instead of checking the project files for every result
+        resource_index = dbt.resource_index
+        resource_index.refresh()
+        rows = []
+
+        for result in summary.results:
+            resource = resource_index.resources.get(result.unique_id) or {}
+            relation = table_stats.get(result.relation_name)
+
+            rows.append(
+                [
+                    summary.invocation_id,
+                    project,
+                    summary.generated_at,
+                    result.unique_id,
+                    resource.get("name") or result.unique_id.split(".")[-1],
+                    resource.get("resource_type") or result.unique_id.split(".")[0],
+                    (resource.get("config") or {}).get("materialized") or "",
+                    (resource.get("depends_on") or {}).get("nodes") or [],
+                    result.status,
+                    result.thread or "",
+                    result.execution_time,
+                    result.started_at,
+                    result.completed_at,
+                    result.rows_affected,
+                    result.relation_name,
+                    relation.rows if relation else None,
+                    relation.total_bytes if relation else None,
+                ]
+            )
+
+        return self.adapter.insert(
+            self.table, rows, column_names=DBT_RUN_HISTORY_COLUMNS, database=self.database
+        )
+
+    def get_table_stats(self, summary: DbtRunSummary) -> Dict[str, Any]:
+        """Return the stats of the tables that were built by a run, by relation name."""
+        relation_names = defaultdict(dict)
+
+        for result in summary.results:
+            if result.relation_name and result.status == "success":
+                identifier = CHTableIdentifier.from_string(result.relation_name)
+                database = identifier.database or self.adapter.settings.database
+                relation_names[database][identifier.table] = result.relation_name
+
+        table_stats = {}
+
+        for database, tables in relation_names.items():
+            for stats in self.adapter.get_database_stats(database=database):
+                if stats.table in tables:
+                    table_stats[tables[stats.table]] = stats
+
+        return table_stats
+
+    def get_slowest(
+        self, days: int = 7, limit: int = 20, project: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        statement = f"""
+        select
+            unique_id,
+            argMax(materialized, generated_at) as materialization,
+            count() as runs,
+            avg(execution_time) as avg_time,
+            quantile(0.95)(execution_time) as p95_time,
+            argMax(execution_time, generated_at) as latest_time,
+            argMax(table_rows, generated_at) as latest_rows,
+            argMax(table_bytes, generated_at) as latest_bytes
+        from {self.quoted_table}
+        where
+            generated_at >= now() - toIntervalDay({{days:UInt32}})
+            and resource_type = 'model'
+            and status = 'success'
+            and ({{project:Nullable(String)}} is null or project = {{project:Nullable(String)}})
+        group by unique_id
+        order by avg_time desc
+        limit {{limit:UInt32}}
+        """
+
+        with self.adapter.create_client() as client:
+            result = client.query(
+                statement, parameters={"days": days, "limit": limit, "project": project}
+            )
+
+        return list(result.named_results())
+
+    def get_regressions(
+        self,
+        days: int = 30,
+        baseline_runs: int = 10,
+        min_baseline_runs: int = 3,
+        limit: int = 20,
+        project: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Compare the latest execution time of every model with the median of its previous
+        runs.
+        """
+        statement = f"""
+        select
+            unique_id,
+            anyIf(execution_time, run = 1) as latest_time,
+            quantileIf(0.5)(execution_time, run > 1) as baseline_time,
+            countIf(run > 1) as baseline_runs,
+            latest_time / baseline_time as ratio
+        from (
+            select
+                unique_id,
+                execution_time,
+                row_number() over (partition by unique_id order by generated_at desc) as run
+            from {self.quoted_table}
+            where
+                generated_at >= now() - toIntervalDay({{days:UInt32}})
+                and resource_type = 'model'
+                and status = 'success'
+                and ({{project:Nullable(String)}} is null or project = {{project:Nullable(String)}})
+        )
+        where run <= {{baseline_runs:UInt32}} + 1
+        group by unique_id
+        having baseline_runs >= {{min_baseline_runs:UInt32}} and baseline_time > 0
+        order by ratio desc
+        limit {{limit:UInt32}}
+        """
+
+        with self.adapter.create_client() as client:
+            result = client.query(
+                statement,
+                parameters={
+                    "days": days,
+                    "baseline_runs": baseline_runs,
+                    "min_baseline_runs": min_baseline_runs,
+                    "limit": limit,
+                    "project": project,
+                },
+            )
+
+        return list(result.named_results())
+
+    def get_critical_path(
+        self, invocation_id: Optional[str] = None, project: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Return the critical path of a run (by default the latest run of a model)."""
+        with self.adapter.create_client() as client:
+            if invocation_id is None:
+                result = client.query(
+                    f"""
+                    select invocation_id
+                    from {self.quoted_table}
+                    where
+                        resource_type = 'model'
+                        and ({{project:Nullable(String)}} is null or project = {{project:Nullable(String)}})
+                    order by generated_at desc
+                    limit 1
+                    """,
+                    parameters={"project": project},
+                )
+
+                if not result.result_rows:
+                    return []
+
+                invocation_id = result.result_rows[0][0]
+
+            result = client.query(
+                f"""
+                select unique_id, depends_on, status, execution_time, started_at, completed_at
+                from {self.quoted_table}
+                where invocation_id = {{invocation_id:String}}
+                """,
+                parameters={"invocation_id": invocation_id},
+            )
+
+        return find_critical_path(list(result.named_results()))
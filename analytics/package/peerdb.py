@@ -106,8 +106,22 @@ class PeerDB:
                     raise Exception(f"Peer '{PEERDB_SOURCE_PEER}' not found in PeerDB config")
 
                 pg_settings = to_pg_settings(source_peer["postgres_config"])
+                source_schemas = pydash.uniq(
+                    [
+                        PGTableIdentifier.from_string(
+                            table_mapping["source_table_identifier"]
+                        ).schema_
+                        for mirror in result["mirrors"].values()
+                        for table_mapping in mirror["table_mappings"]
+                    ]
+                )
                 source_adapter = PGAdapter(pg_settings)
-                source_tables = source_adapter.list_tables()
+
+                # Fetch the tables and columns of all source schemas in a single round trip
+                try:
+                    source_catalog = source_adapter.get_catalog(schema=source_schemas)
+                finally:
+                    source_adapter.close()
 
                 dbt = Dbt(dbt_project_dir)
                 dbt_sources = dbt.list_resources(resource_types=[DbtResourceType.SOURCE])
@@ -121,12 +135,8 @@ class PeerDB:
                         source_table_identifier = PGTableIdentifier.from_string(
                             table_mapping["source_table_identifier"]
                         )
-                        source_table = pydash.find(
-                            source_tables,
-                            lambda table: (
-                                table.schema == source_table_identifier.schema_
-                                and table.name == source_table_identifier.table
-                            ),
+                        source_table = source_catalog.get_table(
+                            source_table_identifier.table, schema=source_table_identifier.schema_
                         )
 
                         if source_table is None:
@@ -149,7 +159,7 @@ class PeerDB:
                             )
 
                         # Compute the excluded columns (difference between source and destination tables)
-                        source_columns = [str(column.name) for column in source_table.columns]
+                        source_columns = source_table.column_names
                         dbt_source_columns = [
                             column.name for column in dbt_source.original_config.columns
                         ]
@@ -103,6 +103,10 @@ class Project:
     def flows_directory(self) -> Path:
         return Path(os.path.join(self.directory, "flows"))
 
+    @cached_property
+    def models_directory(self) -> Path:
+        return Path(os.path.join(self.directory, "models"))
+
     @cached_property
     def notebooks_directory(self) -> Path:
         return Path(os.path.join(self.directory, "notebooks"))
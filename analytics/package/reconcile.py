@@ -0,0 +1,469 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from package.backfill import BACKFILL_KEY_DATA_TYPES
+from package.database import CHAdapter, PGAdapter
+from package.database.catalog import CatalogTable
+from package.types import (
+    CHIdentifier,
+    CHTableIdentifier,
+    PGIdentifier,
+    PGTableIdentifier,
+    ReconcileRange,
+    ReconcileReport,
+)
+from typing import Any, Callable, Dict, List, Optional
+
+import math
+import re
+import threading
+import time
+
+# Columns that PeerDB adds to destination tables
+PEERDB_IS_DELETED_COLUMN = "_peerdb_is_deleted"
+PEERDB_VERSION_COLUMN = "_peerdb_version"
+
+# Sum of row hashes, which does not depend on the order of the rows. ClickHouse sums Int64 modulo
+# 2^64, so the sums of Postgres are reduced modulo 2^64 too.
+HASH_MODULUS = 1 << 64
+
+# Expressions that render a column the same on both sides, by category of the Postgres type.
+# Floats are rendered as the bits of their double precision value, because the text of floats
+# differs between Postgres and ClickHouse (e.g. 1e+20 and 100000000000000000000).
+RECONCILE_EXPRESSIONS = {
+    "boolean": ("{column}::int::text", "toString(toUInt8({column}))"),
+    "date": ("({column} - date '1970-01-01')::text", "toString(toInt32({column}))"),
+    "float": (
+        "('x' || encode(float8send({column}::float8), 'hex'))::bit(64)::bigint::text",
+        "toString(reinterpretAsInt64(toFloat64({column})))",
+    ),
+    "integer": ("{column}::text", "toString({column})"),
+    "numeric": ("trim_scale({column})::text", "toString({column})"),
+    "text": ("{column}::text", "toString({column})"),
+    "timestamp": (
+        "floor(extract(epoch from {column}) * 1000000)::bigint::text",
+        "toString(toUnixTimestamp64Micro(toDateTime64({column}, 6)))",
+    ),
+}
+
+_type_categories = [
+    (re.compile(r"^boolean$"), "boolean"),
+    (re.compile(r"^date$"), "date"),
+    (re.compile(r"^(real|double precision)$"), "float"),
+    (re.compile(r"^(smallint|integer|bigint)$"), "integer"),
+    (re.compile(r"^numeric"), "numeric"),
+    (re.compile(r"^(text|character varying|character|uuid|citext)"), "text"),
+    (re.compile(r"^timestamp"), "timestamp"),
+]
+
+
+def get_type_category(data_type: str) -> str | None:
+    # Arrays are rendered differently by Postgres and ClickHouse
+    if data_type.endswith("]"):
+        return None
+
+    for pattern, category in _type_categories:
+        if pattern.match(data_type):
+            return category
+
+
+def split_bounds(start: int, end: int, count: int) -> List[tuple[int, int]]:
+    """Split the half-open range [start, end) into at most `count` half-open ranges."""
+    count = max(min(count, end - start), 1)
+    step = math.ceil((end - start) / count)
+    bounds = list(range(start, end, step)) + [end]
+
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class Reconcile:
+    """Compare mirrored tables between Postgres and ClickHouse by row counts and order-independent
+    hashes of key ranges. Only mismatching ranges are split further, down to the rows.
+    """
+
+    def __init__(
+        self,
+        source: PGAdapter,
+        destination: CHAdapter,
+        workers: int = 4,
+        ranges: int = 16,
+        fanout: int = 16,
+        leaf_rows: int = 1000,
+        max_keys: int = 100,
+    ) -> None:
+        if workers > destination.pool_size:
+            raise Exception("'workers' must not be greater than the pool size of the destination")
+
+        self.source = source
+        self.destination = destination
+        self.workers = workers
+        self.ranges = ranges
+        self.fanout = fanout
+        self.leaf_rows = leaf_rows
+        self.max_keys = max_keys
+
+    def run(self, table_mapping: dict, database: Optional[str] = None) -> ReconcileReport:
+        started_at = time.perf_counter()
+        source_table_identifier = PGTableIdentifier.from_string(
+            table_mapping["source_table_identifier"]
+        )
+        destination_table_identifier = CHTableIdentifier.from_string(
+            table_mapping["destination_table_identifier"]
+        )
+        schema = source_table_identifier.schema_ or self.source.settings.schema_
+        database = (
+            destination_table_identifier.database or database or self.destination.settings.database
+        )
+
+        source_table = self.source.get_catalog(schema=schema).get_table(
+            source_table_identifier.table, schema=schema
+        )
+        destination_table = self.destination.get_catalog(database=database).get_table(
+            destination_table_identifier.table
+        )
+
+        if source_table is None:
+            raise Exception(
+                f"Source table '{table_mapping['source_table_identifier']}' not found in source database"
+            )
+
+        if destination_table is None:
+            raise Exception(
+                f"Destination table '{table_mapping['destination_table_identifier']}' not found in destination database"
+            )
+
+        primary_key = self.source.get_primary_key(source_table.name, schema=schema)
+        key = None
+
+        if (
+            len(primary_key) == 1
+            and source_table.get_column(primary_key[0]).data_type in BACKFILL_KEY_DATA_TYPES
+        ):
+            key = primary_key[0]
+
+        exclude = table_mapping.get("exclude", [])
+        columns = []
+        skipped_columns = []
+
+        for column in source_table.columns:
+            if column.name in exclude:
+                continue
+
+            if (
+                get_type_category(column.data_type) is None
+                or destination_table.get_column(column.name) is None
+            ):
+                skipped_columns.append(column.name)
+            else:
+                columns.append(column.name)
+
+        if not columns:
+            raise Exception(
+                f"No columns of '{table_mapping['source_table_identifier']}' can be compared "
+                f"(skipped: {', '.join(skipped_columns) or 'none'})"
+            )
+
+        comparison = TableComparison(
+            self,
+            source_table,
+            destination_table,
+            key,
+            columns,
+            primary_key,
+        )
+        report = comparison.run()
+        report.source_table = table_mapping["source_table_identifier"]
+        report.destination_table = table_mapping["destination_table_identifier"]
+        report.skipped_columns = skipped_columns
+        report.elapsed = time.perf_counter() - started_at
+
+        return report
+
+
+class TableComparison:
+    def __init__(
+        self,
+        reconcile: Reconcile,
+        source_table: CatalogTable,
+        destination_table: CatalogTable,
+        key: Optional[str],
+        columns: List[str],
+        primary_key: List[str],
+    ) -> None:
+        self.reconcile = reconcile
+        self.source_table = source_table
+        self.destination_table = destination_table
+        self.key = key
+        self.columns = columns
+        self.primary_key = primary_key
+        self.report = ReconcileReport(
+            source_table=source_table.name,
+            destination_table=destination_table.name,
+            key=key,
+            columns=columns,
+        )
+        self._lock = threading.Lock()
+
+    def run(self) -> ReconcileReport:
+        with (
+            ThreadPoolExecutor(max_workers=self.reconcile.workers) as source_executor,
+            ThreadPoolExecutor(max_workers=self.reconcile.workers) as destination_executor,
+        ):
+            self._source_executor = source_executor
+            self._destination_executor = destination_executor
+
+            if self.key is None:
+                # Without an integer key, the table can only be compared as a whole
+                pending = [ReconcileRange()]
+            else:
+                source_bounds, destination_bounds = self._run_both(
+                    self.create_source_bounds_query(), self.create_destination_bounds_query()
+                )
+                starts = [
+                    row[0][0]
+                    for row in [source_bounds, destination_bounds]
+                    if row[0][0] is not None
+                ]
+                ends = [
+                    row[0][1]
+                    for row in [source_bounds, destination_bounds]
+                    if row[0][1] is not None
+                ]
+
+                if not starts:
+                    return self.report
+
+                pending = [
+                    ReconcileRange(start=start, end=end)
+                    for start, end in split_bounds(
+                        min(starts), max(ends) + 1, self.reconcile.ranges
+                    )
+                ]
+
+            leaves = []
+
+            while pending:
+                ranges = self._compare_ranges(pending)
+                pending = []
+
+                for range_ in ranges:
+                    if range_.depth == 0:
+                        self.report.source_rows += range_.source_rows
+                        self.report.destination_rows += range_.destination_rows
+
+                    if range_.matches:
+                        continue
+
+                    if (
+                        self.key is None
+                        or range_.end - range_.start <= self.reconcile.leaf_rows
+                        or max(range_.source_rows, range_.destination_rows)
+                        <= self.reconcile.leaf_rows
+                    ):
+                        leaves.append(range_)
+                    else:
+                        pending.extend(
+                            ReconcileRange(start=start, end=end, depth=range_.depth + 1)
+                            for start, end in split_bounds(
+                                range_.start, range_.end, self.reconcile.fanout
+                            )
+                        )
+
+            self.report.mismatched_ranges = sorted(leaves, key=lambda range_: range_.start or 0)
+
+            if self.key is not None:
+                for range_ in self.report.mismatched_ranges:
+                    self._compare_rows(range_)
+
+        return self.report
+
+    def _run(self, side: str, query: str) -> List[tuple]:
+        started_at = time.perf_counter()
+
+        if side == "source":
+            with self.reconcile.source.create_client() as (conn, cur):
+                cur.execute(query)
+                result = cur.fetchall()
+        else:
+            with self.reconcile.destination.create_client() as client:
+                result = client.query(query).result_rows
+
+        with self._lock:
+            if side == "source":
+                self.report.source_elapsed += time.perf_counter() - started_at
+            else:
+                self.report.destination_elapsed += time.perf_counter() - started_at
+
+        return result
+
+    def _submit(self, side: str, query: str) -> Future:
+        executor = self._source_executor if side == "source" else self._destination_executor
+
+        return executor.submit(self._run, side, query)
+
+    def _run_both(
+        self, source_query: str, destination_query: str
+    ) -> tuple[List[tuple], List[tuple]]:
+        source_future = self._submit("source", source_query)
+        destination_future = self._submit("destination", destination_query)
+
+        return source_future.result(), destination_future.result()
+
+    def _compare_ranges(self, ranges: List[ReconcileRange]) -> List[ReconcileRange]:
+        futures = [
+            (
+                range_,
+                self._submit("source", self.create_source_range_query(range_)),
+                self._submit("destination", self.create_destination_range_query(range_)),
+            )
+            for range_ in ranges
+        ]
+
+        for range_, source_future, destination_future in futures:
+            range_.source_rows, range_.source_hash = source_future.result()[0]
+            range_.destination_rows, range_.destination_hash = destination_future.result()[0]
+            range_.source_hash = int(range_.source_hash or 0) % HASH_MODULUS
+            range_.destination_hash = int(range_.destination_hash or 0) % HASH_MODULUS
+
+        self.report.ranges += len(ranges)
+
+        return ranges
+
+    def _compare_rows(self, range_: ReconcileRange) -> None:
+        source_rows, destination_rows = self._run_both(
+            self.create_source_rows_query(range_), self.create_destination_rows_query(range_)
+        )
+        source_hashes: Dict[Any, int] = dict(source_rows)
+        destination_hashes: Dict[Any, int] = dict(destination_rows)
+
+        def add(keys: List[Any], values: List[Any]) -> None:
+            keys.extend(sorted(values)[: max(self.reconcile.max_keys - len(keys), 0)])
+
+        add(
+            self.report.missing_keys,
+            [key for key in source_hashes if key not in destination_hashes],
+        )
+        add(self.report.extra_keys, [key for key in destination_hashes if key not in source_hashes])
+        add(
+            self.report.different_keys,
+            [
+                key
+                for key, value in source_hashes.items()
+                if key in destination_hashes and destination_hashes[key] != value
+            ],
+        )
+
+    def create_source_row_hash(self) -> str:
+        expressions = [
+            "coalesce({}, '\\N')".format(
+                RECONCILE_EXPRESSIONS[
+                    get_type_category(self.source_table.get_column(column).data_type)
+                ][0].format(column=PGIdentifier.quote(column))
+            )
+            for column in self.columns
+        ]
+
+        return f"('x' || substr(md5(concat_ws(chr(31), {', '.join(expressions)})), 1, 16))::bit(64)::bigint"
+
+    def create_destination_row_hash(self) -> str:
+        expressions = [
+            "ifNull({}, '\\\\N')".format(
+                RECONCILE_EXPRESSIONS[
+                    get_type_category(self.source_table.get_column(column).data_type)
+                ][1].format(column=CHIdentifier.quote(column))
+            )
+            for column in self.columns
+        ]
+
+        # The first 8 bytes of the MD5 hash as a big-endian Int64, like bit(64)::bigint in Postgres
+        return (
+            "reinterpretAsInt64(reverse(unhex(substring(hex(MD5("
+            f"concatWithSeparator(char(31), {', '.join(expressions)})"
+            ")), 1, 16))))"
+        )
+
+    def create_source_from(self) -> str:
+        return PGTableIdentifier(
+            schema_=self.source_table.schema_, table=self.source_table.name
+        ).to_string()
+
+    def create_destination_from(self, range_: Optional[ReconcileRange] = None) -> str:
+        """Select the latest version of every row that is not deleted. The range is applied
+        before the rows are deduplicated, so only the rows of the range are read and sorted.
+        """
+        quoted_table = CHTableIdentifier(
+            database=self.destination_table.database, table=self.destination_table.name
+        ).to_string()
+        column_names = self.destination_table.column_names
+        engine = self.destination_table.engine or ""
+        where = self.create_where(range_, CHIdentifier.quote) if range_ is not None else ""
+
+        if "Replacing" in engine:
+            # The engine keeps the row with the greatest version
+            query = f"select * from {quoted_table} final{where}"
+        elif PEERDB_VERSION_COLUMN in column_names and self.primary_key:
+            quoted_primary_key = ", ".join(
+                CHIdentifier.quote(column) for column in self.primary_key
+            )
+            # The key is the primary key, so filtering by the range does not change which version
+            # of a row is the latest
+            query = (
+                f"select * from {quoted_table}{where} "
+                f"order by {CHIdentifier.quote(PEERDB_VERSION_COLUMN)} desc "
+                f"limit 1 by {quoted_primary_key}"
+            )
+        else:
+            query = f"select * from {quoted_table}{where}"
+
+        if PEERDB_IS_DELETED_COLUMN in column_names:
+            query = (
+                f"select * from ({query}) where {CHIdentifier.quote(PEERDB_IS_DELETED_COLUMN)} = 0"
+            )
+
+        return f"({query})"
+
+    def create_where(self, range_: ReconcileRange, quote: Callable[[str], str]) -> str:
+        conditions = []
+
+        if range_.start is not None:
+            conditions.append(f"{quote(self.key)} >= {int(range_.start)}")
+
+        if range_.end is not None:
+            conditions.append(f"{quote(self.key)} < {int(range_.end)}")
+
+        return f" where {' and '.join(conditions)}" if conditions else ""
+
+    def create_source_bounds_query(self) -> str:
+        quoted_key = PGIdentifier.quote(self.key)
+
+        return f"select min({quoted_key}), max({quoted_key}) from {self.create_source_from()};"
+
+    def create_destination_bounds_query(self) -> str:
+        quoted_key = CHIdentifier.quote(self.key)
+
+        return (
+            f"select min({quoted_key}), max({quoted_key}) from {self.create_destination_from()} "
+            "settings aggregate_functions_null_for_empty = 1;"
+        )
+
+    def create_source_range_query(self, range_: ReconcileRange) -> str:
+        return (
+            f"select count(*), sum({self.create_source_row_hash()}) "
+            f"from {self.create_source_from()}{self.create_where(range_, PGIdentifier.quote)};"
+        )
+
+    def create_destination_range_query(self, range_: ReconcileRange) -> str:
+        return (
+            f"select count(), sum({self.create_destination_row_hash()}) "
+            f"from {self.create_destination_from(range_)};"
+        )
+
+    def create_source_rows_query(self, range_: ReconcileRange) -> str:
+        return (
+            f"select {PGIdentifier.quote(self.key)}, {self.create_source_row_hash()} "
+            f"from {self.create_source_from()}{self.create_where(range_, PGIdentifier.quote)};"
+        )
+
+    def create_destination_rows_query(self, range_: ReconcileRange) -> str:
+        return (
+            f"select {CHIdentifier.quote(self.key)}, {self.create_destination_row_hash()} "
+            f"from {self.create_destination_from(range_)};"
+        )
@@ -0,0 +1,106 @@
+from package.backfill import Backfill
+from package.database import CHAdapter, PGAdapter
+from package.tests.fixtures.database import DBTest
+from package.types import BackfillMethod, CHTableIdentifier, PGTableIdentifier
+from pathlib import Path
+from typing import Any, Generator
+
+import pytest
+
+
+class TestBackfill(DBTest):
+    @pytest.fixture(scope="function")
+    def table_mapping(
+        self, pg_adapter: PGAdapter, ch_adapter: CHAdapter
+    ) -> Generator[dict, Any, None]:
+        table = "test_backfill"
+        pg_adapter.create_table(
+            table,
+            f"""
+            create table {PGTableIdentifier(table=table).to_string()} (
+                id bigint primary key,
+                name text,
+                secret text,
+                tags text[],
+                scores integer[],
+                updated_at timestamptz default now()
+            );
+            insert into {PGTableIdentifier(table=table).to_string()} (id, name, secret, tags, scores)
+            select id, 'name_' || id, 'secret', array['a', 'b"c', null], array[id, 2]
+            from generate_series(1, 1000) as id;
+            analyze {PGTableIdentifier(table=table).to_string()};
+            """,
+        )
+        ch_adapter.create_table(
+            table,
+            f"""
+            create table {CHTableIdentifier(table=table).to_string()}
+            (
+                id Int64,
+                name Nullable(String),
+                tags Array(Nullable(String)),
+                scores Array(Int32),
+                updated_at DateTime64(6)
+            )
+            engine = ReplacingMergeTree
+            order by id
+            """,
+        )
+
+        yield {
+            "source_table_identifier": f"{pg_adapter.settings.schema_}.{table}",
+            "destination_table_identifier": table,
+            "exclude": ["secret"],
+        }
+
+        pg_adapter.drop_table(table)
+        ch_adapter.drop_table(table)
+
+    @pytest.mark.parametrize("method", [BackfillMethod.PRIMARY_KEY, BackfillMethod.CTID])
+    def test_run(
+        self,
+        pg_adapter: PGAdapter,
+        ch_adapter: CHAdapter,
+        table_mapping: dict,
+        tmp_path: Path,
+        method: BackfillMethod,
+    ):
+        backfill = Backfill(pg_adapter, ch_adapter, tmp_path, workers=2, range_size=300)
+        progress = backfill.run(table_mapping, method=method)
+
+        assert progress.ranges == 4
+        assert progress.ranges_done == 4
+        assert progress.rows == 1000
+
+        with ch_adapter.create_client() as client:
+            assert client.command("select count(), max(id) from test_backfill;") == [1000, 1000]
+            assert client.query(
+                "select tags, scores from test_backfill where id = 1;"
+            ).result_rows == [(["a", 'b"c', None], [1, 2])]
+
+    def test_run_resume(
+        self, pg_adapter: PGAdapter, ch_adapter: CHAdapter, table_mapping: dict, tmp_path: Path
+    ):
+        backfill = Backfill(pg_adapter, ch_adapter, tmp_path, workers=2, range_size=300)
+        checkpoint = backfill.plan(table_mapping)
+        checkpoint.ranges[0].done = True
+        backfill.save_checkpoint(table_mapping, checkpoint)
+
+        progress = backfill.run(table_mapping)
+
+        assert progress.ranges_done == 4
+        assert progress.rows < 1000
+        assert all(range_.done for range_ in backfill.load_checkpoint(table_mapping).ranges)
+
+    def test_run_replan_changed_columns(
+        self, pg_adapter: PGAdapter, ch_adapter: CHAdapter, table_mapping: dict, tmp_path: Path
+    ):
+        backfill = Backfill(pg_adapter, ch_adapter, tmp_path, workers=2, range_size=300)
+        checkpoint = backfill.plan({**table_mapping, "exclude": []})
+        checkpoint.ranges[0].done = True
+        backfill.save_checkpoint(table_mapping, checkpoint)
+
+        progress = backfill.run(table_mapping)
+
+        assert progress.rows == 1000
+        assert "secret" not in backfill.load_checkpoint(table_mapping).columns
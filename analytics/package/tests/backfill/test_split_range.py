@@ -0,0 +1,15 @@
+from package.backfill import split_range
+
+
+class TestSplitRange:
+    def test_single_range(self):
+        assert split_range(1, 100, 1) == [(None, None)]
+
+    def test_even_ranges(self):
+        assert split_range(1, 100, 4) == [(None, 26), (26, 51), (51, 76), (76, None)]
+
+    def test_uneven_ranges(self):
+        assert split_range(0, 9, 3) == [(None, 4), (4, 8), (8, None)]
+
+    def test_more_ranges_than_values(self):
+        assert split_range(1, 2, 10) == [(None, 2), (2, None)]
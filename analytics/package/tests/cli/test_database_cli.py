@@ -0,0 +1,61 @@
+from package.cli.database_cli import _format_bytes, _sort_stats, StatsSortKey
+from package.types import ColumnStats, TableStats
+
+import unittest
+
+
+def create_stats(table: str, **kwargs) -> TableStats:
+    return TableStats(database="test", table=table, **kwargs)
+
+
+class TestSortStats(unittest.TestCase):
+    def test_total_bytes(self):
+        stats = [
+            create_stats("a", total_bytes=10),
+            create_stats("b", total_bytes=30),
+            create_stats("c", total_bytes=20),
+        ]
+
+        actual = [table_stats.table for table_stats in _sort_stats(stats, StatsSortKey.total_bytes)]
+
+        self.assertEqual(actual, ["b", "c", "a"])
+
+    def test_compression_ratio(self):
+        stats = [
+            create_stats("a"),
+            create_stats("b", compressed_bytes=10, uncompressed_bytes=20),
+            create_stats("c", compressed_bytes=10, uncompressed_bytes=50),
+        ]
+
+        actual = [
+            table_stats.table
+            for table_stats in _sort_stats(stats, StatsSortKey.compression_ratio, limit=2)
+        ]
+
+        self.assertEqual(actual, ["c", "b"])
+
+    def test_table(self):
+        stats = [create_stats("b"), create_stats("a")]
+
+        actual = [table_stats.table for table_stats in _sort_stats(stats, StatsSortKey.table)]
+
+        self.assertEqual(actual, ["a", "b"])
+
+
+class TestFormatBytes(unittest.TestCase):
+    def test_format_bytes(self):
+        self.assertEqual(_format_bytes(None), "")
+        self.assertEqual(_format_bytes(512), "512 B")
+        self.assertEqual(_format_bytes(1536), "1.5 KiB")
+        self.assertEqual(_format_bytes(3 * 1024**3), "3.0 GiB")
+
+
+class TestTableStats(unittest.TestCase):
+    def test_ratios(self):
+        column_stats = ColumnStats(
+            name="id", data_type="UInt64", compressed_bytes=0, uncompressed_bytes=0
+        )
+        table_stats = create_stats("a", live_tuples=75, dead_tuples=25)
+
+        self.assertIsNone(column_stats.compression_ratio)
+        self.assertEqual(table_stats.dead_tuple_ratio, 0.25)
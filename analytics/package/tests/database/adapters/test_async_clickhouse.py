@@ -0,0 +1,27 @@
+from package.database import AsyncCHAdapter
+from package.tests.fixtures.database import DBTest, settings
+
+import asyncio
+
+
+class TestAsyncCHAdapter(DBTest):
+    def test_create_client(self):
+        async def run():
+            async with AsyncCHAdapter(settings.test_clickhouse, pool_size=2) as adapter:
+                async with adapter.create_client() as client:
+                    result = await client.query("select 1;")
+
+                return result.result_rows
+
+        assert asyncio.run(run()) == [(1,)]
+
+    def test_methods(self):
+        async def run():
+            async with AsyncCHAdapter(settings.test_clickhouse, pool_size=2) as adapter:
+                return await asyncio.gather(
+                    adapter.has_database(adapter.settings.database),
+                    adapter.has_table("non_existent"),
+                    adapter.query_records("select number from system.numbers limit 2;"),
+                )
+
+        assert asyncio.run(run()) == [True, False, [{"number": 0}, {"number": 1}]]
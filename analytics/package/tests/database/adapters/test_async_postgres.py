@@ -0,0 +1,37 @@
+from package.database import AsyncPGAdapter
+from package.tests.fixtures.database import DBTest, settings
+
+import asyncio
+
+
+class TestAsyncPGAdapter(DBTest):
+    def test_fetch(self):
+        async def run():
+            async with AsyncPGAdapter(settings.test_postgres) as adapter:
+                rows = await adapter.fetch("select %(value)s::int as value;", {"value": 1})
+
+                return [dict(row) for row in rows]
+
+        assert asyncio.run(run()) == [{"value": 1}]
+
+    def test_stream(self):
+        async def run():
+            async with AsyncPGAdapter(settings.test_postgres) as adapter:
+                return [
+                    batch
+                    async for batch in adapter.stream(
+                        "select generate_series(1, %(count)s);", {"count": 5}, batch_size=2
+                    )
+                ]
+
+        assert asyncio.run(run()) == [[(1,), (2,)], [(3,), (4,)], [(5,)]]
+
+    def test_methods(self):
+        async def run():
+            async with AsyncPGAdapter(settings.test_postgres) as adapter:
+                return await asyncio.gather(
+                    adapter.has_database(adapter.settings.database),
+                    adapter.has_table("non_existent"),
+                )
+
+        assert asyncio.run(run()) == [True, False]
@@ -1,11 +1,15 @@
 from clickhouse_connect.driver.exceptions import DatabaseError
+from datetime import date
 from package.database import CHAdapter
+from package.database.result_cache import ResultCache
 from package.tests.asserts import assert_equal_ignoring_whitespace
 from package.tests.fixtures.database import DBTest
-from package.types import CHTableIdentifier
+from package.types import CHTableIdentifier, StreamFormat
 from sqlmodel import Session, Table, text
 from typing import Any, Generator
 
+import pandas as pd
+import pyarrow as pa
 import pytest
 
 
@@ -30,6 +34,10 @@ class TestCHAdapter(DBTest):
 
         ch_adapter.drop_table(table)
 
+    def count_rows(self, ch_adapter: CHAdapter, table: str) -> int:
+        with ch_adapter.create_client() as client:
+            return client.command(f"select count() from {table};")
+
     def test_clickhouse_client(self, ch_adapter: CHAdapter):
         with ch_adapter.create_client() as client:
             actual = client.query(
@@ -38,6 +46,46 @@ class TestCHAdapter(DBTest):
             ).result_rows
         assert actual == [(1,)]
 
+    def test_clickhouse_client_reused(self, ch_adapter: CHAdapter):
+        with ch_adapter.create_client() as client:
+            pass
+
+        with ch_adapter.create_client() as other_client:
+            assert other_client is client
+
+    def test_stream_rows(self, ch_adapter: CHAdapter):
+        blocks = list(ch_adapter.stream("select number from numbers(10);", block_size=4))
+
+        assert [row for block in blocks for row in block] == [(number,) for number in range(10)]
+
+    def test_stream_arrow(self, ch_adapter: CHAdapter):
+        batches = list(
+            ch_adapter.stream("select number from numbers(10);", format=StreamFormat.ARROW)
+        )
+
+        assert sum(batch.num_rows for batch in batches) == 10
+
+    def test_stream_pandas(self, ch_adapter: CHAdapter):
+        dfs = list(
+            ch_adapter.stream(
+                "select number from numbers({count:UInt64});",
+                parameters={"count": 10},
+                format=StreamFormat.PANDAS,
+            )
+        )
+
+        assert sum(len(df) for df in dfs) == 10
+
+    def test_stream_closed_early(self, ch_adapter: CHAdapter):
+        stream = ch_adapter.stream("select number from numbers(1000000);", block_size=1000)
+
+        assert len(next(stream)) == 1000
+
+        stream.close()
+
+        with ch_adapter.create_client() as client:
+            assert client.query("select 1;").result_rows == [(1,)]
+
     def test_clickhouse_session(self, ch_adapter: CHAdapter, ch_session: Session):
         actual = ch_session.exec(
             text("select 1 from system.databases where name = :database;").bindparams(
@@ -46,6 +94,12 @@ class TestCHAdapter(DBTest):
         ).all()
         assert actual == [(1,)]
 
+    def test_clickhouse_engine_cached(self, ch_adapter: CHAdapter, ch_session: Session):
+        engine = ch_adapter.get_engine()
+
+        assert ch_adapter.get_engine() is engine
+        assert ch_session.get_bind() is engine
+
     def test_has_database_non_existent(self, ch_adapter: CHAdapter):
         assert ch_adapter.has_database("non_existent") is False
 
@@ -69,6 +123,20 @@ class TestCHAdapter(DBTest):
     def test_has_table_existent(self, ch_adapter: CHAdapter, ch_table: Table):
         assert ch_adapter.has_table(ch_table.name) is True
 
+    def test_has_tables(self, ch_adapter: CHAdapter, ch_table: Table):
+        assert ch_adapter.has_tables([ch_table.name, "non_existent"]) == {
+            ch_table.name: True,
+            "non_existent": False,
+        }
+
+    def test_get_catalog(self, ch_adapter: CHAdapter, ch_table: Table):
+        catalog = ch_adapter.get_catalog()
+        table = catalog.get_table(ch_table.name)
+
+        assert catalog.has_table("non_existent") is False
+        assert table.engine == "MergeTree"
+        assert table.column_names == ["id", "updated_at"]
+
     def test_get_table_non_existent(self, ch_adapter: CHAdapter):
         table = ch_adapter.get_table("non_existent")
         assert table is None
@@ -77,6 +145,12 @@ class TestCHAdapter(DBTest):
         table = ch_adapter.get_table(ch_table.name)
         assert set(["id", "updated_at"]) == set([column.name for column in table.columns])
 
+    def test_get_table_cached(self, ch_adapter: CHAdapter, ch_table: Table):
+        assert ch_adapter.get_table(ch_table.name) is ch_adapter.get_table(ch_table.name)
+
+        ch_adapter.drop_table(ch_table.name)
+        assert ch_adapter.get_table(ch_table.name) is None
+
     def test_create_and_drop_table(self, ch_adapter: CHAdapter):
         table = "test_table"
         quoted_table = CHTableIdentifier(table=table).to_string()
@@ -98,6 +172,195 @@ class TestCHAdapter(DBTest):
         ch_adapter.drop_table(table)
         assert ch_adapter.has_table(table) is False
 
+    def test_truncate_tables(self, ch_adapter: CHAdapter, ch_table: Table):
+        with ch_adapter.create_client() as client:
+            client.command(f"insert into {ch_table.name} (id) values (1), (2);")
+
+        report = ch_adapter.truncate_tables(tables=[ch_table.name, "non_existent"])
+
+        assert report.tables == [ch_table.name]
+        assert [timing.table for timing in report.timings] == [ch_table.name]
+
+        with ch_adapter.create_client() as client:
+            assert client.query(f"select count() from {ch_table.name};").result_rows == [(0,)]
+
+    def test_drop_tables(self, ch_adapter: CHAdapter, ch_table: Table):
+        report = ch_adapter.drop_tables()
+
+        assert report.method == "parallel"
+        assert report.tables == [ch_table.name]
+        assert ch_adapter.list_tables() == []
+
+    def test_drop_tables_recreate_database(self, ch_adapter: CHAdapter, ch_table: Table):
+        report = ch_adapter.drop_tables(recreate_database=True)
+
+        assert report.method == "database"
+        assert report.tables == [ch_table.name]
+        assert ch_adapter.has_database(ch_adapter.settings.database) is True
+        assert ch_adapter.list_tables() == []
+
+    def test_insert_rows(self, ch_adapter: CHAdapter, ch_table: Table):
+        report = ch_adapter.insert(
+            ch_table.name, [[id] for id in range(10)], column_names=["id"], batch_size=4
+        )
+
+        assert (report.rows, report.batches) == (10, 3)
+        assert self.count_rows(ch_adapter, ch_table.name) == 10
+
+    def test_insert_columns(self, ch_adapter: CHAdapter, ch_table: Table):
+        ch_adapter.insert(
+            ch_table.name, [list(range(10))], column_names=["id"], column_oriented=True
+        )
+
+        assert self.count_rows(ch_adapter, ch_table.name) == 10
+
+    def test_insert_df(self, ch_adapter: CHAdapter, ch_table: Table):
+        ch_adapter.insert(ch_table.name, pd.DataFrame({"id": range(10)}), batch_size=3)
+
+        assert self.count_rows(ch_adapter, ch_table.name) == 10
+
+    def test_insert_arrow(self, ch_adapter: CHAdapter, ch_table: Table):
+        arrow_table = pa.table({"id": pa.array(range(10), type=pa.uint64())})
+        report = ch_adapter.insert(ch_table.name, arrow_table, async_insert=True, batch_size=5)
+
+        assert report.batches == 2
+        assert self.count_rows(ch_adapter, ch_table.name) == 10
+
+    def test_query_records_cached(self, ch_adapter: CHAdapter, ch_table: Table):
+        ch_adapter.result_cache = ResultCache()
+        query = f"select count() as count from {ch_table.name}"
+
+        try:
+            assert ch_adapter.query_records(query) == [{"count": 0}]
+
+            ch_adapter.insert(ch_table.name, [[1]], column_names=["id"])
+            assert ch_adapter.query_records(query) == [{"count": 1}]
+
+            with ch_adapter.create_client() as client:
+                client.command(f"insert into {ch_table.name} (id) values (2);")
+            assert ch_adapter.query_records(query) == [{"count": 1}]
+            assert ch_adapter.query_records(query, cache=False) == [{"count": 2}]
+
+            ch_adapter.truncate_table(ch_table.name)
+            assert ch_adapter.query_df(query)["count"].tolist() == [0]
+
+            stats = ch_adapter.result_cache.stats()
+            assert (stats.hits, stats.misses, stats.invalidations) == (1, 3, 2)
+        finally:
+            ch_adapter.result_cache = None
+
+    def test_query_arrow(self, ch_adapter: CHAdapter):
+        query = """
+        select number as id, toLowCardinality(toString(number % 2)) as category
+        from system.numbers
+        limit 4
+        """
+        table = ch_adapter.query_arrow(query)
+
+        assert table.column("id").to_pylist() == [0, 1, 2, 3]
+        assert pa.types.is_dictionary(table.schema.field("category").type)
+        assert table.column("category").to_pylist() == ["0", "1", "0", "1"]
+
+        df = ch_adapter.query_df(query, dtype_backend="pyarrow")
+        assert isinstance(df["category"].dtype, pd.ArrowDtype)
+        assert df["id"].tolist() == [0, 1, 2, 3]
+
+    def test_query_polars(self, ch_adapter: CHAdapter):
+        pl = pytest.importorskip("polars")
+        df = ch_adapter.query_polars(
+            "select toLowCardinality(toString(number)) as category from system.numbers limit 2"
+        )
+
+        assert df.schema["category"] == pl.Categorical
+        assert df["category"].to_list() == ["0", "1"]
+
+    def test_shadow_table(self, ch_adapter: CHAdapter, ch_table: Table):
+        ch_adapter.insert(ch_table.name, [[1]], column_names=["id"])
+
+        with ch_adapter.shadow_table(ch_table.name, drop_in_background=False) as shadow_table:
+            assert self.count_rows(ch_adapter, ch_table.name) == 1
+
+            ch_adapter.insert(shadow_table, [[2], [3]], column_names=["id"])
+
+        assert self.count_rows(ch_adapter, ch_table.name) == 2
+        assert ch_adapter.has_table(shadow_table) is False
+
+    def test_shadow_table_error(self, ch_adapter: CHAdapter, ch_table: Table):
+        ch_adapter.insert(ch_table.name, [[1]], column_names=["id"])
+
+        with pytest.raises(ValueError):
+            with ch_adapter.shadow_table(ch_table.name) as shadow_table:
+                ch_adapter.insert(shadow_table, [[2], [3]], column_names=["id"])
+                raise ValueError()
+
+        assert self.count_rows(ch_adapter, ch_table.name) == 1
+        assert ch_adapter.has_table(shadow_table) is False
+
+    def test_shadow_table_new(self, ch_adapter: CHAdapter):
+        table = "test_shadow_table"
+        statement = "create table {table} (id UInt64) engine = MergeTree order by id"
+
+        try:
+            with ch_adapter.shadow_table(table, statement=statement) as shadow_table:
+                ch_adapter.insert(shadow_table, [[1]], column_names=["id"])
+
+            assert self.count_rows(ch_adapter, table) == 1
+        finally:
+            ch_adapter.drop_table(table)
+
+    def test_partitions(self, ch_adapter: CHAdapter):
+        statement = """
+        create or replace table {table}
+        (
+            id UInt64,
+            day Date
+        )
+        engine = MergeTree
+        partition by day
+        order by id
+        """
+        tables = ["test_partitions", "test_partitions_staging"]
+
+        for table in tables:
+            quoted_table = CHTableIdentifier(table=table).to_string()
+            ch_adapter.create_table(table, statement.replace("{table}", quoted_table))
+
+        try:
+            ch_adapter.insert(tables[0], [[1, date(2025, 1, 1)], [2, date(2025, 1, 2)]])
+            ch_adapter.insert(tables[1], [[3, date(2025, 1, 1)], [4, date(2025, 1, 1)]])
+
+            partitions = ch_adapter.list_partitions(tables[0])
+            assert [partition.partition_id for partition in partitions] == ["20250101", "20250102"]
+            assert [partition.rows for partition in partitions] == [1, 1]
+
+            report = ch_adapter.replace_partition_from(tables[0], tables[1], "20250101")
+            assert (report.parts, report.rows) == (1, 2)
+            assert self.count_rows(ch_adapter, tables[0]) == 3
+
+            report = ch_adapter.detach_partition(tables[0], "20250101")
+            assert report.rows == 2
+            assert self.count_rows(ch_adapter, tables[0]) == 1
+
+            report = ch_adapter.attach_partition(tables[0], "20250101")
+            assert report.rows == 2
+            assert self.count_rows(ch_adapter, tables[0]) == 3
+
+            report = ch_adapter.drop_partition(tables[0], "20250102")
+            assert (report.parts, report.rows) == (1, 1)
+            assert ch_adapter.get_partition(tables[0], "20250102") is None
+        finally:
+            for table in tables:
+                ch_adapter.drop_table(table)
+
+    def test_get_table_stats(self, ch_adapter: CHAdapter, ch_table: Table):
+        ch_adapter.insert(ch_table.name, [[id] for id in range(10)], column_names=["id"])
+
+        stats = ch_adapter.get_table_stats(ch_table.name)
+        assert (stats.rows, stats.parts) == (10, 1)
+        assert stats.compressed_bytes > 0
+        assert [column.name for column in stats.columns] == ["id", "updated_at"]
+        assert ch_adapter.get_database_stats() == [stats]
+
     def test_get_create_table_statement(self, ch_adapter: CHAdapter, ch_table: Table):
         with pytest.raises(DatabaseError):
             ch_adapter.get_create_table_statement("non_existent")
@@ -116,6 +379,12 @@ class TestCHAdapter(DBTest):
             ch_adapter.get_create_table_statement(ch_table.name), expected
         )
 
+    def test_get_create_table_statements(self, ch_adapter: CHAdapter, ch_table: Table):
+        assert ch_adapter.get_create_table_statements(tables=["non_existent"]) == {}
+
+        statements = ch_adapter.get_create_table_statements(tables=[ch_table.name])
+        assert statements == {ch_table.name: ch_adapter.get_create_table_statement(ch_table.name)}
+
     def test_list_tables_empty_database(self, ch_adapter: CHAdapter):
         assert ch_adapter.list_tables() == []
 
@@ -1,6 +1,6 @@
 from package.database import PGAdapter
 from package.tests.fixtures.database import DBTest
-from package.types import PGTableIdentifier
+from package.types import CopyFormat, PGTableIdentifier
 from sqlmodel import Table, text
 from typing import Any, Generator
 
@@ -46,6 +46,16 @@ class TestPGAdapter(DBTest):
 
         pg_adapter.drop_publication(publication)
 
+    def test_get_table_stats(self, pg_adapter: PGAdapter, pg_table: Table):
+        stats = pg_adapter.get_table_stats(pg_table.name)
+
+        assert stats.schema_ == pg_adapter.settings.schema_
+        assert stats.engine == "table"
+        assert stats.total_bytes >= stats.table_bytes
+        assert pg_table.name in [
+            table_stats.table for table_stats in pg_adapter.get_database_stats()
+        ]
+
     def test_postgres_client(self, pg_adapter: PGAdapter):
         with pg_adapter.create_client() as (conn, cur):
             cur.execute(
@@ -55,6 +65,25 @@ class TestPGAdapter(DBTest):
             actual = cur.fetchall()
         assert actual == [(1,)]
 
+    def test_postgres_client_pooled(self, pg_adapter: PGAdapter):
+        adapter = PGAdapter(pg_adapter.settings, pool=True, pool_min_size=1, pool_max_size=2)
+
+        with adapter.create_client(autocommit=False) as (conn, cur):
+            cur.execute("select 1;")
+
+        with adapter.create_client() as (other_conn, cur):
+            assert other_conn is conn
+            assert other_conn.autocommit is True
+            cur.execute("select 1;")
+            actual = cur.fetchall()
+
+        stats = adapter.pool_stats()
+        adapter.close()
+
+        assert actual == [(1,)]
+        assert stats.checkouts == 2
+        assert stats.created == 1
+
     def test_postgres_session(self, pg_adapter: PGAdapter):
         with pg_adapter.create_session() as session:
             actual = session.exec(
@@ -89,6 +118,20 @@ class TestPGAdapter(DBTest):
     def test_has_table_existent(self, pg_adapter: PGAdapter, pg_table: Table):
         assert pg_adapter.has_table(pg_table.name) is True
 
+    def test_has_tables(self, pg_adapter: PGAdapter, pg_table: Table):
+        assert pg_adapter.has_tables([pg_table.name, "non_existent"]) == {
+            pg_table.name: True,
+            "non_existent": False,
+        }
+
+    def test_get_catalog(self, pg_adapter: PGAdapter, pg_table: Table):
+        catalog = pg_adapter.get_catalog()
+        table = catalog.get_table(pg_table.name)
+
+        assert catalog.has_table("non_existent") is False
+        assert table.column_names == ["id", "updated_at"]
+        assert table.replica_identity == "default"
+
     def test_get_table_non_existent(self, pg_adapter: PGAdapter):
         table = pg_adapter.get_table("non_existent")
         assert table is None
@@ -97,6 +140,12 @@ class TestPGAdapter(DBTest):
         table = pg_adapter.get_table(pg_table.name)
         assert set(["id", "updated_at"]) == set([column.name for column in table.columns])
 
+    def test_get_table_cached(self, pg_adapter: PGAdapter, pg_table: Table):
+        assert pg_adapter.get_table(pg_table.name) is pg_adapter.get_table(pg_table.name)
+
+        pg_adapter.drop_table(pg_table.name)
+        assert pg_adapter.get_table(pg_table.name) is None
+
     def test_create_and_drop_table(self, pg_adapter: PGAdapter):
         table = "test_table"
         quoted_table = PGTableIdentifier(table=table).to_string()
@@ -115,6 +164,81 @@ class TestPGAdapter(DBTest):
         pg_adapter.drop_table(table)
         assert pg_adapter.has_table(table) is False
 
+    def test_truncate_tables(self, pg_adapter: PGAdapter, pg_table: Table):
+        with pg_adapter.create_client() as (conn, cur):
+            cur.execute(f"insert into {pg_table.name} (id) values (1), (2);")
+
+        report = pg_adapter.truncate_tables(tables=[pg_table.name, "non_existent"])
+        assert report.tables == [pg_table.name]
+
+        with pg_adapter.create_client() as (conn, cur):
+            cur.execute(f"select count(*) from {pg_table.name};")
+            assert cur.fetchone() == (0,)
+
+    def test_drop_tables(self, pg_adapter: PGAdapter, pg_table: Table):
+        report = pg_adapter.drop_tables()
+
+        assert report.method == "statement"
+        assert report.tables == [pg_table.name]
+        assert pg_adapter.list_tables() == []
+
+    def test_stream(self, pg_adapter: PGAdapter):
+        batches = list(
+            pg_adapter.stream(
+                "select generate_series(1, %(count)s) as id;",
+                parameters={"count": 10},
+                batch_size=4,
+            )
+        )
+
+        assert [len(batch) for batch in batches] == [4, 4, 2]
+        assert [row for batch in batches for row in batch] == [(id,) for id in range(1, 11)]
+
+    def test_copy_stream_binary(self, pg_adapter: PGAdapter):
+        data = b"".join(pg_adapter.copy_stream("select generate_series(1, 10) as id;"))
+
+        assert data.startswith(b"PGCOPY\n\xff\r\n\x00")
+
+    def test_copy_stream_csv(self, pg_adapter: PGAdapter):
+        data = b"".join(
+            pg_adapter.copy_stream("select generate_series(1, 3) as id;", format=CopyFormat.CSV)
+        )
+
+        assert data == b"id\n1\n2\n3\n"
+
+    def test_copy_stream_arrow(self, pg_adapter: PGAdapter):
+        batches = list(
+            pg_adapter.copy_stream(
+                "select id, id % 2 = 0 as is_even, null::text as name from generate_series(1, 10) as id;",
+                format=CopyFormat.ARROW,
+            )
+        )
+        rows = [row for batch in batches for row in batch.to_pylist()]
+
+        assert rows[0] == {"id": 1, "is_even": False, "name": None}
+        assert len(rows) == 10
+
+    def test_copy_stream_arrow_duplicate_columns(self, pg_adapter: PGAdapter):
+        batches = list(
+            pg_adapter.copy_stream(
+                "select id, id * 2 as id, 1, 2 from generate_series(1, 3) as id;",
+                format=CopyFormat.ARROW,
+            )
+        )
+        rows = [row for batch in batches for row in batch.to_pylist()]
+
+        assert rows[0] == {"id": 1, "id_1": 2, "?column?": 1, "?column?_1": 2}
+        assert len(rows) == 3
+
+    def test_copy_stream_closed_early(self, pg_adapter: PGAdapter):
+        stream = pg_adapter.copy_stream(
+            "select generate_series(1, 10000000) as id;", format=CopyFormat.CSV, chunk_size=1024
+        )
+
+        assert next(stream).startswith(b"id\n")
+
+        stream.close()
+
     def test_list_tables_empty_database(self, pg_adapter: PGAdapter):
         assert pg_adapter.list_tables() == []
 
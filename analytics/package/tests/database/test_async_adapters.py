@@ -0,0 +1,117 @@
+from contextlib import contextmanager
+from package.database.adapters.async_base import AsyncAdapter
+from package.database.adapters.async_postgres import convert_parameters
+
+import asyncio
+import threading
+
+
+class FakeAdapter:
+    dialect = "fake"
+    settings = None
+    pool_size = 4
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.threads = []
+
+    def has_table(self, table: str) -> bool:
+        self.threads.append(threading.current_thread().name)
+        return table == "table_1"
+
+    def wait(self, event: threading.Event) -> bool:
+        event.wait()
+        return self.closed
+
+    def stream(self, count: int):
+        yield from range(count)
+
+    @contextmanager
+    def shadow_table(self, table: str):
+        self.threads.append(threading.current_thread().name)
+        yield f"{table}__new"
+        self.threads.append("exit")
+
+    def add_listener(self, listener) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class TestConvertParameters:
+    def test_named(self):
+        query, args = convert_parameters(
+            "select * from t where a = %(a)s and b = %(b)s and c = %(a)s and d like 'x%%'",
+            {"a": 1, "b": 2},
+        )
+
+        assert query == "select * from t where a = $1 and b = $2 and c = $1 and d like 'x%'"
+        assert args == [1, 2]
+
+    def test_positional(self):
+        assert convert_parameters("select %s, %s", (1, 2)) == ("select $1, $2", [1, 2])
+
+    def test_none(self):
+        assert convert_parameters("select '%%'") == ("select '%%'", [])
+
+
+class TestAsyncAdapter:
+    def test_methods(self):
+        adapter = FakeAdapter()
+        async_adapter = AsyncAdapter(adapter)
+
+        async def run():
+            results = await asyncio.gather(
+                async_adapter.has_table("table_1"), async_adapter.has_table("table_2")
+            )
+            rows = [row async for row in async_adapter.stream(3)]
+            await async_adapter.close()
+
+            return results, rows
+
+        results, rows = asyncio.run(run())
+
+        assert results == [True, False]
+        assert rows == [0, 1, 2]
+        assert all(name.startswith("fake_async") for name in adapter.threads)
+        assert adapter.closed is True
+
+    def test_enter(self):
+        adapter = FakeAdapter()
+        async_adapter = AsyncAdapter(adapter)
+
+        async def run():
+            async with async_adapter.enter(adapter.shadow_table("table_1")) as shadow_table:
+                return shadow_table
+
+        assert asyncio.run(run()) == "table_1__new"
+        assert adapter.threads[0].startswith("fake_async")
+        assert adapter.threads[1] == "exit"
+
+    def test_close_waits_for_running_calls(self):
+        adapter = FakeAdapter()
+        async_adapter = AsyncAdapter(adapter)
+        event = threading.Event()
+
+        async def run():
+            task = asyncio.create_task(async_adapter.wait(event))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            close = asyncio.create_task(async_adapter.close())
+            await asyncio.sleep(0.01)
+            closed = adapter.closed
+            event.set()
+            await close
+
+            return closed
+
+        assert asyncio.run(run()) is False
+        assert adapter.closed is True
+
+    def test_attributes(self):
+        adapter = FakeAdapter()
+        async_adapter = AsyncAdapter(adapter)
+
+        assert async_adapter.pool_size == 4
+        assert async_adapter.add_listener == adapter.add_listener
@@ -0,0 +1,44 @@
+from package.database.cache import ReflectionCache
+from sqlalchemy import URL
+from sqlmodel import MetaData, Table
+
+import time
+
+url = URL.create("postgresql", host="localhost", database="test")
+other_url = URL.create("postgresql", host="localhost", database="other")
+
+
+class TestReflectionCache:
+    def test_get_and_set(self):
+        cache = ReflectionCache()
+        table = Table("table_1", MetaData(schema="public"))
+
+        assert cache.get(url, "public", "table_1") is None
+
+        cache.set(url, "public", "table_1", table)
+        assert cache.get(url, "public", "table_1") is table
+        assert cache.get(other_url, "public", "table_1") is None
+
+    def test_ttl(self):
+        cache = ReflectionCache(ttl=0)
+        cache.set(url, "public", "table_1", Table("table_1", MetaData(schema="public")))
+
+        time.sleep(0.01)
+
+        assert cache.get(url, "public", "table_1") is None
+
+    def test_invalidate(self):
+        cache = ReflectionCache()
+
+        for u in [url, other_url]:
+            for table in ["table_1", "table_2"]:
+                cache.set(u, "public", table, Table(table, MetaData(schema="public")))
+
+        cache.invalidate(url=url, schema="public", table="table_1")
+        assert cache.get(url, "public", "table_1") is None
+        assert cache.get(url, "public", "table_2") is not None
+        assert cache.get(other_url, "public", "table_1") is not None
+
+        cache.invalidate(schema="public")
+        assert cache.get(url, "public", "table_2") is None
+        assert cache.get(other_url, "public", "table_1") is None
@@ -0,0 +1,45 @@
+from package.database.catalog import Catalog, CatalogColumn, CatalogTable
+
+tables = [
+    CatalogTable(
+        database="test",
+        schema_="public",
+        name="table_1",
+        columns=[
+            CatalogColumn(name="id", data_type="bigint", position=1),
+            CatalogColumn(name="name", data_type="text", position=2),
+        ],
+    ),
+    CatalogTable(database="test", schema_="other", name="table_2"),
+]
+
+
+class TestCatalog:
+    def test_has_table(self):
+        catalog = Catalog("test", tables, schemas=["public", "other"])
+
+        assert catalog.has_table("table_1") is True
+        assert catalog.has_table("table_2") is False
+        assert catalog.has_table("table_2", schema="other") is True
+        assert "table_1" in catalog
+
+    def test_get_table(self):
+        catalog = Catalog("test", tables, schemas=["public", "other"])
+
+        assert catalog.get_table("table_1").column_names == ["id", "name"]
+        assert catalog.get_table("table_1").get_column("name").data_type == "text"
+        assert catalog.get_table("non_existent") is None
+
+    def test_list_tables(self):
+        catalog = Catalog("test", tables, schemas=["public", "other"])
+
+        assert len(catalog) == 2
+        assert [table.name for table in catalog.list_tables(schema="other")] == ["table_2"]
+
+    def test_includes(self):
+        catalog = Catalog("test", tables, schemas=["public"])
+
+        assert catalog.includes("test") is True
+        assert catalog.includes("test", schema="public") is True
+        assert catalog.includes("test", schema="other") is False
+        assert catalog.includes("other") is False
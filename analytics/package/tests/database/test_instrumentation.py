@@ -0,0 +1,278 @@
+from contextlib import contextmanager
+from package.database import CHAdapter
+from package.database.adapters.clickhouse import InstrumentedClient
+from package.database.instrumentation import (
+    create_fingerprint,
+    HistogramListener,
+    LoggingListener,
+    normalize_statement,
+    PrometheusListener,
+    QueryEvent,
+    QueryListener,
+)
+from package.database.result_cache import ResultCache
+from package.types import CHSettings
+from typing import List
+
+import logging
+import pytest
+
+ch_settings = CHSettings(
+    host="localhost",
+    http_port=8123,
+    tcp_port=9000,
+    username="default",
+    password="",
+    database="default",
+)
+
+
+class RecordingListener(QueryListener):
+    def __init__(self) -> None:
+        self.started: List[QueryEvent] = []
+        self.ended: List[QueryEvent] = []
+
+    def on_query_start(self, event: QueryEvent) -> None:
+        self.started.append(event)
+
+    def on_query_end(self, event: QueryEvent) -> None:
+        self.ended.append(event)
+
+
+class FakeSummary:
+    def __init__(self, summary: dict) -> None:
+        self.summary = summary
+
+    def named_results(self):
+        return [{"a": 1}]
+
+
+class FakeClient:
+    def __init__(self) -> None:
+        self.calls = []
+
+    def query(self, query, parameters=None, settings=None):
+        self.calls.append(settings)
+
+        return FakeSummary({"read_rows": "10", "read_bytes": "80"})
+
+    def ping(self) -> bool:
+        return True
+
+
+def create_event(duration: float, **kwargs) -> QueryEvent:
+    return QueryEvent(
+        adapter="clickhouse",
+        operation="query",
+        statement="select 1",
+        fingerprint=create_fingerprint("select 1"),
+        started_at=0,
+        duration=duration,
+        **kwargs,
+    )
+
+
+class TestFingerprint:
+    def test_normalize_statement(self):
+        statement = """
+        -- Comment
+        SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'it''s' AND x > 1.5;
+        """
+
+        assert (
+            normalize_statement(statement)
+            == "select * from t where id in (?) and name = ? and x > ?"
+        )
+
+    def test_create_fingerprint(self):
+        assert create_fingerprint("select 1") == create_fingerprint("SELECT  2;")
+        assert create_fingerprint("select 1") != create_fingerprint("select a from t")
+
+
+class TestInstrument:
+    def test_events(self):
+        listener = RecordingListener()
+        adapter = CHAdapter(ch_settings, listeners=[listener])
+
+        with adapter.instrument("query", "select 1") as event:
+            event.rows_read = 1
+
+        assert listener.started == listener.ended == [event]
+        assert event.adapter == "clickhouse"
+        assert event.fingerprint == create_fingerprint("select 1")
+        assert event.duration >= 0
+        assert event.error is None
+
+    def test_error(self):
+        listener = RecordingListener()
+        adapter = CHAdapter(ch_settings, listeners=[listener])
+
+        with pytest.raises(ValueError):
+            with adapter.instrument("query", "select 1"):
+                raise ValueError("failed")
+
+        assert listener.ended[0].error == "ValueError: failed"
+
+    def test_failing_listener(self):
+        class FailingListener(QueryListener):
+            def on_query_end(self, event: QueryEvent) -> None:
+                raise Exception()
+
+        adapter = CHAdapter(ch_settings, listeners=[FailingListener()])
+
+        with adapter.instrument("query", "select 1"):
+            pass
+
+    def test_instrumented_client(self):
+        listener = RecordingListener()
+        adapter = CHAdapter(ch_settings, listeners=[listener])
+        fake_client = FakeClient()
+        client = InstrumentedClient(fake_client, adapter)
+
+        client.query("select 1", settings={"max_threads": 1})
+
+        settings = fake_client.calls[0]
+        event = listener.ended[0]
+
+        assert settings["max_threads"] == 1
+        assert settings["log_comment"] == "package"
+        assert settings["query_id"] == event.query_id
+        assert (event.rows_read, event.bytes_read) == (10, 80)
+        assert client.ping() is True
+
+    def test_instrumented_client_positional_settings(self):
+        listener = RecordingListener()
+        adapter = CHAdapter(ch_settings, listeners=[listener])
+        fake_client = FakeClient()
+        client = InstrumentedClient(fake_client, adapter)
+
+        client.query("select 1", None, {"max_threads": 1})
+
+        settings = fake_client.calls[0]
+
+        assert settings["max_threads"] == 1
+        assert settings["log_comment"] == "package"
+        assert settings["query_id"] == listener.ended[0].query_id
+        assert listener.ended[0].settings == {"max_threads": 1}
+
+    def test_instrumented_client_query_id(self):
+        listener = RecordingListener()
+        adapter = CHAdapter(ch_settings, listeners=[listener])
+        fake_client = FakeClient()
+        client = InstrumentedClient(fake_client, adapter)
+
+        client.query("select 1", settings={"query_id": "a", "log_comment": "job"})
+        client.query("select 1", None, {"query_id": "b"})
+
+        assert [settings["query_id"] for settings in fake_client.calls] == ["a", "b"]
+        assert [event.query_id for event in listener.ended] == ["a", "b"]
+        assert fake_client.calls[0]["log_comment"] == "job"
+        assert fake_client.calls[1]["log_comment"] == "package"
+        assert listener.ended[0].settings == {"query_id": "a", "log_comment": "job"}
+
+    def test_instrumented_client_profile(self):
+        listener = RecordingListener()
+        adapter = CHAdapter(ch_settings, listeners=[listener], profile="interactive")
+        fake_client = FakeClient()
+        client = InstrumentedClient(fake_client, adapter)
+
+        client.query("select 1")
+        client.query("select 1", settings="batch")
+        client.query("select 1", settings={"max_threads": 1})
+
+        assert fake_client.calls[0]["max_threads"] == 4
+        assert fake_client.calls[1]["max_execution_time"] == 3600
+        assert fake_client.calls[1]["use_query_cache"] == 0
+        assert fake_client.calls[2]["max_threads"] == 1
+        assert listener.ended[2].settings == {
+            "max_threads": 1,
+            "max_execution_time": 60,
+            "use_query_cache": 1,
+        }
+
+
+class TestSettingsProfiles:
+    def test_resolve_settings(self):
+        adapter = CHAdapter(ch_settings)
+
+        assert adapter.resolve_settings() == {}
+        assert adapter.resolve_settings("ingest") == {"async_insert": 1, "wait_for_async_insert": 1}
+        assert adapter.resolve_settings({"max_threads": 2}) == {"max_threads": 2}
+
+    def test_default_profile(self):
+        adapter = CHAdapter(ch_settings, profile="batch")
+
+        assert adapter.resolve_settings({"use_query_cache": 1}) == {
+            "max_execution_time": 3600,
+            "use_query_cache": 1,
+        }
+
+    def test_unknown_profile(self):
+        with pytest.raises(Exception, match="Settings profile 'unknown' not found"):
+            CHAdapter(ch_settings, profile="unknown")
+
+        with pytest.raises(Exception, match="Settings profile 'unknown' not found"):
+            CHAdapter(ch_settings).resolve_settings("unknown")
+
+    def test_result_cache_key(self):
+        adapter = CHAdapter(ch_settings, profile="interactive", result_cache=ResultCache())
+        fake_client = FakeClient()
+
+        @contextmanager
+        def create_client():
+            yield InstrumentedClient(fake_client, adapter)
+
+        adapter.create_client = create_client
+
+        for settings in [None, "interactive", "batch", {"max_threads": 1}, "batch"]:
+            assert adapter.query_records("select a from t", settings=settings) == [{"a": 1}]
+
+        assert len(fake_client.calls) == 3
+
+    def test_url(self):
+        assert ch_settings.url.database == "default"
+
+
+class TestHistogramListener:
+    def test_stats(self):
+        listener = HistogramListener(buckets=(0.1, 1))
+
+        listener.on_query_end(create_event(0.05, rows_read=10))
+        listener.on_query_end(create_event(0.5, rows_read=5, connected=True))
+        listener.on_query_end(create_event(5, error="Exception"))
+
+        [stats] = listener.get_stats()
+
+        assert stats.count == 3
+        assert stats.errors == 1
+        assert stats.buckets == [1, 1, 1]
+        assert stats.rows_read == 15
+        assert stats.connections == 1
+        assert listener.percentile(stats, 0.5) == 1
+
+
+class TestPrometheusListener:
+    def test_render(self):
+        listener = PrometheusListener(buckets=(0.1, 1))
+        listener.on_query_end(create_event(0.05))
+
+        labels = (
+            f'adapter="clickhouse",operation="query",fingerprint="{create_fingerprint("select 1")}"'
+        )
+        output = listener.render()
+
+        assert "# TYPE package_query_duration_seconds histogram" in output
+        assert f'package_query_duration_seconds_bucket{{{labels},le="0.1"}} 1' in output
+        assert f'package_query_duration_seconds_bucket{{{labels},le="+Inf"}} 1' in output
+        assert f"package_query_duration_seconds_count{{{labels}}} 1" in output
+        assert f"package_query_errors_total{{{labels}}} 0" in output
+
+
+class TestLoggingListener:
+    def test_log(self, caplog):
+        listener = LoggingListener(max_statement_length=6)
+
+        with caplog.at_level(logging.INFO, logger="package.database"):
+            listener.on_query_end(create_event(0.05))
+
+        assert '"statement":"select"' in caplog.text
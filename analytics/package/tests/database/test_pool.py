@@ -0,0 +1,216 @@
+from concurrent.futures import ThreadPoolExecutor
+from package.database.pool import Pool, PoolClosedError, PoolTimeoutError
+
+import pytest
+import time
+
+
+class FakeClient:
+    def __init__(self, id: int) -> None:
+        self.id = id
+        self.healthy = True
+        self.closed = False
+
+
+class FakeClientFactory:
+    def __init__(self) -> None:
+        self.clients = []
+
+    def create(self) -> FakeClient:
+        client = FakeClient(len(self.clients))
+        self.clients.append(client)
+        return client
+
+    def close(self, client: FakeClient) -> None:
+        client.closed = True
+
+    def check(self, client: FakeClient) -> bool:
+        return client.healthy
+
+
+class TestPool:
+    @pytest.fixture(scope="function")
+    def factory(self) -> FakeClientFactory:
+        return FakeClientFactory()
+
+    def create_pool(self, factory: FakeClientFactory, **kwargs) -> Pool[FakeClient]:
+        return Pool(create=factory.create, close=factory.close, check=factory.check, **kwargs)
+
+    def test_lazy_creation(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory)
+        assert factory.clients == []
+
+        with pool.connection():
+            pass
+
+        assert len(factory.clients) == 1
+
+    def test_reuse(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory)
+
+        for _ in range(3):
+            with pool.connection() as client:
+                assert client.id == 0
+
+        assert len(factory.clients) == 1
+
+    def test_max_size(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory, max_size=2)
+
+        def use(_):
+            with pool.connection():
+                time.sleep(0.01)
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(use, range(32)))
+
+        assert len(factory.clients) <= 2
+        assert pool.size <= 2
+
+    def test_timeout(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory, max_size=1)
+        client = pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(timeout=0.01)
+
+        pool.release(client)
+        assert pool.acquire(timeout=0.01) is client
+
+    def test_idle_timeout(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory, idle_timeout=0)
+
+        with pool.connection() as client:
+            pass
+
+        time.sleep(0.01)
+
+        with pool.connection() as other_client:
+            assert other_client is not client
+
+        assert client.closed is True
+
+    def test_health_check(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory, health_check_interval=0)
+
+        with pool.connection() as client:
+            client.healthy = False
+
+        time.sleep(0.01)
+
+        with pool.connection() as other_client:
+            assert other_client is not client
+
+        assert client.closed is True
+
+    def test_discard_unhealthy_client_on_error(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory)
+
+        with pytest.raises(RuntimeError):
+            with pool.connection() as client:
+                client.healthy = False
+                raise RuntimeError()
+
+        assert client.closed is True
+        assert pool.size == 0
+
+    def test_release_with_check(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory)
+        client = pool.acquire()
+        pool.release(client, check=True)
+        assert client.closed is False
+
+        client = pool.acquire()
+        client.healthy = False
+        pool.release(client, check=True)
+        assert client.closed is True
+        assert pool.size == 0
+
+    def test_close(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory)
+
+        with pool.connection() as client:
+            pass
+
+        pool.close()
+        assert client.closed is True
+
+        with pytest.raises(PoolClosedError):
+            pool.acquire()
+
+    def test_min_size(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory, min_size=2, max_size=4)
+        assert factory.clients == []
+
+        with pool.connection():
+            pass
+
+        assert len(factory.clients) == 2
+        assert pool.stats().idle == 2
+
+    def test_min_size_create_fails(self, factory: FakeClientFactory):
+        failures = [None, RuntimeError()]
+
+        def create() -> FakeClient:
+            error = failures.pop(0) if failures else None
+
+            if error is not None:
+                raise error
+
+            return factory.create()
+
+        pool = Pool(create=create, close=factory.close, min_size=3, max_size=3)
+
+        with pytest.raises(RuntimeError):
+            pool.acquire()
+
+        stats = pool.stats()
+        assert stats.size == 1
+        assert stats.idle == 1
+        assert stats.in_use == 0
+
+        # The pool is filled again once the failure has passed
+        clients = [pool.acquire(timeout=0.01) for _ in range(3)]
+        assert len({client.id for client in clients}) == 3
+        assert pool.stats().in_use == 3
+
+    def test_reset(self, factory: FakeClientFactory):
+        reset_clients = []
+        pool = self.create_pool(factory, reset=reset_clients.append)
+
+        with pool.connection() as client:
+            pass
+
+        assert reset_clients == [client]
+
+    def test_discard_client_if_reset_fails(self, factory: FakeClientFactory):
+        def reset(client: FakeClient) -> None:
+            raise RuntimeError()
+
+        pool = self.create_pool(factory, reset=reset)
+
+        with pool.connection() as client:
+            pass
+
+        assert client.closed is True
+        assert pool.stats().reconnects == 1
+
+    def test_stats(self, factory: FakeClientFactory):
+        pool = self.create_pool(factory, max_size=1)
+        client = pool.acquire()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire(timeout=0.01)
+
+        stats = pool.stats()
+        assert stats.checkouts == 1
+        assert stats.waits == 1
+        assert stats.wait_time > 0
+        assert stats.in_use == 1
+
+        pool.release(client)
+
+        stats = pool.stats()
+        assert stats.created == 1
+        assert stats.idle == 1
+        assert stats.in_use == 0
@@ -0,0 +1,127 @@
+from package.database.result_cache import (
+    extract_tables,
+    MemoryBackend,
+    normalize_query,
+    ResultCache,
+    SQLiteBackend,
+)
+
+import pytest
+import time
+
+
+class TestNormalizeQuery:
+    def test_whitespace(self):
+        assert normalize_query("select  a,\n  b\nfrom t ; ") == "select a, b from t"
+
+    def test_string_literals(self):
+        assert normalize_query("select 'a  b'  from t") == "select 'a  b' from t"
+
+
+class TestExtractTables:
+    def test_tables(self):
+        query = "select * from db_1.table_1 as a join table_2 using id where x = {x:String}"
+
+        assert extract_tables(query, "default") == ["db_1.table_1", "default.table_2"]
+
+    def test_ctes(self):
+        query = "with c as (select * from table_1) select * from c"
+
+        assert extract_tables(query, "default") == ["default.table_1"]
+
+    def test_unknown(self):
+        assert extract_tables("show tables", "default") == ["*"]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def create_backend(request, tmp_path):
+    def create(**kwargs):
+        if request.param == "memory":
+            return MemoryBackend(**kwargs)
+
+        return SQLiteBackend(tmp_path / "cache.db", **kwargs)
+
+    return create
+
+
+class TestResultCache:
+    def test_get_or_set(self, create_backend):
+        cache = ResultCache(backend=create_backend())
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return [{"a": 1}]
+
+        for query in ["select a from table_1", "select a\nfrom  table_1;"]:
+            assert cache.get_or_set(query, compute, database="default") == [{"a": 1}]
+
+        cache.get_or_set("select a from table_1", compute, parameters={"x": 1}, database="default")
+        cache.get_or_set("select a from table_1", compute, database="other")
+
+        stats = cache.stats()
+        assert len(calls) == 3
+        assert (stats.hits, stats.misses, stats.entries) == (1, 3, 3)
+
+    def test_copy(self, create_backend):
+        cache = ResultCache(backend=create_backend())
+        key = cache.create_key("select 1")
+        value = [1]
+
+        cache.set(key, value, "default", [])
+        cache.get(key).append(2)
+
+        assert cache.get(key) == [1]
+
+    def test_ttl(self, create_backend):
+        cache = ResultCache(backend=create_backend(), ttl=60)
+        cache.set("key_1", 1, "default", [], ttl=0.01)
+        cache.set("key_2", 2, "default", [])
+
+        time.sleep(0.02)
+
+        assert cache.get("key_1") is None
+        assert cache.get("key_2") == 2
+        assert cache.stats().expirations == 1
+
+    def test_max_entries(self, create_backend):
+        cache = ResultCache(backend=create_backend(max_entries=2))
+        cache.set("key_1", 1, "default", [])
+        cache.set("key_2", 2, "default", [])
+        time.sleep(0.01)
+        cache.get("key_1")
+        time.sleep(0.01)
+        cache.set("key_3", 3, "default", [])
+
+        assert cache.get("key_1") == 1
+        assert cache.get("key_2") is None
+        assert cache.get("key_3") == 3
+        assert cache.stats().evictions == 1
+
+    def test_max_size(self, create_backend):
+        cache = ResultCache(backend=create_backend(max_size=1500))
+        cache.set("key_1", b"1" * 1000, "default", [])
+        time.sleep(0.01)
+        cache.set("key_2", b"2" * 1000, "default", [])
+
+        assert cache.get("key_1") is None
+        assert cache.get("key_2") is not None
+        assert cache.stats().size < 1500
+
+    def test_invalidate(self, create_backend):
+        cache = ResultCache(backend=create_backend())
+        invalidated = []
+        cache.add_listener(lambda database, table: invalidated.append((database, table)))
+
+        cache.set("key_1", 1, "default", ["default.table_1"])
+        cache.set("key_2", 2, "default", ["default.table_2", "other.table_1"])
+        cache.set("key_3", 3, "default", ["*"])
+        cache.set("key_4", 4, "other", ["*"])
+
+        assert cache.invalidate("default", table="table_1") == 2
+        assert cache.get("key_2") == 2
+        assert cache.get("key_4") == 4
+
+        assert cache.invalidate("other", table="table_1") == 2
+        assert cache.stats().entries == 0
+        assert invalidated == [("default", "table_1"), ("other", "table_1")]
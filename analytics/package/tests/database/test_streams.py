@@ -0,0 +1,43 @@
+from package.database.streams import ChunkReader, QueueWriter, StreamCancelledError
+
+import io
+import pytest
+import queue
+import threading
+
+
+class TestQueueWriter:
+    def test_write(self):
+        chunks = queue.Queue()
+        writer = QueueWriter(chunks, threading.Event(), chunk_size=4)
+
+        writer.write(b"ab")
+        assert chunks.empty()
+
+        writer.write(b"cde")
+        writer.write(b"f")
+        writer.flush()
+        writer.close()
+
+        assert [chunks.get() for _ in range(3)] == [b"abcde", b"f", None]
+
+    def test_cancel(self):
+        chunks = queue.Queue(maxsize=1)
+        cancelled = threading.Event()
+        writer = QueueWriter(chunks, cancelled, chunk_size=1)
+
+        writer.write(b"a")
+        cancelled.set()
+
+        # The queue is full, so the writer would block until the consumer reads a chunk
+        with pytest.raises(StreamCancelledError):
+            writer.write(b"b")
+
+
+class TestChunkReader:
+    def test_read(self):
+        reader = io.BufferedReader(ChunkReader(iter([b"ab", b"", b"cde"])), buffer_size=2)
+
+        assert reader.read(1) == b"a"
+        assert reader.read() == b"bcde"
+        assert reader.read() == b""
@@ -0,0 +1,154 @@
+from package import dbt_fanout as fanout
+from package.dbt_fanout import get_selected_graph, split_chunks, split_components, split_layers
+from package.types import DbtBranchResult, DbtFanoutStrategy
+from types import SimpleNamespace
+from typing import List
+
+import asyncio
+
+nodes = {
+    "model.test.stg_users": ["source.test.raw.users"],
+    "model.test.stg_orders": ["source.test.raw.orders"],
+    "model.test.eph_orders": ["model.test.stg_orders"],
+    "model.test.users": ["model.test.stg_users"],
+    "model.test.orders": ["model.test.eph_orders", "model.test.users"],
+    "model.test.events": [],
+}
+
+
+def test_get_selected_graph():
+    graph = get_selected_graph(
+        nodes,
+        ["model.test.stg_orders", "model.test.users", "model.test.orders", "model.test.events"],
+    )
+
+    assert graph == {
+        "model.test.stg_orders": [],
+        "model.test.users": [],
+        "model.test.orders": ["model.test.stg_orders", "model.test.users"],
+        "model.test.events": [],
+    }
+
+
+def test_split_components():
+    graph = get_selected_graph(
+        nodes, ["model.test.stg_users", "model.test.users", "model.test.events"]
+    )
+
+    assert split_components(graph) == [
+        ["model.test.stg_users", "model.test.users"],
+        ["model.test.events"],
+    ]
+
+
+def test_split_layers():
+    graph = get_selected_graph(nodes, nodes)
+
+    assert split_layers(graph) == [
+        ["model.test.events", "model.test.stg_orders", "model.test.stg_users"],
+        ["model.test.eph_orders", "model.test.users"],
+        ["model.test.orders"],
+    ]
+
+
+def test_split_chunks():
+    assert split_chunks(["a", "b", "c"], 2) == [["a", "c"], ["b"]]
+    assert split_chunks(["a"], 4) == [["a"]]
+    assert split_chunks([], 4) == []
+
+
+def test_branch_result_failed_nodes():
+    assert DbtBranchResult(nodes=["a"]).failed_nodes == []
+    assert DbtBranchResult(nodes=["a"], error="Exception: failed").failed_nodes == ["a"]
+    assert DbtBranchResult(nodes=["a"], skipped=True).failed_nodes == ["a"]
+
+
+def create_dbt() -> SimpleNamespace:
+    resources = [
+        {"unique_id": unique_id, "depends_on": {"nodes": parents}}
+        for unique_id, parents in nodes.items()
+    ]
+
+    return SimpleNamespace(
+        project_dir="/tmp/project",
+        target=None,
+        list_resources=lambda resource_types, select, exclude: [
+            SimpleNamespace(
+                unique_id=resource["unique_id"], name=resource["unique_id"].split(".")[-1]
+            )
+            for resource in resources
+        ],
+        resource_index=SimpleNamespace(list=lambda: resources),
+        record_history=lambda summary: None,
+    )
+
+
+def test_dbt_fanout_components(monkeypatch):
+    branches = []
+
+    async def run_branch(project_dir: str, names: List[str], **kwargs):
+        branches.append(names)
+
+        if "events" in names:
+            raise Exception("failed")
+
+    monkeypatch.setattr(fanout, "run_branch", run_branch)
+    results = asyncio.run(fanout.dbt_fanout(create_dbt(), concurrency=2))
+
+    assert sorted(branches) == [
+        ["eph_orders", "orders", "stg_orders", "stg_users", "users"],
+        ["events"],
+    ]
+    assert results[0].success
+    assert results[1].failed_nodes == ["model.test.events"]
+
+
+def test_dbt_fanout_layers_skips_descendants(monkeypatch):
+    async def run_branch(project_dir: str, names: List[str], **kwargs):
+        if "stg_users" in names:
+            raise Exception("failed")
+
+    monkeypatch.setattr(fanout, "run_branch", run_branch)
+    results = asyncio.run(
+        fanout.dbt_fanout(create_dbt(), strategy=DbtFanoutStrategy.LAYERS, concurrency=3)
+    )
+    skipped = [unique_id for result in results if result.skipped for unique_id in result.nodes]
+    failed = [unique_id for result in results for unique_id in result.failed_nodes]
+
+    assert skipped == ["model.test.users", "model.test.orders"]
+    assert sorted(failed) == ["model.test.orders", "model.test.stg_users", "model.test.users"]
+
+
+def test_run_branch_deployment(monkeypatch):
+    calls = []
+
+    async def run_deployment(name: str, parameters: dict, timeout=None):
+        calls.append((name, parameters))
+
+        return SimpleNamespace(name="flow-run", state=SimpleNamespace(is_completed=lambda: True))
+
+    monkeypatch.setattr(fanout, "run_deployment", run_deployment)
+    summary = asyncio.run(
+        fanout.run_branch.fn(
+            "/tmp/project",
+            ["users", "orders"],
+            target="prod",
+            full_refresh=True,
+            vars={"day": "2024-01-01"},
+            deployment="dbt_run_flow/dbt_run",
+        )
+    )
+
+    assert summary is None
+    assert calls == [
+        (
+            "dbt_run_flow/dbt_run",
+            {
+                "select": "users orders",
+                "fail_fast": False,
+                "full_refresh": True,
+                "vars": {"day": "2024-01-01"},
+                "target": "prod",
+            },
+        )
+    ]
@@ -0,0 +1,106 @@
+from package.dbt_history import DbtRunHistory, find_critical_path
+from package.types import DbtNodeResult, DbtRunSummary
+from pathlib import Path
+from types import SimpleNamespace
+
+import datetime
+
+
+def create_node(unique_id: str, execution_time: float, depends_on: list) -> dict:
+    return {"unique_id": unique_id, "execution_time": execution_time, "depends_on": depends_on}
+
+
+class TestFindCriticalPath:
+    def test_empty(self):
+        assert find_critical_path([]) == []
+
+    def test_longest_chain(self):
+        nodes = [
+            create_node("model.test.a", 1, []),
+            create_node("model.test.b", 5, []),
+            create_node("model.test.c", 1, ["model.test.a", "model.test.b"]),
+            create_node("model.test.d", 3, ["model.test.a"]),
+            create_node("model.test.e", 1, ["model.test.c"]),
+        ]
+
+        assert [node["unique_id"] for node in find_critical_path(nodes)] == [
+            "model.test.b",
+            "model.test.c",
+            "model.test.e",
+        ]
+
+    def test_dependencies_outside_of_run(self):
+        nodes = [
+            create_node("model.test.a", 1, ["source.test.default.users"]),
+            create_node("model.test.b", 2, ["model.test.a", "model.test.unknown"]),
+        ]
+
+        assert [node["unique_id"] for node in find_critical_path(nodes)] == [
+            "model.test.a",
+            "model.test.b",
+        ]
+
+
+class FakeResourceIndex:
+    def __init__(self) -> None:
+        self.refreshes = 0
+        self.resources = {
+            "model.test.users": {
+                "name": "users",
+                "resource_type": "model",
+                "config": {"materialized": "table"},
+                "depends_on": {"nodes": ["source.test.default.users"]},
+            }
+        }
+
+    def refresh(self) -> None:
+        self.refreshes += 1
+
+    def get(self, unique_id: str) -> dict | None:
+        self.refresh()
+
+        return self.resources.get(unique_id)
+
+
+class FakeAdapter:
+    settings = SimpleNamespace(database="test")
+
+    def __init__(self) -> None:
+        self.rows = []
+
+    def create_table(self, table: str, statement: str, database: str) -> None:
+        pass
+
+    def get_database_stats(self, database: str) -> list:
+        return []
+
+    def insert(self, table: str, rows: list, column_names: list, database: str) -> None:
+        self.rows.extend(dict(zip(column_names, row)) for row in rows)
+
+
+class TestIngest:
+    def test_refresh_once(self, tmp_path: Path):
+        (tmp_path / "dbt_project.yml").write_text("name: test\n")
+        adapter = FakeAdapter()
+        resource_index = FakeResourceIndex()
+        dbt = SimpleNamespace(project_dir=str(tmp_path), resource_index=resource_index)
+        summary = DbtRunSummary(
+            invocation_id="1",
+            dbt_version="1.8.9",
+            generated_at=datetime.datetime(2024, 1, 1),
+            elapsed_time=2.0,
+            results=[
+                DbtNodeResult(unique_id=unique_id, status="success", execution_time=1.0)
+                for unique_id in ["model.test.users", "model.test.orders", "seed.test.countries"]
+            ],
+        )
+
+        DbtRunHistory(adapter).ingest(summary, dbt)
+
+        assert resource_index.refreshes == 1
+        assert [(row["name"], row["materialized"]) for row in adapter.rows] == [
+            ("users", "table"),
+            ("orders", ""),
+            ("countries", ""),
+        ]
+        assert adapter.rows[0]["depends_on"] == ["source.test.default.users"]
@@ -0,0 +1,226 @@
+from package.dbt import Dbt, DbtResourceIndex
+from package.types import DbtResourceType, DbtSource
+from pathlib import Path
+from types import SimpleNamespace
+
+import json
+import os
+import pytest
+
+model_config = {
+    "access": "protected",
+    "column_types": {},
+    "contract": {"alias_types": True, "enforced": False},
+    "docs": {"node_color": None, "show": True},
+    "enabled": True,
+    "grants": {},
+    "materialized": "view",
+    "meta": {},
+    "on_configuration_change": "apply",
+    "on_schema_change": "ignore",
+    "packages": [],
+    "persist_docs": {},
+    "quoting": {},
+    "tags": [],
+}
+
+manifest = {
+    "nodes": {
+        "model.test.users": {
+            "alias": "users",
+            "checksum": {"name": "sha256", "checksum": "0"},
+            "config": model_config,
+            "depends_on": {"macros": [], "nodes": ["source.test.default.users"]},
+            "fqn": ["test", "users"],
+            "name": "users",
+            "original_file_path": "models/users.sql",
+            "package_name": "test",
+            "resource_type": "model",
+            "tags": [],
+            "unique_id": "model.test.users",
+        },
+        "model.test.stg_orders": {
+            "alias": "stg_orders",
+            "checksum": {"name": "sha256", "checksum": "0"},
+            "config": model_config,
+            "depends_on": {"macros": [], "nodes": []},
+            "fqn": ["test", "staging", "stg_orders"],
+            "name": "stg_orders",
+            "original_file_path": "models/staging/stg_orders.sql",
+            "package_name": "test",
+            "resource_type": "model",
+            "tags": [],
+            "unique_id": "model.test.stg_orders",
+        },
+        "model.test.staging": {
+            "alias": "staging",
+            "checksum": {"name": "sha256", "checksum": "0"},
+            "config": model_config,
+            "depends_on": {"macros": [], "nodes": []},
+            "fqn": ["test", "staging"],
+            "name": "staging",
+            "original_file_path": "models/staging.sql",
+            "package_name": "test",
+            "resource_type": "model",
+            "tags": [],
+            "unique_id": "model.test.staging",
+        },
+        "test.test.not_null_users_id": {
+            "fqn": ["test", "not_null_users_id"],
+            "name": "not_null_users_id",
+            "resource_type": "test",
+            "unique_id": "test.test.not_null_users_id",
+        },
+    },
+    "sources": {
+        "source.test.default.users": {
+            "config": {"enabled": True},
+            "fqn": ["test", "default", "users"],
+            "name": "users",
+            "original_file_path": "models/sources.yml",
+            "package_name": "test",
+            "resource_type": "source",
+            "source_name": "default",
+            "tags": [],
+            "unique_id": "source.test.default.users",
+        },
+    },
+}
+
+sources_yaml = """
+version: 2
+sources:
+  - name: default
+    tables:
+      - name: users
+        columns:
+          - name: id
+            data_type: Int64
+"""
+
+
+def set_mtime(path: Path, mtime: int) -> None:
+    os.utime(path, ns=(mtime, mtime))
+
+
+class TestDbtResourceIndex:
+    @pytest.fixture
+    def project_dir(self, tmp_path: Path) -> Path:
+        (tmp_path / "models").mkdir()
+        (tmp_path / "target").mkdir()
+        (tmp_path / "dbt_project.yml").write_text("name: test\n")
+        (tmp_path / "models" / "users.sql").write_text("select 1 as id")
+        (tmp_path / "models" / "sources.yml").write_text(sources_yaml)
+        (tmp_path / "target" / "manifest.json").write_text(json.dumps(manifest))
+
+        for path in [
+            tmp_path / "dbt_project.yml",
+            tmp_path / "models" / "users.sql",
+            tmp_path / "models" / "sources.yml",
+        ]:
+            set_mtime(path, 1_000_000_000)
+
+        set_mtime(tmp_path / "target" / "manifest.json", 2_000_000_000)
+
+        return tmp_path
+
+    @pytest.fixture
+    def parses(self, monkeypatch) -> list:
+        parses = []
+
+        def parse(self) -> None:
+            parses.append(self.project_dir)
+            Path(self.manifest_path).touch()
+
+        monkeypatch.setattr(DbtResourceIndex, "parse", parse)
+
+        return parses
+
+    def test_list(self, project_dir: Path, parses: list):
+        index = DbtResourceIndex(str(project_dir))
+
+        assert [resource["unique_id"] for resource in index.list()] == [
+            "model.test.staging",
+            "model.test.stg_orders",
+            "model.test.users",
+            "source.test.default.users",
+        ]
+        assert [
+            resource["unique_id"]
+            for resource in index.list(resource_types=[DbtResourceType.SOURCE])
+        ] == ["source.test.default.users"]
+        # Like dbt, name selectors do not match sources
+        assert [resource["unique_id"] for resource in index.list(name="users")] == [
+            "model.test.users"
+        ]
+        assert index.list(name="unknown") == []
+        assert index.get("model.test.users")["depends_on"]["nodes"] == ["source.test.default.users"]
+        assert "checksum" not in index.get("model.test.users")
+        assert parses == []
+
+    def test_reload(self, project_dir: Path, parses: list, monkeypatch):
+        index = DbtResourceIndex(str(project_dir))
+        index.list()
+        loads = []
+        monkeypatch.setattr(DbtResourceIndex, "load", lambda self: loads.append(1))
+
+        index.list()
+
+        assert loads == []
+
+        set_mtime(project_dir / "models" / "users.sql", 1_500_000_000)
+        index.list()
+
+        assert loads == [1]
+        assert parses == []
+
+    def test_parse_when_stale(self, project_dir: Path, parses: list):
+        set_mtime(project_dir / "models" / "users.sql", 3_000_000_000)
+
+        DbtResourceIndex(str(project_dir)).list()
+
+        assert parses == [str(project_dir)]
+
+    def test_list_resources(self, project_dir: Path, parses: list, monkeypatch):
+        monkeypatch.setattr(Dbt, "_resource_indexes", {})
+        monkeypatch.setattr("package.dbt.Project.get_name_from_path", lambda path: "test")
+        monkeypatch.setattr(
+            Dbt, "list_sync", lambda *args, **kwargs: pytest.fail("dbt list was invoked")
+        )
+        dbt = Dbt(str(project_dir))
+
+        [source] = dbt.list_resources(resource_types=[DbtResourceType.SOURCE])
+
+        assert isinstance(source, DbtSource)
+        assert source.original_config.columns[0].name == "id"
+        assert dbt.get_resource("users").unique_id == "model.test.users"
+        assert dbt.resource_index is Dbt(str(project_dir)).resource_index
+
+    def test_is_node_name(self, project_dir: Path, parses: list):
+        index = DbtResourceIndex(str(project_dir))
+
+        assert index.is_node_name("users")
+        assert index.is_node_name("stg_orders")
+        # Also the name of a folder and the package
+        assert not index.is_node_name("staging")
+        assert not index.is_node_name("test")
+        # Only the name of a source
+        assert not index.is_node_name("default")
+        assert not index.is_node_name("unknown")
+
+    def test_list_resources_folder_selector(self, project_dir: Path, parses: list, monkeypatch):
+        monkeypatch.setattr(Dbt, "_resource_indexes", {})
+        monkeypatch.setattr("package.dbt.Project.get_name_from_path", lambda path: "test")
+        selects = []
+
+        def list_sync(self, select=None, **kwargs):
+            selects.append(select)
+
+            return SimpleNamespace(result=[json.dumps(manifest["nodes"]["model.test.stg_orders"])])
+
+        monkeypatch.setattr(Dbt, "list_sync", list_sync)
+        dbt = Dbt(str(project_dir))
+
+        assert [model.name for model in dbt.list_resources(select="staging")] == ["stg_orders"]
+        assert [model.name for model in dbt.list_resources(select="users")] == ["users"]
+        assert selects == ["staging"]
@@ -0,0 +1,216 @@
+from contextlib import aclosing
+from dbt.events.core_types_pb2 import NodeFinishedMsg, NodeStartMsg
+from package.dbt import Dbt, to_node_event
+from package.types import DbtNodeEvent, DbtNodeEventType
+from pathlib import Path
+from typing import List
+
+import asyncio
+import json
+import pytest
+import time
+
+run_results = {
+    "metadata": {
+        "dbt_schema_version": "https://schemas.getdbt.com/dbt/run-results/v6.json",
+        "dbt_version": "1.8.9",
+        "generated_at": "2024-01-01T00:00:02Z",
+        "invocation_id": "00000000-0000-0000-0000-000000000000",
+        "env": {},
+    },
+    "results": [
+        {
+            "status": "success",
+            "timing": [
+                {
+                    "name": "execute",
+                    "started_at": "2024-01-01T00:00:00Z",
+                    "completed_at": "2024-01-01T00:00:01.500000Z",
+                }
+            ],
+            "thread_id": "Thread-1",
+            "execution_time": 1.5,
+            "adapter_response": {"_message": "OK", "rows_affected": 10},
+            "message": "OK",
+            "failures": None,
+            "unique_id": "model.test.users",
+            "compiled": True,
+            "compiled_code": "select 1",
+            "relation_name": "`test`.`users`",
+        },
+        {
+            "status": "error",
+            "timing": [],
+            "thread_id": "Thread-2",
+            "execution_time": 0.5,
+            "adapter_response": {},
+            "message": "Database Error",
+            "failures": None,
+            "unique_id": "model.test.orders",
+            "compiled": True,
+            "compiled_code": "select 1",
+            "relation_name": "`test`.`orders`",
+        },
+    ],
+    "elapsed_time": 2.0,
+    "args": {},
+}
+
+
+def create_start_event(unique_id: str) -> NodeStartMsg:
+    event = NodeStartMsg()
+    event.info.name = "NodeStart"
+    event.data.node_info.unique_id = unique_id
+    event.data.node_info.node_name = unique_id.split(".")[-1]
+    event.data.node_info.resource_type = "model"
+    event.data.node_info.materialized = "table"
+    event.data.node_info.node_status = "started"
+
+    return event
+
+
+def create_finish_event(unique_id: str) -> NodeFinishedMsg:
+    event = NodeFinishedMsg()
+    event.info.name = "NodeFinished"
+    event.data.node_info.unique_id = unique_id
+    event.data.node_info.node_name = unique_id.split(".")[-1]
+    event.data.node_info.resource_type = "model"
+    event.data.node_info.node_relation.relation_name = "`test`.`users`"
+    event.data.run_result.status = "success"
+    event.data.run_result.execution_time = 1.5
+    event.data.run_result.thread = "Thread-1"
+    event.data.run_result.adapter_response.update({"_message": "OK", "rows_affected": 10})
+
+    return event
+
+
+class FakeResult:
+    exception = None
+    success = True
+
+
+class FakeRunner:
+    def __init__(self, callbacks: List) -> None:
+        self.callbacks = callbacks
+
+    def invoke(self, args: List[str]) -> FakeResult:
+        for event in [
+            create_start_event("model.test.users"),
+            create_finish_event("model.test.users"),
+        ]:
+            for callback in self.callbacks:
+                callback(event)
+
+        return FakeResult()
+
+
+class TestToNodeEvent:
+    def test_start(self):
+        event = to_node_event(create_start_event("model.test.users"))
+
+        assert event.type == DbtNodeEventType.START
+        assert (event.unique_id, event.name, event.materialized) == (
+            "model.test.users",
+            "users",
+            "table",
+        )
+        assert event.execution_time is None
+
+    def test_finish(self):
+        event = to_node_event(create_finish_event("model.test.users"))
+
+        assert event.type == DbtNodeEventType.FINISH
+        assert (event.status, event.execution_time, event.rows_affected) == ("success", 1.5, 10)
+        assert event.relation_name == "`test`.`users`"
+        assert event.thread == "Thread-1"
+
+    def test_other_event(self):
+        event = NodeStartMsg()
+        event.info.name = "MainReportVersion"
+
+        assert to_node_event(event) is None
+
+
+class TestRunAsync:
+    @pytest.fixture
+    def project_dir(self, tmp_path: Path, monkeypatch) -> Path:
+        (tmp_path / "target").mkdir()
+        (tmp_path / "target" / "run_results.json").write_text(json.dumps(run_results))
+        monkeypatch.setattr(
+            Dbt, "create_runner", lambda self, vars=None, callbacks=None: FakeRunner(callbacks)
+        )
+
+        return tmp_path
+
+    def test_stream_run(self, project_dir: Path):
+        async def collect() -> List[DbtNodeEvent]:
+            return [event async for event in Dbt(str(project_dir)).stream_run()]
+
+        events = asyncio.run(collect())
+
+        assert [event.type for event in events] == [
+            DbtNodeEventType.START,
+            DbtNodeEventType.FINISH,
+        ]
+
+    def test_stream_run_stop(self, project_dir: Path, monkeypatch, caplog):
+        class FailingRunner(FakeRunner):
+            def invoke(self, args: List[str]) -> FakeResult:
+                super().invoke(args)
+                time.sleep(0.05)
+                invocations.append(args)
+
+                raise Exception("Connection refused")
+
+        invocations = []
+        monkeypatch.setattr(
+            Dbt, "create_runner", lambda self, vars=None, callbacks=None: FailingRunner(callbacks)
+        )
+
+        async def first() -> DbtNodeEvent:
+            async with aclosing(Dbt(str(project_dir)).stream_run()) as events:
+                async for event in events:
+                    return event
+
+        assert asyncio.run(first()).type == DbtNodeEventType.START
+        assert len(invocations) == 1
+        assert "Detached dbt invocation failed: Connection refused" in caplog.text
+
+    def test_run_async(self, project_dir: Path):
+        events = []
+        summary = asyncio.run(Dbt(str(project_dir)).run_async(on_event=events.append))
+
+        assert len(events) == 2
+        assert summary.invocation_id == "00000000-0000-0000-0000-000000000000"
+        assert summary.elapsed_time == 2.0
+        assert not summary.success
+        assert [result.unique_id for result in summary.failed] == ["model.test.orders"]
+        assert [result.unique_id for result in summary.slowest(1)] == ["model.test.users"]
+
+        [result, _] = summary.results
+
+        assert (result.status, result.rows_affected, result.thread) == ("success", 10, "Thread-1")
+        assert (result.completed_at - result.started_at).total_seconds() == 1.5
+
+    def test_history(self, project_dir: Path):
+        class FakeHistory:
+            def __init__(self) -> None:
+                self.summaries = []
+
+            def ingest(self, summary, dbt) -> None:
+                self.summaries.append(summary)
+
+        history = FakeHistory()
+        summary = asyncio.run(Dbt(str(project_dir), history=history).run_async())
+
+        assert history.summaries == [summary]
+
+    def test_history_failure(self, project_dir: Path, caplog):
+        class FailingHistory:
+            def ingest(self, summary, dbt) -> None:
+                raise Exception("Connection refused")
+
+        summary = asyncio.run(Dbt(str(project_dir), history=FailingHistory()).run_async())
+
+        assert summary.elapsed_time == 2.0
+        assert "Failed to record the results of dbt invocation" in caplog.text
@@ -0,0 +1,86 @@
+from package.dbt import Dbt
+from pathlib import Path
+from typing import Any, List, Optional
+
+import os
+import pytest
+
+
+class FakeResult:
+    def __init__(self, result: Any = None) -> None:
+        self.success = True
+        self.result = result
+        self.exception = None
+
+
+class FakeRunner:
+    def __init__(self, invocations: List[tuple], manifest: Optional[object] = None) -> None:
+        self.invocations = invocations
+        self.manifest = manifest
+
+    def invoke(self, args: List[str]) -> FakeResult:
+        self.invocations.append((args[0], self.manifest))
+
+        return FakeResult()
+
+
+class TestSession:
+    @pytest.fixture
+    def project_dir(self, tmp_path: Path) -> Path:
+        (tmp_path / "dbt_project.yml").write_text("name: test\n")
+
+        return tmp_path
+
+    @pytest.fixture
+    def invocations(self, monkeypatch) -> List[tuple]:
+        invocations = []
+        monkeypatch.setattr(
+            "package.dbt.dbtRunner",
+            lambda manifest=None, callbacks=None: FakeRunner(invocations, manifest=manifest),
+        )
+
+        return invocations
+
+    @pytest.fixture
+    def parses(self, monkeypatch) -> List[object]:
+        parses = []
+
+        def parse_sync(self, **kwargs) -> FakeResult:
+            parses.append(object())
+
+            return FakeResult(parses[-1])
+
+        monkeypatch.setattr(Dbt, "parse_sync", parse_sync)
+
+        return parses
+
+    def test_parse_once(self, project_dir: Path, invocations: List[tuple], parses: List[object]):
+        dbt = Dbt(str(project_dir), session=True)
+
+        dbt.list_sync()
+        dbt.seed_sync()
+        dbt.run_sync()
+
+        assert len(parses) == 1
+        assert invocations == [("list", parses[0]), ("seed", parses[0]), ("run", parses[0])]
+
+    def test_parse_when_changed(
+        self, project_dir: Path, invocations: List[tuple], parses: List[object]
+    ):
+        dbt = Dbt(str(project_dir), session=True)
+
+        dbt.run_sync()
+        os.utime(project_dir / "dbt_project.yml", ns=(1_000_000_000, 1_000_000_000))
+        dbt.run_sync()
+        dbt.run_sync(vars={"key": "value"})
+
+        assert len(parses) == 3
+        assert [manifest for _, manifest in invocations] == parses
+
+    def test_without_session(
+        self, project_dir: Path, invocations: List[tuple], parses: List[object]
+    ):
+        Dbt(str(project_dir)).run_sync()
+
+        assert parses == []
+        assert invocations == [("run", None)]
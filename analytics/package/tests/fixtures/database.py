@@ -11,17 +11,21 @@ settings = get_settings()
 class DBTest:
     @pytest.fixture(scope="session")
     def ch_adapter(self) -> Generator[CHAdapter, Any, None]:
-        yield CHAdapter(settings.test_clickhouse)
+        adapter = CHAdapter(settings.test_clickhouse)
 
-    @pytest.fixture(scope="function")
-    def ch_session(self, ch_adapter: CHAdapter) -> Generator[Session, Any, None]:
-        with ch_adapter.create_engine() as engine:
-            session = Session(engine)
+        yield adapter
 
-        yield session
+        adapter.close()
 
-        session.close()
+    @pytest.fixture(scope="function")
+    def ch_session(self, ch_adapter: CHAdapter) -> Generator[Session, Any, None]:
+        with ch_adapter.create_session() as session:
+            yield session
 
     @pytest.fixture(scope="session")
     def pg_adapter(self) -> Generator[PGAdapter, Any, None]:
-        yield PGAdapter(settings.test_postgres)
+        adapter = PGAdapter(settings.test_postgres)
+
+        yield adapter
+
+        adapter.close()
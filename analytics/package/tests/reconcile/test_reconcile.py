@@ -0,0 +1,123 @@
+from package.database.catalog import CatalogColumn, CatalogTable
+from package.reconcile import get_type_category, split_bounds, TableComparison
+from package.types import ReconcileRange, ReconcileReport
+
+
+class TestSplitBounds:
+    def test_single_range(self):
+        assert split_bounds(1, 101, 1) == [(1, 101)]
+
+    def test_even_ranges(self):
+        assert split_bounds(0, 100, 4) == [(0, 25), (25, 50), (50, 75), (75, 100)]
+
+    def test_uneven_ranges(self):
+        assert split_bounds(0, 10, 3) == [(0, 4), (4, 8), (8, 10)]
+
+    def test_more_ranges_than_values(self):
+        assert split_bounds(1, 3, 10) == [(1, 2), (2, 3)]
+
+
+class TestGetTypeCategory:
+    def test_categories(self):
+        assert get_type_category("bigint") == "integer"
+        assert get_type_category("character varying(255)") == "text"
+        assert get_type_category("numeric(10,2)") == "numeric"
+        assert get_type_category("timestamp with time zone") == "timestamp"
+        assert get_type_category("uuid") == "text"
+
+    def test_unsupported_types(self):
+        assert get_type_category("jsonb") is None
+        assert get_type_category("text[]") is None
+
+
+class TestReconcileRange:
+    def test_matches(self):
+        assert ReconcileRange(
+            source_rows=1, destination_rows=1, source_hash=2, destination_hash=2
+        ).matches
+        assert not ReconcileRange(source_rows=1, destination_rows=1, destination_hash=2).matches
+        assert not ReconcileRange(source_rows=1).matches
+
+    def test_report_matches(self):
+        report = ReconcileReport(source_table="a", destination_table="b", columns=["id"])
+
+        assert report.matches
+
+        report.mismatched_ranges.append(ReconcileRange(source_rows=1))
+
+        assert not report.matches
+
+
+class TestTableComparison:
+    def create_comparison(self, engine: str, columns: list[str]) -> TableComparison:
+        source_table = CatalogTable(
+            database="source",
+            schema_="public",
+            name="users",
+            columns=[
+                CatalogColumn(name="id", data_type="bigint", position=1),
+                CatalogColumn(name="name", data_type="text", position=2),
+            ],
+        )
+        destination_table = CatalogTable(
+            database="destination",
+            name="users",
+            engine=engine,
+            columns=[
+                CatalogColumn(name=name, data_type="String", position=position)
+                for position, name in enumerate(columns, start=1)
+            ],
+        )
+
+        return TableComparison(None, source_table, destination_table, "id", ["id", "name"], ["id"])
+
+    def test_replacing_merge_tree(self):
+        comparison = self.create_comparison(
+            "ReplacingMergeTree", ["id", "name", "_peerdb_is_deleted", "_peerdb_version"]
+        )
+
+        assert comparison.create_destination_from() == (
+            "(select * from (select * from `destination`.`users` final) "
+            "where `_peerdb_is_deleted` = 0)"
+        )
+
+    def test_version_without_replacing_merge_tree(self):
+        comparison = self.create_comparison("MergeTree", ["id", "name", "_peerdb_version"])
+
+        assert comparison.create_destination_from() == (
+            "(select * from `destination`.`users` order by `_peerdb_version` desc limit 1 by `id`)"
+        )
+
+    def test_range_before_deduplication(self):
+        comparison = self.create_comparison(
+            "MergeTree", ["id", "name", "_peerdb_is_deleted", "_peerdb_version"]
+        )
+
+        assert comparison.create_destination_range_query(ReconcileRange(start=1, end=10)).endswith(
+            " from (select * from (select * from `destination`.`users` "
+            "where `id` >= 1 and `id` < 10 order by `_peerdb_version` desc limit 1 by `id`) "
+            "where `_peerdb_is_deleted` = 0);"
+        )
+
+    def test_where(self):
+        comparison = self.create_comparison("MergeTree", ["id", "name"])
+
+        assert comparison.create_source_range_query(ReconcileRange(start=1, end=10)).endswith(
+            ' from "public"."users" where "id" >= 1 and "id" < 10;'
+        )
+        assert comparison.create_source_range_query(ReconcileRange()).endswith(
+            ' from "public"."users";'
+        )
+
+    def test_null_placeholders(self):
+        comparison = self.create_comparison("MergeTree", ["id", "name"])
+
+        assert "coalesce(\"name\"::text, '\\N')" in comparison.create_source_row_hash()
+        assert "ifNull(toString(`name`), '\\\\N')" in comparison.create_destination_row_hash()
+
+    def test_float_bits(self):
+        comparison = self.create_comparison("MergeTree", ["id", "name"])
+        comparison.source_table.columns[1].data_type = "double precision"
+
+        assert 'float8send("name"::float8)' in comparison.create_source_row_hash()
+        assert "reinterpretAsInt64(toFloat64(`name`))" in comparison.create_destination_row_hash()
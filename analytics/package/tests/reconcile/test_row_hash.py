@@ -0,0 +1,160 @@
+from package.database import CHAdapter, PGAdapter
+from package.reconcile import Reconcile
+from package.tests.fixtures.database import DBTest
+from package.types import CHTableIdentifier, PGTableIdentifier
+from typing import Any, Generator
+
+import datetime
+import decimal
+import pytest
+import uuid
+
+table = "test_reconcile"
+
+columns = [
+    "id",
+    "int32",
+    "bool",
+    "date",
+    "float32",
+    "float64",
+    "numeric",
+    "text",
+    "uuid",
+    "timestamp",
+    "timestamptz",
+]
+
+rows = [
+    (
+        1,
+        -2,
+        True,
+        datetime.date(2024, 1, 31),
+        1.5,
+        1e20,
+        decimal.Decimal("1.50"),
+        "a\tb",
+        uuid.UUID("00000000-0000-0000-0000-000000000001"),
+        datetime.datetime(2024, 1, 1, 12, 0, 0, 123456),
+        datetime.datetime(2024, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc),
+    ),
+    (
+        2,
+        0,
+        False,
+        datetime.date(1970, 1, 1),
+        -0.25,
+        1e-5,
+        decimal.Decimal("-3"),
+        "",
+        uuid.UUID("00000000-0000-0000-0000-000000000002"),
+        datetime.datetime(1999, 12, 31, 23, 59, 59),
+        datetime.datetime(2000, 1, 1, tzinfo=datetime.timezone.utc),
+    ),
+    (3, None, None, None, None, None, None, None, None, None, None),
+]
+
+
+class TestRowHash(DBTest):
+    @pytest.fixture(scope="function")
+    def table_mapping(
+        self, pg_adapter: PGAdapter, ch_adapter: CHAdapter
+    ) -> Generator[dict, Any, None]:
+        quoted_pg_table = PGTableIdentifier(table=table).to_string()
+        pg_adapter.create_table(
+            table,
+            f"""
+            create table {quoted_pg_table} (
+                id bigint primary key,
+                int32 integer,
+                bool boolean,
+                date date,
+                float32 real,
+                float64 double precision,
+                numeric numeric(10, 2),
+                text text,
+                uuid uuid,
+                timestamp timestamp,
+                timestamptz timestamptz
+            );
+            """,
+        )
+        ch_adapter.create_table(
+            table,
+            f"""
+            create table {CHTableIdentifier(table=table).to_string()}
+            (
+                id Int64,
+                int32 Nullable(Int32),
+                bool Nullable(Bool),
+                date Nullable(Date32),
+                float32 Nullable(Float32),
+                float64 Nullable(Float64),
+                numeric Nullable(Decimal(10, 2)),
+                text Nullable(String),
+                uuid Nullable(UUID),
+                timestamp Nullable(DateTime64(6)),
+                timestamptz Nullable(DateTime64(6, 'UTC')),
+                _peerdb_is_deleted Int8,
+                _peerdb_version Int64
+            )
+            engine = ReplacingMergeTree(_peerdb_version)
+            order by id
+            """,
+        )
+
+        with pg_adapter.create_client() as (conn, cur):
+            cur.executemany(
+                f"insert into {quoted_pg_table} values ({', '.join(['%s'] * len(columns))});",
+                rows,
+            )
+
+        with ch_adapter.create_client() as client:
+            client.insert(
+                table,
+                [[*row, 0, 1] for row in rows],
+                column_names=[*columns, "_peerdb_is_deleted", "_peerdb_version"],
+                database=ch_adapter.settings.database,
+            )
+
+        yield {
+            "source_table_identifier": f"{pg_adapter.settings.schema_}.{table}",
+            "destination_table_identifier": table,
+        }
+
+        pg_adapter.drop_table(table)
+        ch_adapter.drop_table(table)
+
+    def test_row_hashes(self, pg_adapter: PGAdapter, ch_adapter: CHAdapter, table_mapping: dict):
+        reconcile = Reconcile(pg_adapter, ch_adapter, workers=1)
+        report = reconcile.run(table_mapping)
+
+        assert report.skipped_columns == []
+        assert report.columns == columns
+        assert report.matches
+        assert (report.source_rows, report.destination_rows) == (3, 3)
+
+    def test_different_rows(
+        self, pg_adapter: PGAdapter, ch_adapter: CHAdapter, table_mapping: dict
+    ):
+        with ch_adapter.create_client() as client:
+            client.insert(
+                table,
+                [[2, *rows[1][1:5], 2e-5, *rows[1][6:], 0, 2]],
+                column_names=[*columns, "_peerdb_is_deleted", "_peerdb_version"],
+                database=ch_adapter.settings.database,
+            )
+
+        reconcile = Reconcile(pg_adapter, ch_adapter, workers=1)
+        report = reconcile.run(table_mapping)
+
+        assert [(range_.start, range_.end) for range_ in report.mismatched_ranges] == [(2, 3)]
+        assert report.different_keys == [2]
+        assert report.missing_keys == report.extra_keys == []
+
+    def test_no_columns(self, pg_adapter: PGAdapter, ch_adapter: CHAdapter, table_mapping: dict):
+        reconcile = Reconcile(pg_adapter, ch_adapter, workers=1)
+
+        with pytest.raises(Exception, match="No columns"):
+            reconcile.run({**table_mapping, "exclude": columns})
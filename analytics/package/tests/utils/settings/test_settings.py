@@ -0,0 +1,42 @@
+from package.types import CHSettings
+from package.utils.settings import create_ch_settings
+
+import json
+import pytest
+
+env = {
+    "host": "localhost",
+    "http_port": "8123",
+    "tcp_port": "9000",
+    "username": "default",
+    "password": "",
+    "database": "test",
+    "secure": "false",
+    "driver": "http",
+}
+
+
+@pytest.fixture(scope="function")
+def clickhouse_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    for key, value in env.items():
+        monkeypatch.setenv(f"package_test_clickhouse_{key}", value)
+
+
+def test_ch_settings_profiles_default(clickhouse_env):
+    settings = create_ch_settings("package_test_clickhouse_")()
+
+    assert settings.profiles == CHSettings.model_fields["profiles"].default_factory()
+
+
+def test_ch_settings_profiles_from_env(clickhouse_env, monkeypatch: pytest.MonkeyPatch):
+    profiles = {"batch": {"max_execution_time": 60}}
+    monkeypatch.setenv("package_test_clickhouse_profiles", json.dumps(profiles))
+    monkeypatch.setenv("profiles", json.dumps({"other": {}}))
+
+    assert create_ch_settings("package_test_clickhouse_")().profiles == profiles
+    assert (
+        create_ch_settings("package_other_clickhouse_")(
+            **{f"package_other_clickhouse_{key}": value for key, value in env.items()}
+        ).profiles
+        == CHSettings.model_fields["profiles"].default_factory()
+    )
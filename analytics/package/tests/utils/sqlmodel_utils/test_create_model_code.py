@@ -2,7 +2,8 @@ from package.config.settings import get_settings
 from package.database import CHAdapter
 from package.tests.fixtures.database import DBTest
 from package.types import CHTableIdentifier, DbtSource
-from package.utils.sqlmodel_utils import create_model_code
+from package.utils.sqlmodel_utils import create_model_code, create_model_files
+from pathlib import Path
 from sqlmodel import Table
 from typing import Any, Generator
 
@@ -196,3 +197,30 @@ class TestCreateModelCode(DBTest):
 
         assert result["model_code"].strip() == expected_model_code.strip()
         assert result["factory_code"].strip() == expected_factory_code.strip()
+
+    def test_statement(self, ch_adapter: CHAdapter, ch_table: Table):
+        statements = ch_adapter.get_create_table_statements(ch_table.schema, [ch_table.name])
+        result = create_model_code(
+            ch_adapter.settings,
+            ch_table.schema,
+            dbt_source,
+            statement=statements[ch_table.name],
+        )
+
+        assert result["model_code"].strip() == expected_model_code.strip()
+        assert result["factory_code"].strip() == expected_factory_code.strip()
+
+    def test_create_model_files(self, ch_adapter: CHAdapter, ch_table: Table, tmp_path: Path):
+        create_model_files(ch_adapter.settings, ch_table.schema, [dbt_source], str(tmp_path))
+
+        model_code = (tmp_path / f"{table}.py").read_text()
+        factory_code = (tmp_path / f"{table}_factory.py").read_text()
+
+        assert model_code.strip() == expected_model_code.strip()
+        assert factory_code.strip() == expected_factory_code.strip()
+
+    def test_create_model_files_missing_table(self, ch_adapter: CHAdapter, tmp_path: Path):
+        with pytest.raises(Exception, match="not found"):
+            create_model_files(
+                ch_adapter.settings, ch_adapter.settings.database, [dbt_source], str(tmp_path)
+            )
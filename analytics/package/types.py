@@ -1,8 +1,9 @@
+from datetime import datetime
 from enum import StrEnum
 from pathlib import Path
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 
 class CHSettings(BaseSettings):
@@ -14,12 +15,20 @@ class CHSettings(BaseSettings):
     database: str
     secure: Optional[bool] = Field(default=False)
     driver: Optional[str] = Field(default=None)
+    # Named sets of query settings, which are applied per query by CHAdapter
+    profiles: Dict[str, Dict[str, Any]] = Field(
+        default_factory=lambda: {
+            "interactive": {"max_threads": 4, "max_execution_time": 60, "use_query_cache": 1},
+            "batch": {"max_execution_time": 3600, "use_query_cache": 0},
+            "ingest": {"async_insert": 1, "wait_for_async_insert": 1},
+        }
+    )
 
     @property
     def url(self) -> str:
         from package.database import CHAdapter
 
-        return CHAdapter.create_url(**self.model_dump(by_alias=True))
+        return CHAdapter.create_url(**self.model_dump(by_alias=True, exclude={"profiles"}))
 
 
 class PGSettings(BaseSettings):
@@ -125,6 +134,188 @@ class PGTableIdentifier(PGIdentifier, BaseModel):
             return self.quote(self.table)
 
 
+class BackfillMethod(StrEnum):
+    CTID = "ctid"
+    PRIMARY_KEY = "primary_key"
+
+
+class BackfillRange(BaseModel):
+    index: int
+    start: Optional[int] = None
+    end: Optional[int] = None
+    done: bool = False
+    rows: int = 0
+    bytes: int = 0
+    elapsed: float = 0
+
+
+class BackfillCheckpoint(BaseModel):
+    source_table: str
+    destination_table: str
+    method: BackfillMethod
+    key: Optional[str] = None
+    columns: List[str]
+    array_columns: List[str] = Field(default_factory=list)
+    ranges: List[BackfillRange]
+
+
+class BackfillProgress(BaseModel):
+    source_table: str
+    destination_table: str
+    ranges: int
+    ranges_done: int
+    rows: int
+    bytes: int
+    elapsed: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0
+
+
+class ReconcileRange(BaseModel):
+    start: Optional[int] = None
+    end: Optional[int] = None
+    depth: int = 0
+    source_rows: int = 0
+    destination_rows: int = 0
+    source_hash: int = 0
+    destination_hash: int = 0
+
+    @property
+    def matches(self) -> bool:
+        return (
+            self.source_rows == self.destination_rows and self.source_hash == self.destination_hash
+        )
+
+
+class ReconcileReport(BaseModel):
+    source_table: str
+    destination_table: str
+    key: Optional[str] = None
+    columns: List[str]
+    skipped_columns: List[str] = Field(default_factory=list)
+    source_rows: int = 0
+    destination_rows: int = 0
+    ranges: int = 0
+    mismatched_ranges: List[ReconcileRange] = Field(default_factory=list)
+    missing_keys: List[Any] = Field(default_factory=list)
+    extra_keys: List[Any] = Field(default_factory=list)
+    different_keys: List[Any] = Field(default_factory=list)
+    elapsed: float = 0
+    source_elapsed: float = 0
+    destination_elapsed: float = 0
+
+    @property
+    def matches(self) -> bool:
+        return not self.mismatched_ranges
+
+
+class CopyFormat(StrEnum):
+    ARROW = "arrow"
+    BINARY = "binary"
+    CSV = "csv"
+
+
+class StreamFormat(StrEnum):
+    ARROW = "arrow"
+    PANDAS = "pandas"
+    ROWS = "rows"
+
+
+class InsertReport(BaseModel):
+    database: str
+    table: str
+    rows: int
+    batches: int
+    elapsed: float
+
+
+class TableOperationTiming(BaseModel):
+    table: str
+    elapsed: float
+
+
+class TableOperationReport(BaseModel):
+    operation: str
+    method: str
+    database: str
+    schema_: Optional[str] = Field(default=None, serialization_alias="schema")
+    tables: List[str]
+    timings: List[TableOperationTiming] = Field(default_factory=list)
+    elapsed: float
+
+
+class Partition(BaseModel):
+    partition: str
+    partition_id: str
+    parts: int
+    rows: int
+    bytes: int
+
+
+class PartitionOperationReport(BaseModel):
+    operation: str
+    database: str
+    table: str
+    partition_id: str
+    parts: int
+    rows: int
+    bytes: int
+    elapsed: float
+
+
+class ColumnStats(BaseModel):
+    name: str
+    data_type: str
+    compressed_bytes: int
+    uncompressed_bytes: int
+
+    @property
+    def compression_ratio(self) -> float | None:
+        if not self.compressed_bytes:
+            return None
+
+        return self.uncompressed_bytes / self.compressed_bytes
+
+
+class TableStats(BaseModel):
+    database: str
+    schema_: Optional[str] = Field(default=None, serialization_alias="schema")
+    table: str
+    engine: Optional[str] = None
+    rows: Optional[int] = None
+    total_bytes: int = 0
+    # ClickHouse
+    parts: Optional[int] = None
+    compressed_bytes: Optional[int] = None
+    uncompressed_bytes: Optional[int] = None
+    columns: List[ColumnStats] = Field(default_factory=list)
+    # Postgres
+    live_tuples: Optional[int] = None
+    dead_tuples: Optional[int] = None
+    table_bytes: Optional[int] = None
+    index_bytes: Optional[int] = None
+
+    @property
+    def compression_ratio(self) -> float | None:
+        if not self.compressed_bytes:
+            return None
+
+        return self.uncompressed_bytes / self.compressed_bytes
+
+    @property
+    def dead_tuple_ratio(self) -> float | None:
+        if self.live_tuples is None or not (self.live_tuples + self.dead_tuples):
+            return None
+
+        return self.dead_tuples / (self.live_tuples + self.dead_tuples)
+
+
 class DbtResourceType(StrEnum):
     MODEL = "model"
     SEED = "seed"
@@ -259,3 +450,89 @@ class DbtSource(DbtBaseResource):
     config: DbtSourceConfig
     original_config: Optional[DbtTable] = None
     source_name: str
+
+
+# Statuses of dbt node results that fail a run
+DBT_FAILED_STATUSES = ["error", "fail", "runtime error"]
+
+
+class DbtNodeEventType(StrEnum):
+    START = "start"
+    FINISH = "finish"
+
+
+class DbtNodeEvent(BaseModel):
+    type: DbtNodeEventType
+    unique_id: str
+    name: str
+    resource_type: str
+    materialized: Optional[str] = None
+    relation_name: Optional[str] = None
+    status: Optional[str] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    execution_time: Optional[float] = None
+    rows_affected: Optional[int] = None
+    adapter_response: Dict[str, Any] = Field(default_factory=dict)
+    thread: Optional[str] = None
+    message: Optional[str] = None
+
+
+class DbtNodeResult(BaseModel):
+    unique_id: str
+    status: str
+    thread: Optional[str] = None
+    execution_time: float
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    rows_affected: Optional[int] = None
+    adapter_response: Dict[str, Any] = Field(default_factory=dict)
+    message: Optional[str] = None
+    relation_name: Optional[str] = None
+
+
+class DbtRunSummary(BaseModel):
+    invocation_id: str
+    dbt_version: str
+    generated_at: datetime
+    elapsed_time: float
+    results: List[DbtNodeResult]
+
+    @property
+    def success(self) -> bool:
+        return not any(result.status in DBT_FAILED_STATUSES for result in self.results)
+
+    @property
+    def failed(self) -> List[DbtNodeResult]:
+        return [result for result in self.results if result.status in DBT_FAILED_STATUSES]
+
+    def slowest(self, limit: int = 10) -> List[DbtNodeResult]:
+        return sorted(self.results, key=lambda result: result.execution_time, reverse=True)[:limit]
+
+
+class DbtFanoutStrategy(StrEnum):
+    COMPONENTS = "components"
+    LAYERS = "layers"
+
+
+class DbtBranchResult(BaseModel):
+    nodes: List[str]
+    summary: Optional[DbtRunSummary] = None
+    error: Optional[str] = None
+    skipped: bool = False
+
+    @property
+    def success(self) -> bool:
+        return (
+            self.error is None
+            and not self.skipped
+            and (self.summary is None or self.summary.success)
+        )
+
+    @property
+    def failed_nodes(self) -> List[str]:
+        """Nodes that failed, or all nodes if the branch failed or was skipped as a whole."""
+        if self.summary is None or self.error is not None:
+            return [] if self.success else self.nodes
+
+        return [result.unique_id for result in self.summary.failed]
@@ -11,6 +11,7 @@ from package.utils.yaml_utils import safe_load_file
 from pathlib import Path
 from pydantic import Field
 from pydantic_settings import SettingsConfigDict
+from typing import Any, Dict
 
 import yaml
 
@@ -87,6 +88,11 @@ def create_ch_settings(env_prefix: str) -> CHSettings:
             validation_alias=f"{env_prefix}driver",
             serialization_alias="driver",
         )
+        profiles: Dict[str, Dict[str, Any]] = Field(
+            default_factory=CHSettings.model_fields["profiles"].default_factory,
+            validation_alias=f"{env_prefix}profiles",
+            serialization_alias="profiles",
+        )
 
     return Settings
 
@@ -240,13 +240,21 @@ def create_model_code(
     dbt_resource: DbtSource,
     extend_primary_key: Optional[bool] = False,
     random_seed: int = 0,
+    statement: Optional[str] = None,
 ) -> Dict[str, str]:
     """Create the code of a SQLModel class from a table statement."""
     # 1. Create model
-    ch_adapter = CHAdapter(db_settings)
     table_name = dbt_resource.name
     model_name = dbt_resource.original_config.meta.python_class
-    statement = ch_adapter.get_create_table_statement(table_name, database=database)
+
+    if statement is None:
+        ch_adapter = CHAdapter(db_settings)
+
+        try:
+            statement = ch_adapter.get_create_table_statement(table_name, database=database)
+        finally:
+            ch_adapter.close()
+
     parsed_statement = parse_create_table_statement(statement)
     table_kwargs = {"schema": database}
     engine = parsed_statement["engine"]
@@ -381,6 +389,7 @@ def create_model_file(
     extend_primary_key: Optional[bool] = False,
     replace_model: Optional[bool] = False,
     replace_factory: Optional[bool] = False,
+    statement: Optional[str] = None,
 ) -> None:
     model_name = dbt_resource.original_config.meta.python_class
     model_filename = create_class_filename(model_name)
@@ -394,7 +403,11 @@ def create_model_file(
 
     if create_model or create_factory:
         result = create_model_code(
-            db_settings, database, dbt_resource, extend_primary_key=extend_primary_key
+            db_settings,
+            database,
+            dbt_resource,
+            extend_primary_key=extend_primary_key,
+            statement=statement,
         )
 
         if create_model:
@@ -406,6 +419,41 @@ def create_model_file(
                 fp.write(result["factory_code"])
 
 
+def create_model_files(
+    db_settings: CHSettings,
+    database: str,
+    dbt_resources: List[DbtSource],
+    directory: str,
+    extend_primary_key: Optional[bool] = False,
+    replace_model: Optional[bool] = False,
+    replace_factory: Optional[bool] = False,
+) -> None:
+    ch_adapter = CHAdapter(db_settings)
+
+    # Fetch the statements of all tables in a single query
+    try:
+        statements = ch_adapter.get_create_table_statements(
+            database=database, tables=[dbt_resource.name for dbt_resource in dbt_resources]
+        )
+    finally:
+        ch_adapter.close()
+
+    for dbt_resource in dbt_resources:
+        if dbt_resource.name not in statements:
+            raise Exception(f"Table '{database}.{dbt_resource.name}' not found")
+
+        create_model_file(
+            db_settings,
+            database,
+            dbt_resource,
+            directory,
+            extend_primary_key=extend_primary_key,
+            replace_model=replace_model,
+            replace_factory=replace_factory,
+            statement=statements[dbt_resource.name],
+        )
+
+
 def create_init_file(dbt_resources: List[DbtSource], directory: str) -> None:
     file_path = os.path.join(directory, "__init__.py")
     all = []